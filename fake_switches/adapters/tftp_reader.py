@@ -12,21 +12,116 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import threading
+from multiprocessing.pool import ThreadPool
+
 import tftpy
 
+try:
+    from queue import Queue, Empty, Full
+except ImportError:
+    from Queue import Queue, Empty, Full
+
+
+MAX_DOWNLOADS = 8
+
+_download_pool = []
+_download_pool_lock = threading.Lock()
+
 
 def read_tftp(server, remote_filename, port=69):
-    client = tftpy.TftpClient(server, port)
-    fake_file = FakeFile()
-    client.download(remote_filename, fake_file)
-    return fake_file.content
+    """
+    Lines of the remote file, each one available as soon as the block
+    completing it is received.  The download runs in one of the
+    MAX_DOWNLOADS threads shared by all downloads, and holds up while the
+    lines already received are not consumed.
+    """
+    lines = LineStream()
+    download_pool().apply_async(lines.fill_from, (tftpy.TftpClient(server, port), remote_filename))
+    return lines
 
 
-class FakeFile(object):
+def download_pool():
+    with _download_pool_lock:
+        if not _download_pool:
+            _download_pool.append(ThreadPool(MAX_DOWNLOADS))
+        return _download_pool[0]
+
+
+class LineStream(object):
+    """
+    Lines of a file written a block at a time by another thread.  Reading
+    them fails once the download started and nothing came for STALLED_AFTER
+    seconds, and stopping to read them stops the download.
+    """
+    MAX_PENDING_BLOCKS = 64
+    STALLED_AFTER = 60
+
     def __init__(self):
-        self.content = ""
-        self.closed = True
+        self.closed = True  # tftpy closes open files, the end of the download is queued instead
+        self.started = False
+        self.abandoned = False
+        self.blocks = Queue(maxsize=self.MAX_PENDING_BLOCKS)
+
+    def fill_from(self, client, remote_filename):
+        self.started = True
+        try:
+            client.download(remote_filename, self)
+            self._put(_END)
+        except Exception as e:
+            self._put(_Failure(e))
 
     def write(self, data):
-        self.content += data
+        if self.abandoned:
+            raise IOError("Nobody is reading the download anymore")
+        self._put(data)
+
+    def _put(self, block):
+        while not self.abandoned:
+            try:
+                self.blocks.put(block, timeout=1)
+                return
+            except Full:
+                pass
+
+    def __iter__(self):
+        partial_line = ""
+        try:
+            while True:
+                block = self._next_block()
+                if block is _END:
+                    break
+                if isinstance(block, _Failure):
+                    raise block.exception
+
+                lines = (partial_line + block).split("\n")
+                partial_line = lines.pop()
+                for line in lines:
+                    yield line
+            yield partial_line
+        finally:
+            self.abandoned = True
+            self._discard_pending_blocks()
+
+    def _next_block(self):
+        while True:
+            try:
+                return self.blocks.get(timeout=self.STALLED_AFTER)
+            except Empty:
+                if self.started:
+                    raise IOError("Nothing downloaded for %s seconds" % self.STALLED_AFTER)
+
+    def _discard_pending_blocks(self):
+        try:
+            while True:
+                self.blocks.get_nowait()
+        except Empty:
+            pass
+
+
+_END = object()
+
 
+class _Failure(object):
+    def __init__(self, exception):
+        self.exception = exception
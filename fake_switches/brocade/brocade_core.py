@@ -17,7 +17,7 @@ import logging
 from fake_switches.brocade.command_processor.default import DefaultCommandProcessor
 from fake_switches.brocade.command_processor.piping import PipingProcessor
 from fake_switches.command_processing.shell_session import ShellSession
-from fake_switches.terminal import LoggingTerminalController
+from fake_switches.terminal import LoggingTerminalController, BufferedTerminalController
 
 
 class BrocadeSwitchCore(object):
@@ -35,7 +35,7 @@ class BrocadeSwitchCore(object):
 
         command_processor = DefaultCommandProcessor(
             switch_configuration=self.switch_configuration,
-            terminal_controller=LoggingTerminalController(self.logger, terminal_controller),
+            terminal_controller=BufferedTerminalController(LoggingTerminalController(self.logger, terminal_controller)),
             piping_processor=PipingProcessor(self.logger),
             logger=self.logger)
 
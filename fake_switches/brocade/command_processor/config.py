@@ -54,7 +54,10 @@ class ConfigCommandProcessor(BaseCommandProcessor):
             if bound_ve:
                 self.switch_configuration.remove_port(bound_ve)
 
-            for port in self.switch_configuration.ports:
+            for port in self.switch_configuration.in_port_order(
+                    self.switch_configuration.get_ports_by_access_vlan(vlan.number) +
+                    self.switch_configuration.get_ports_by_native_vlan(vlan.number) +
+                    self.switch_configuration.get_ports_by_tagged_vlan(vlan.number)):
                 if port.trunk_vlans is None:
                     if port.access_vlan == vlan.number:
                         port.access_vlan = None
@@ -100,7 +103,7 @@ class ConfigCommandProcessor(BaseCommandProcessor):
         if "vrf".startswith(cmd):
             self.switch_configuration.remove_vrf(args[0])
         elif "route".startswith(cmd):
-            self.switch_configuration.remove_static_route(args[0], args[1])
+            self.switch_configuration.remove_static_route(*args[:3])
 
     def do_ip(self, cmd, *args):
         if "vrf".startswith(cmd):
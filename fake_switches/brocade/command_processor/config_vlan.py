@@ -14,6 +14,7 @@
 
 from fake_switches.command_processing.base_command_processor import BaseCommandProcessor
 from fake_switches.switch_configuration import split_port_name, VlanPort
+from fake_switches.vlan_set import VlanSet
 
 
 class ConfigVlanCommandProcessor(BaseCommandProcessor):
@@ -55,7 +56,7 @@ class ConfigVlanCommandProcessor(BaseCommandProcessor):
         port = self.switch_configuration.get_port_by_partial_name(" ".join(args))
         if port is not None:
             if port.trunk_vlans is None:
-                port.trunk_vlans = []
+                port.trunk_vlans = VlanSet()
                 port.trunk_native_vlan = port.access_vlan or 1
                 port.access_vlan = None
             if self.vlan.number not in port.trunk_vlans:
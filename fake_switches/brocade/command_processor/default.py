@@ -20,11 +20,8 @@ class DefaultCommandProcessor(BaseCommandProcessor):
     def get_prompt(self):
         return "SSH@%s>" % self.switch_configuration.name
 
-    def delegate_to_sub_processor(self, line):
-        processed = self.sub_processor.process_command(line)
-        if self.sub_processor.is_done:
-            self.is_done = True
-        return processed
+    def on_sub_processor_done(self):
+        self.is_done = True
 
     def do_enable(self):
         self.write("Password:")
@@ -18,6 +18,7 @@ from fake_switches.brocade.command_processor import explain_missing_port
 from fake_switches.brocade.command_processor.config import ConfigCommandProcessor
 from fake_switches.command_processing.switch_tftp_parser import SwitchTftpParser
 from fake_switches.command_processing.base_command_processor import BaseCommandProcessor
+from fake_switches.command_processing.command_tree import CommandTree
 from fake_switches.switch_configuration import split_port_name, VlanPort
 
 
@@ -28,118 +29,134 @@ class EnabledCommandProcessor(BaseCommandProcessor):
     def do_configure(self, *_):
         self.move_to(ConfigCommandProcessor)
 
+    show_commands = CommandTree({
+        "running-config vlan": "show_run_vlan",
+        "running-config interface": "show_run_int",
+        "interfaces": "show_int",
+        "vlan": "show_vlan",
+        "vlan brief": "show_vlan_brief",
+        "vlan ethernet": "show_vlan_int",
+        "ip route static": "show_ip_route_static",
+        "version": "show_version",
+    })
+
     def do_show(self, *args):
-        if "running-config".startswith(args[0]):
-            if "vlan".startswith(args[1]):
-                self.show_run_vlan()
-            if "interface".startswith(args[1]):
-                self.show_run_int(args)
-        elif "interfaces".startswith(args[0]):
-            self.show_int(args)
-        elif "vlan".startswith(args[0]):
-            if args[1].isdigit():
-                self._show_vlan(int(args[1]))
-            elif "brief".startswith(args[1]):
-                self.show_vlan_brief()
-            elif "ethernet".startswith(args[1]):
-                self.show_vlan_int(args)
-            else:
-                self.write_line("Invalid input -> %s" % args[1])
-                self.write_line("Type ? for a list")
-        elif "ip".startswith(args[0]) and "route".startswith(args[1]) and "static".startswith(args[2]):
-            routes = self.switch_configuration.static_routes
-            if routes:
-                self.write_line("        Destination        Gateway        Port          Cost          Type Uptime src-vrf")
-            for n, route in enumerate(routes):
-                self.write_line("{index:<8}{destination:<18} {next_hop:}".format(index=n+1, destination=str(route.dest), next_hop=str(route.next_hop)))
-            self.write_line("")
-        elif "version".startswith(args[0]):
-            self.show_version()
+        self.dispatch("show", self.show_commands, args)
+
+    def write_ambiguous_command(self, words):
+        self.write_line("Ambiguous input -> %s" % words[-1])
+        self.write_line("Type ? for a list")
+
+    def show_vlan(self, *args):
+        if len(args) > 1 and args[1].isdigit():
+            self._show_vlan(int(args[1]))
+        elif len(args) > 1:
+            self.write_line("Invalid input -> %s" % args[1])
+            self.write_line("Type ? for a list")
+
+    def show_ip_route_static(self, *args):
+        routes = self.switch_configuration.static_routes
+        if routes:
+            self.write_line("        Destination        Gateway        Port          Cost          Type Uptime src-vrf")
+        for n, route in enumerate(routes):
+            self.write_line("{index:<8}{destination:<18} {next_hop:}".format(index=n+1, destination=str(route.dest), next_hop=str(route.next_hop)))
+        self.write_line("")
 
     def do_ncopy(self, protocol, url, filename, target):
-        try:
-            SwitchTftpParser(self.switch_configuration).parse(url, filename, ConfigCommandProcessor)
-            self.write_line("done")
-        except Exception as e:
-            self.logger.warning("tftp parsing went wrong : %s" % str(e))
-            self.write_line("%s: Download to %s failed - Session timed out" % (protocol.upper(), target))
+        parser = SwitchTftpParser(self.switch_configuration)
+        copied = parser.parse_async(url, filename, ConfigCommandProcessor, progress=self.copy_progress)
+        copied.addCallbacks(self.copy_done, self.copy_failed, errbackArgs=(protocol, target))
+        self.wait_for(copied)
+
+    def copy_progress(self, lines):
+        self.write_line("%s lines applied" % lines)
+        self.terminal_controller.flush()
+
+    def copy_done(self, _):
+        self.write_line("done")
+
+    def copy_failed(self, failure, protocol, target):
+        self.logger.warning("tftp parsing went wrong : %s" % str(failure.value))
+        self.write_line("%s: Download to %s failed - Session timed out" % (protocol.upper(), target))
 
     def do_skip_page_display(self, *args):
-        pass
+        self.set_terminal_length(0)
 
     def do_write(self, *args):
-        self.switch_configuration.commit()
+        self.wait_for(self.switch_configuration.commit())
 
     def do_exit(self):
         self.is_done = True
 
-    def show_run_vlan(self):
-        self.write_line("spanning-tree")
-        self.write_line("!")
-        self.write_line("!")
+    def show_run_vlan(self, *_):
+        self.write_lines(self.running_vlans())
+
+    def running_vlans(self):
+        yield "spanning-tree"
+        yield "!"
+        yield "!"
         for vlan in sorted(self.switch_configuration.vlans, key=lambda v: v.number):
             if vlan_name(vlan):
-                self.write_line("vlan %d name %s" % (vlan.number, vlan_name(vlan)))
+                yield "vlan %d name %s" % (vlan.number, vlan_name(vlan))
             else:
-                self.write_line("vlan %d" % vlan.number)
+                yield "vlan %d" % vlan.number
 
-            untagged_ports = []
-            for port in self.switch_configuration.ports:
-                if not isinstance(port, VlanPort):
-                    if vlan.number == 1 and port.access_vlan is None and port.trunk_native_vlan is None:
-                        untagged_ports.append(port)
-                    elif port.access_vlan == vlan.number or port.trunk_native_vlan == vlan.number:
-                        untagged_ports.append(port)
+            untagged_ports = self.get_untagged_ports_for(vlan)
+            if vlan.number == 1:
+                untagged_ports = self.switch_configuration.in_port_order(untagged_ports + [
+                    p for p in self.switch_configuration.get_ports_by_access_vlan(None)
+                    if p.trunk_native_vlan is None and not isinstance(p, VlanPort)])
 
             if len(untagged_ports) > 0:
                 if vlan.number == 1:
-                    self.write_line(" no untagged %s" % to_port_ranges(untagged_ports))
+                    yield " no untagged %s" % to_port_ranges(untagged_ports)
                 else:
-                    self.write_line(" untagged %s" % to_port_ranges(untagged_ports))
+                    yield " untagged %s" % to_port_ranges(untagged_ports)
 
-            tagged_ports = [p for p in self.switch_configuration.ports if
-                            p.trunk_vlans and vlan.number in p.trunk_vlans]
+            tagged_ports = self.switch_configuration.get_ports_by_tagged_vlan(vlan.number)
             if tagged_ports:
-                self.write_line(" tagged %s" % to_port_ranges(tagged_ports))
+                yield " tagged %s" % to_port_ranges(tagged_ports)
 
             vif = self.get_interface_vlan_for(vlan)
             if vif is not None:
-                self.write_line(" router-interface %s" % vif.name)
+                yield " router-interface %s" % vif.name
 
-            self.write_line("!")
-        self.write_line("!")
-        self.write_line("")
+            yield "!"
+        yield "!"
+        yield ""
 
-    def show_run_int(self, args):
-        port_list = []
+    def show_run_int(self, *args):
         if len(args) < 3:
-            port_list = sorted(self.switch_configuration.ports, key=lambda e: ("a" if not isinstance(e, VlanPort) else "b") + e.name)
+            self.write_lines(self.running_interfaces(sorted(self.switch_configuration.ports,
+                                                            key=lambda e: ("a" if not isinstance(e, VlanPort) else "b") + e.name)))
         else:
             if "ve".startswith(args[2]):
                 port = self.switch_configuration.get_port_by_partial_name(" ".join(args[2:]))
                 if not port:
                     self.write_line("Error - %s was not configured" % " ".join(args[2:]))
-                else:
-                    port_list = [port]
+                    return
             else:
                 port_type, port_number = split_port_name("".join(args[2:]))
                 port = self.switch_configuration.get_port_by_partial_name(port_number)
                 if not port:
                     self.write_line("")
-                else:
-                    port_list = [port]
-        if len(port_list) > 0:
-            for port in port_list:
-                attributes = get_port_attributes(port)
-                if len(attributes) > 0 or isinstance(port, VlanPort):
-                    self.write_line("interface %s" % port.name)
-                    for a in attributes:
-                        self.write_line(" " + a)
-                    self.write_line("!")
-
-            self.write_line("")
+                    return
+            self.write_lines(self.running_interfaces([port]))
 
-    def show_int(self, args):
+    def running_interfaces(self, ports):
+        for port in ports:
+            attributes = self.switch_configuration.rendered_fragment(
+                (self.__class__, "interface"), port, get_port_attributes)
+            if len(attributes) > 0 or isinstance(port, VlanPort):
+                yield "interface %s" % port.name
+                for a in attributes:
+                    yield " " + a
+                yield "!"
+
+        if len(ports) > 0:
+            yield ""
+
+    def show_int(self, *args):
         ports = []
         port_name = " ".join(args[1:])
         if len(args) > 1:
@@ -174,20 +191,20 @@ class EnabledCommandProcessor(BaseCommandProcessor):
                 else:
                     self.write_line("  No port name")
 
-    def show_vlan_brief(self):
+    def show_vlan_brief(self, *_):
         self.write_line("")
         self.write_line("VLAN     Name       Encap ESI                              Ve    Pri Ports")
         self.write_line("----     ----       ----- ---                              ----- --- -----")
         for vlan in sorted(self.switch_configuration.vlans, key=lambda v: v.number):
-            ports = [port for port in self.switch_configuration.ports
-                     if port.access_vlan == vlan.number or (port.access_vlan is None and vlan.number == 1)]
+            ports = self.switch_configuration.get_ports_by_access_vlan(
+                *((vlan.number, None) if vlan.number == 1 else (vlan.number,)))
             self.write_line("%-4s     %-10s                                        -     -%s" % (
                 vlan.number,
                 vlan_name(vlan)[:10] if vlan_name(vlan) else "[None]",
                 ("   Untagged Ports : %s" % to_port_ranges(ports)) if ports else ""
             ))
 
-    def show_vlan_int(self, args):
+    def show_vlan_int(self, *args):
         port = self.switch_configuration.get_port_by_partial_name(" ".join(args[1:]))
         if port:
             untagged_vlan = port.access_vlan or (port.trunk_native_vlan if port.trunk_native_vlan != 1 else None)
@@ -257,7 +274,7 @@ class EnabledCommandProcessor(BaseCommandProcessor):
                      if isinstance(p, VlanPort) and p.vlan_id == vlan.number),
                     None)
 
-    def show_version(self):
+    def show_version(self, *_):
         self.write_line("System: NetIron CER (Serial #: 1P2539K036,  Part #: 40-1000617-02)")
         self.write_line("License: RT_SCALE, ADV_SVCS_PREM (LID: XXXXXXXXXX)")
         self.write_line("Boot     : Version 5.8.0T185 Copyright (c) 1996-2014 Brocade Communications Systems, Inc.")
@@ -279,14 +296,19 @@ class EnabledCommandProcessor(BaseCommandProcessor):
         self.write_line("System uptime is 109 days 4 hours 39 minutes 4 seconds")
 
     def get_interface_ports_for(self, vlan):
-        vlan_ports = {"tagged": [], "untagged": []}
-        for port in self.switch_configuration.ports:
-            if not isinstance(port, VlanPort):
-                if port.access_vlan == vlan.number or port.trunk_native_vlan == vlan.number:
-                    vlan_ports["untagged"].append(port)
-                elif port.trunk_vlans and vlan.number in port.trunk_vlans:
-                    vlan_ports["tagged"].append(port)
-        return vlan_ports
+        untagged_ports = self.get_untagged_ports_for(vlan)
+        untagged = set(untagged_ports)
+        return {
+            "untagged": untagged_ports,
+            "tagged": [p for p in self.switch_configuration.get_ports_by_tagged_vlan(vlan.number)
+                       if p not in untagged and not isinstance(p, VlanPort)]
+        }
+
+    def get_untagged_ports_for(self, vlan):
+        conf = self.switch_configuration
+        return [p for p in conf.in_port_order(conf.get_ports_by_access_vlan(vlan.number) +
+                                              conf.get_ports_by_native_vlan(vlan.number))
+                if not isinstance(p, VlanPort)]
 
 
 def port_index(port):
@@ -18,7 +18,7 @@ from fake_switches.cisco.command_processor.default import DefaultCommandProcesso
 from fake_switches.cisco.command_processor.enabled import EnabledCommandProcessor
 from fake_switches.cisco.command_processor.piping import PipingProcessor
 from fake_switches.command_processing.shell_session import ShellSession
-from fake_switches.terminal import LoggingTerminalController
+from fake_switches.terminal import LoggingTerminalController, BufferedTerminalController
 
 
 class CiscoSwitchCore(object):
@@ -41,7 +41,7 @@ class CiscoSwitchCore(object):
         return CiscoShellSession(
             processor(
                 self.switch_configuration,
-                LoggingTerminalController(self.logger, terminal_controller),
+                BufferedTerminalController(LoggingTerminalController(self.logger, terminal_controller)),
                 self.logger,
                 PipingProcessor(self.logger)))
 
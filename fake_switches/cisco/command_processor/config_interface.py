@@ -16,6 +16,7 @@ from netaddr import IPNetwork
 from netaddr.ip import IPAddress
 
 from fake_switches.switch_configuration import VlanPort
+from fake_switches.vlan_set import VlanSet
 from fake_switches.command_processing.base_command_processor import BaseCommandProcessor
 
 
@@ -41,12 +42,10 @@ class ConfigInterfaceCommandProcessor(BaseCommandProcessor):
                 self.port.trunk_vlans += parse_vlan_list(args[4])
         elif args[0:4] == ("trunk", "allowed", "vlan", "remove"):
             if self.port.trunk_vlans is None:
-                self.port.trunk_vlans = list(range(1, 4097))
-            for v in parse_vlan_list(args[4]):
-                if v in self.port.trunk_vlans:
-                    self.port.trunk_vlans.remove(v)
+                self.port.trunk_vlans = VlanSet.of_range(1, 4096)
+            self.port.trunk_vlans -= parse_vlan_list(args[4])
         elif args[0:4] == ("trunk", "allowed", "vlan", "none"):
-            self.port.trunk_vlans = []
+            self.port.trunk_vlans = VlanSet()
         elif args[0:4] == ("trunk", "allowed", "vlan", "all"):
             self.port.trunk_vlans = None
         elif args[0:3] == ("trunk", "allowed", "vlan"):
@@ -279,13 +278,13 @@ class ConfigInterfaceCommandProcessor(BaseCommandProcessor):
 
 def parse_vlan_list(param):
     ranges = param.split(",")
-    vlans = []
+    vlans = VlanSet()
     for r in ranges:
         if "-" in r:
             start, stop = r.split("-")
-            vlans += [v for v in range(int(start), int(stop) + 1)]
+            vlans.add_range(int(start), int(stop))
         else:
-            vlans.append(int(r))
+            vlans.add(int(r))
 
     return vlans
 
@@ -16,14 +16,19 @@ from functools import partial
 
 import re
 import textwrap
+
+from twisted.internet import defer
+
 from fake_switches.command_processing.switch_tftp_parser import SwitchTftpParser
 from fake_switches.command_processing.base_command_processor import BaseCommandProcessor
+from fake_switches.command_processing.command_tree import CommandTree
 from fake_switches.cisco.command_processor.config import ConfigCommandProcessor
 from fake_switches.switch_configuration import VlanPort, AggregatedPort
-from fake_switches import group_sequences
+from fake_switches.vlan_set import VlanSet
 
 
 class EnabledCommandProcessor(BaseCommandProcessor):
+    more_prompt = " --More-- "
 
     def get_prompt(self):
         return self.switch_configuration.name + "#"
@@ -35,132 +40,147 @@ class EnabledCommandProcessor(BaseCommandProcessor):
         self.write_line("Enter configuration commands, one per line.  End with CNTL/Z.")
         self.move_to(ConfigCommandProcessor)
 
+    show_commands = CommandTree({
+        "running-config": "show_running_config",
+        "running-config vlan": "show_running_config_vlan",
+        "running-config interface": "show_running_config_interface",
+        "vlan": "show_vlan",
+        "etherchannel summary": "show_etherchannel_summary",
+        "ip interface": "show_ip_interface",
+        "ip route static": "show_ip_route_static",
+        "version": "show_version",
+    })
+
     def do_show(self, *args):
-        if "running-config".startswith(args[0]):
-            if len(args) < 2:
-                self.show_run()
-            elif "vlan".startswith(args[1]):
-                self.write_line("Building configuration...")
-                self.write_line("")
-                self.write_line("Current configuration:")
-                for vlan in self.switch_configuration.vlans:
-                    if vlan.number == int(args[2]):
-                        self.write_line("\n".join(["!"] + build_running_vlan(vlan)))
-                self.write_line("end")
-                self.write_line("")
-            elif "interface".startswith(args[1]):
-                if_name = "".join(args[2:])
-                port = self.switch_configuration.get_port_by_partial_name(if_name)
+        self.dispatch("show", self.show_commands, args)
 
-                if port:
-                    self.write_line("Building configuration...")
-                    self.write_line("")
+    def show_running_config(self, *args):
+        if len(args) < 2:
+            self.show_run()
 
-                    data = ["!"] + build_running_interface(port) + ["end", ""]
+    def show_running_config_vlan(self, *args):
+        self.write_line("Building configuration...")
+        self.write_line("")
+        self.write_line("Current configuration:")
+        for vlan in self.switch_configuration.vlans:
+            if vlan.number == int(args[2]):
+                self.write_line("\n".join(["!"] + build_running_vlan(vlan)))
+        self.write_line("end")
+        self.write_line("")
 
-                    self.write_line("Current configuration : %i bytes" % (len("\n".join(data)) + 1))
-                    [self.write_line(l) for l in data]
-                else:
-                    self.write_line("                               ^")
-                    self.write_line("% Invalid input detected at '^' marker.")
-                    self.write_line("")
+    def show_running_config_interface(self, *args):
+        if_name = "".join(args[2:])
+        port = self.switch_configuration.get_port_by_partial_name(if_name)
 
-        elif "vlan".startswith(args[0]):
+        if port:
+            self.write_line("Building configuration...")
             self.write_line("")
-            self.write_line("VLAN Name                             Status    Ports")
-            self.write_line("---- -------------------------------- --------- -------------------------------")
-            for vlan in sorted(self.switch_configuration.vlans, key=lambda v: v.number):
-                ports = [port.get_subname(length=2) for port in self.switch_configuration.ports
-                         if port.access_vlan == vlan.number or (vlan.number == 1 and port.access_vlan is None)]
-                self.write_line("%-4s %-32s %s%s" % (
-                    vlan.number,
-                     vlan_name(vlan) if vlan_name(vlan) else "VLAN%s" % vlan.number,
-                    "active",
-                    ("    " + ", ".join(ports)) if ports else ""
-                ))
-            if len(args) == 1:
-                self.write_line("")
-                self.write_line("VLAN Type  SAID       MTU   Parent RingNo BridgeNo Stp  BrdgMode Trans1 Trans2")
-                self.write_line("---- ----- ---------- ----- ------ ------ -------- ---- -------- ------ ------")
-                for vlan in sorted(self.switch_configuration.vlans, key=lambda v: v.number):
-                    self.write_line("%-4s enet  10%04d     1500  -      -      -        -    -        0      0" % (vlan.number, vlan.number))
-                self.write_line("")
-                self.write_line("Remote SPAN VLANs")
-                self.write_line("------------------------------------------------------------------------------")
-                self.write_line("")
-                self.write_line("")
-                self.write_line("Primary Secondary Type              Ports")
-                self.write_line("------- --------- ----------------- ------------------------------------------")
-                self.write_line("")
-        elif "etherchannel".startswith(args[0]) and len(args) == 2 and "summary".startswith(args[1]):
-            ports = sorted(self.switch_configuration.ports, key=lambda x: x.name)
-            port_channels = sorted(
-                [p for p in ports if isinstance(p, AggregatedPort)],
-                key=port_channel_number)
-            self.write_line("Flags:  D - down        P - bundled in port-channel")
-            self.write_line("        I - stand-alone s - suspended")
-            self.write_line("        H - Hot-standby (LACP only)")
-            self.write_line("        R - Layer3      S - Layer2")
-            self.write_line("        U - in use      f - failed to allocate aggregator")
+
+            data = ["!"] + build_running_interface(port) + ["end", ""]
+
+            self.write_line("Current configuration : %i bytes" % configuration_size(data))
+            self.write_lines(data)
+        else:
+            self.write_line("                               ^")
+            self.write_line("% Invalid input detected at '^' marker.")
+            self.write_line("")
+
+    def show_vlan(self, *args):
+        self.write_line("")
+        self.write_line("VLAN Name                             Status    Ports")
+        self.write_line("---- -------------------------------- --------- -------------------------------")
+        for vlan in sorted(self.switch_configuration.vlans, key=lambda v: v.number):
+            ports = [port.get_subname(length=2)
+                     for port in self.switch_configuration.get_ports_by_access_vlan(*access_vlan_values(vlan))]
+            self.write_line("%-4s %-32s %s%s" % (
+                vlan.number,
+                 vlan_name(vlan) if vlan_name(vlan) else "VLAN%s" % vlan.number,
+                "active",
+                ("    " + ", ".join(ports)) if ports else ""
+            ))
+        if len(args) == 1:
             self.write_line("")
-            self.write_line("        M - not in use, minimum links not met")
-            self.write_line("        u - unsuitable for bundling")
-            self.write_line("        w - waiting to be aggregated")
-            self.write_line("        d - default port")
+            self.write_line("VLAN Type  SAID       MTU   Parent RingNo BridgeNo Stp  BrdgMode Trans1 Trans2")
+            self.write_line("---- ----- ---------- ----- ------ ------ -------- ---- -------- ------ ------")
+            for vlan in sorted(self.switch_configuration.vlans, key=lambda v: v.number):
+                self.write_line("%-4s enet  10%04d     1500  -      -      -        -    -        0      0" % (vlan.number, vlan.number))
             self.write_line("")
+            self.write_line("Remote SPAN VLANs")
+            self.write_line("------------------------------------------------------------------------------")
             self.write_line("")
-            self.write_line("Number of channel-groups in use: {}".format(len(port_channels)))
-            self.write_line("Number of aggregators:           {}".format(len(port_channels)))
             self.write_line("")
-            self.write_line("Group  Port-channel  Protocol    Ports")
-            self.write_line("------+-------------+-----------+-----------------------------------------------")
-            for port_channel in port_channels:
-                members = [short_name(p) for p in ports
-                           if p.aggregation_membership == port_channel.name]
-                self.write_line(
-                    "{: <6} {: <13} {: <11} {}".format(
-                        port_channel_number(port_channel),
-                        "{}(S{})".format(short_name(port_channel), "U" if members else ""),
-                        "  LACP",
-                        "  ".join("{}(P)".format(m) for m in members)))
+            self.write_line("Primary Secondary Type              Ports")
+            self.write_line("------- --------- ----------------- ------------------------------------------")
             self.write_line("")
-        elif "ip".startswith(args[0]):
-            if "interface".startswith(args[1]):
-                if_list = None
-                if len(args) > 2:
-                    interface = self.switch_configuration.get_port_by_partial_name("".join(args[2:]))
-                    if interface:
-                        if_list = [interface]
-                    else:
-                        self.write_line("                                 ^")
-                        self.write_line("% Invalid input detected at '^' marker.")
-                        self.write_line("")
-                else:
-                    if_list = sorted(self.switch_configuration.ports, key=lambda e: ("a" if isinstance(e, VlanPort) else "b") + e.name)
-                if if_list:
-                    for interface in if_list:
-                        self.write_line("%s is down, line protocol is down" % interface.name)
-                        if not isinstance(interface, VlanPort):
-                            self.write_line("  Internet protocol processing disabled")
-                        else:
-                            if len(interface.ips) == 0:
-                                self.write_line("  Internet protocol processing disabled")
-                            else:
-                                self.write_line("  Internet address is %s" % interface.ips[0])
-                                for ip in interface.ips[1:]:
-                                    self.write_line("  Secondary address %s" % ip)
-                                self.write_line("  Outgoing access list is %s" % (interface.access_group_out if interface.access_group_out else "not set"))
-                                self.write_line("  Inbound  access list is %s" % (interface.access_group_in if interface.access_group_in else "not set"))
-                                if interface.vrf is not None:
-                                    self.write_line("  VPN Routing/Forwarding \"%s\"" % interface.vrf.name)
-            elif "route".startswith(args[1]):
-                if "static".startswith(args[2]):
-                    routes = self.switch_configuration.static_routes
-                    for route in routes:
-                        self.write_line("S        {0} [x/y] via {1}".format(route.destination, route.next_hop))
+
+    def show_etherchannel_summary(self, *args):
+        if len(args) != 2:
+            return
+        ports = sorted(self.switch_configuration.ports, key=lambda x: x.name)
+        port_channels = sorted(
+            [p for p in ports if isinstance(p, AggregatedPort)],
+            key=port_channel_number)
+        self.write_line("Flags:  D - down        P - bundled in port-channel")
+        self.write_line("        I - stand-alone s - suspended")
+        self.write_line("        H - Hot-standby (LACP only)")
+        self.write_line("        R - Layer3      S - Layer2")
+        self.write_line("        U - in use      f - failed to allocate aggregator")
+        self.write_line("")
+        self.write_line("        M - not in use, minimum links not met")
+        self.write_line("        u - unsuitable for bundling")
+        self.write_line("        w - waiting to be aggregated")
+        self.write_line("        d - default port")
+        self.write_line("")
+        self.write_line("")
+        self.write_line("Number of channel-groups in use: {}".format(len(port_channels)))
+        self.write_line("Number of aggregators:           {}".format(len(port_channels)))
+        self.write_line("")
+        self.write_line("Group  Port-channel  Protocol    Ports")
+        self.write_line("------+-------------+-----------+-----------------------------------------------")
+        for port_channel in port_channels:
+            members = [short_name(p) for p in ports
+                       if p.aggregation_membership == port_channel.name]
+            self.write_line(
+                "{: <6} {: <13} {: <11} {}".format(
+                    port_channel_number(port_channel),
+                    "{}(S{})".format(short_name(port_channel), "U" if members else ""),
+                    "  LACP",
+                    "  ".join("{}(P)".format(m) for m in members)))
+        self.write_line("")
+
+    def show_ip_interface(self, *args):
+        if_list = None
+        if len(args) > 2:
+            interface = self.switch_configuration.get_port_by_partial_name("".join(args[2:]))
+            if interface:
+                if_list = [interface]
+            else:
+                self.write_line("                                 ^")
+                self.write_line("% Invalid input detected at '^' marker.")
                 self.write_line("")
-        elif "version".startswith(args[0]):
-            self.show_version()
+        else:
+            if_list = sorted(self.switch_configuration.ports, key=lambda e: ("a" if isinstance(e, VlanPort) else "b") + e.name)
+        if if_list:
+            for interface in if_list:
+                self.write_line("%s is down, line protocol is down" % interface.name)
+                if not isinstance(interface, VlanPort):
+                    self.write_line("  Internet protocol processing disabled")
+                else:
+                    if len(interface.ips) == 0:
+                        self.write_line("  Internet protocol processing disabled")
+                    else:
+                        self.write_line("  Internet address is %s" % interface.ips[0])
+                        for ip in interface.ips[1:]:
+                            self.write_line("  Secondary address %s" % ip)
+                        self.write_line("  Outgoing access list is %s" % (interface.access_group_out if interface.access_group_out else "not set"))
+                        self.write_line("  Inbound  access list is %s" % (interface.access_group_in if interface.access_group_in else "not set"))
+                        if interface.vrf is not None:
+                            self.write_line("  VPN Routing/Forwarding \"%s\"" % interface.vrf.name)
+
+    def show_ip_route_static(self, *args):
+        for route in self.switch_configuration.static_routes.sorted():
+            self.write_line("S        {0} [x/y] via {1}".format(route.destination, route.next_hop))
+        self.write_line("")
 
     def do_copy(self, source_url, destination_url):
         dest_protocol, dest_file = destination_url.split(":")
@@ -169,58 +189,77 @@ class EnabledCommandProcessor(BaseCommandProcessor):
 
     def continue_validate_copy(self, source_url, _):
         self.write_line("Accessing %s..." % source_url)
-        try:
-            url, filename = re.match('tftp://([^/]*)/(.*)', source_url).group(1, 2)
-            SwitchTftpParser(self.switch_configuration).parse(url, filename, ConfigCommandProcessor)
-            self.write_line("Done (or some official message...)")
-        except Exception as e:
-            self.logger.warning("tftp parsing went wrong : %s" % str(e))
-            self.write_line("Error opening %s (Timed out)" % source_url)
+        source = re.match('tftp://([^/]*)/(.*)', source_url)
+        if source:
+            url, filename = source.group(1, 2)
+            parser = SwitchTftpParser(self.switch_configuration)
+            copied = parser.parse_async(url, filename, ConfigCommandProcessor, progress=self.copy_progress)
+        else:
+            copied = defer.fail(ValueError("Unsupported source %s" % source_url))
+        copied.addCallbacks(self.copy_done, self.copy_failed, errbackArgs=(source_url,))
+        self.wait_for(copied)
+
+    def copy_progress(self, lines):
+        self.write_line("%s lines applied" % lines)
+        self.terminal_controller.flush()
+
+    def copy_done(self, _):
+        self.write_line("Done (or some official message...)")
+
+    def copy_failed(self, failure, source_url):
+        self.logger.warning("tftp parsing went wrong : %s" % str(failure.value))
+        self.write_line("Error opening %s (Timed out)" % source_url)
 
     def do_terminal(self, *args):
-        pass
+        if len(args) == 2 and "length".startswith(args[0]) and args[1].isdigit():
+            self.set_terminal_length(args[1])
 
     def do_write(self, *args):
         self.write_line("Building configuration...")
-        self.switch_configuration.commit()
-        self.write_line("OK")
+        self.wait_for(self.switch_configuration.commit(), self.write_line, "OK")
 
     def do_exit(self):
         self.is_done = True
 
     def show_run(self):
+        self.write_line("Building configuration...")
+        self.write_line("")
 
-        all_data = [
-            "version 12.1",
-            "!",
-            "hostname %s" % self.switch_configuration.name,
-            "!",
-            "!",
-        ]
+        self.write_line("Current configuration : %i bytes" % sum(
+            self.switch_configuration.rendered_size(*fragment) for fragment in self.running_config_fragments()))
+        self.write_pages(self.running_config())
+
+    def running_config(self):
+        for fragment in self.running_config_fragments():
+            for line in self.switch_configuration.rendered_fragment(*fragment):
+                yield line
+
+    def running_config_fragments(self):
+        yield None, None, self.running_config_header
         for vlan in self.switch_configuration.vlans:
-            all_data = all_data + build_running_vlan(vlan) + ["!"]
+            yield (self.__class__, "vlan"), vlan, build_running_vlan_section
         for interface in sorted(self.switch_configuration.ports, key=lambda e: ("b" if isinstance(e, VlanPort) else "a") + e.name):
-            all_data = all_data + build_running_interface(interface) + ["!"]
-        if self.switch_configuration.static_routes:
-            for route in self.switch_configuration.static_routes:
-                all_data.append(build_static_routes(route))
-            all_data.append("!")
+            yield (self.__class__, "interface"), interface, build_running_interface_section
+        yield None, None, self.running_config_footer
 
-        all_data += ["end", ""]
+    def running_config_header(self, _):
+        return ["version 12.1", "!", "hostname %s" % self.switch_configuration.name, "!", "!"]
 
-        self.write_line("Building configuration...")
-        self.write_line("")
+    def running_config_footer(self, _):
+        lines = [build_static_routes(route) for route in self.switch_configuration.static_routes]
+        return lines + (["!"] if lines else []) + ["end", ""]
 
-        self.write_line("Current configuration : %i bytes" % (len("\n".join(all_data)) + 1))
-        [self.write_line(l) for l in all_data]
-
-    def show_version(self):
+    def show_version(self, *_):
         self.write_line(version_text(
             hostname=self.switch_configuration.name,
             vlan_port_count=len(self.switch_configuration.get_vlan_ports()),
             port_count=len(self.switch_configuration.get_physical_ports()),
         ))
 
+def configuration_size(lines):
+    return sum(len(line) + 1 for line in lines)
+
+
 def strip_leading_slash(dest_file):
     return dest_file[1:]
 
@@ -237,6 +276,14 @@ def build_running_vlan(vlan):
     return data
 
 
+def build_running_vlan_section(vlan):
+    return build_running_vlan(vlan) + ["!"]
+
+
+def build_running_interface_section(port):
+    return build_running_interface(port) + ["!"]
+
+
 def build_running_interface(port):
     data = [
         "interface %s" % port.name
@@ -299,6 +346,10 @@ def build_running_interface(port):
     return data
 
 
+def access_vlan_values(vlan):
+    return [vlan.number, None] if vlan.number == 1 else [vlan.number]
+
+
 def vlan_name(vlan):
     return vlan.name or ("default" if vlan.number == 1 else None)
 
@@ -307,16 +358,14 @@ def to_vlan_ranges(vlans):
     if len(vlans) == 0:
         return "none"
 
-    ranges = group_sequences(vlans, are_in_sequence=lambda a, b: a + 1 == b)
-
-    return ",".join([to_range_string(r) for r in ranges])
+    return ",".join([to_range_string(first, last) for first, last in VlanSet(vlans).ranges()])
 
 
-def to_range_string(array_range):
-    if len(array_range) < 3:
-        return ",".join([str(n) for n in array_range])
+def to_range_string(first, last):
+    if last - first < 2:
+        return ",".join([str(n) for n in range(first, last + 1)])
     else:
-        return "%s-%s" % (array_range[0], array_range[-1])
+        return "%s-%s" % (first, last)
 
 
 def port_channel_number(port):
@@ -13,9 +13,14 @@
 # limitations under the License.
 
 from fake_switches.command_processing.command_processor import CommandProcessor
+from fake_switches.command_processing.command_tree import AmbiguousCommand
+from fake_switches.command_processing.pager import Pager
+from fake_switches.instrumentation import measured, vendor_of
 
 
 class BaseCommandProcessor(CommandProcessor):
+    page_length = 0
+    more_prompt = "--More--"
 
     def __init__(self, switch_configuration, terminal_controller, logger, piping_processor):
         """
@@ -30,10 +35,17 @@ class BaseCommandProcessor(CommandProcessor):
         self.logger = logger
         self.piping_processor = piping_processor
         self.sub_processor = None
+        self.parent = None
+        self.depth = 0
+        self.mode_stack = [self]
         self.continuing_to = None
         self.is_done = False
         self.replace_input = False
         self.awaiting_keystroke = False
+        self.awaiting_result = None
+        self.output_size = 0
+        self.measurement = None
+        self.shows_prompt = True
 
     def process_command(self, line):
         if " | " in line:
@@ -42,23 +54,50 @@ class BaseCommandProcessor(CommandProcessor):
             if not piping_started:
                 return False
 
-        processed = False
+        return self._through_modes(line, BaseCommandProcessor.handle_command)
 
-        if self.sub_processor:
-            processed = self.delegate_to_sub_processor(line)
+    def run_command(self, line):
+        """
+        Runs the line through the modes like process_command, for scripts: no
+        piping is set up for it and no prompt is shown once it completes.
+        """
+        return self._through_modes(line, BaseCommandProcessor.execute_command)
 
-        if not processed:
-            if self.continuing_to:
-                processed = self.continue_command(line)
-            else:
-                processed = self.parse_and_execute_command(line)
+    def _through_modes(self, line, handle):
+        processor = self.active_processor
+        processed = handle(processor, line)
+        while not processed and processor is not self:
+            processor = processor.parent
+            processed = handle(processor, line)
 
-            if not self.continuing_to and not self.awaiting_keystroke and not self.is_done and processed and not self.sub_processor:
-                self.finish_piping()
-                self.show_prompt()
+        while processor.is_done and processor is not self:
+            processor = processor.parent
+            processor.on_sub_processor_done()
+
+        return processed
+
+    @property
+    def active_processor(self):
+        return self.mode_stack[-1]
+
+    def handle_command(self, line):
+        processed = self.execute_command(line)
+
+        if processed and self.is_command_complete():
+            self.finish_piping()
+            self.show_prompt()
 
         return processed
 
+    def execute_command(self, line):
+        if self.continuing_to:
+            return self.continue_command(line)
+        return self.parse_and_execute_command(line)
+
+    def is_command_complete(self):
+        return not self.continuing_to and not self.awaiting_keystroke and not self.awaiting_result \
+            and not self.is_done and not self.sub_processor
+
     def parse_and_execute_command(self, line):
         if line.strip():
             func, args = self.get_command_func(line)
@@ -66,24 +105,47 @@ class BaseCommandProcessor(CommandProcessor):
                 self.logger.debug("%s can't process : %s, falling back to parent" % (self.__class__.__name__, line))
                 return False
             else:
-                func(*args)
+                outer_measurement = self.measurement
+                with measured(vendor_of(self), func.__name__, self.get_output_size) as self.measurement:
+                    func(*args)
+                    if self.is_command_complete():
+                        self.finish_piping()
+                self.measurement = outer_measurement
         return True
 
+    def dispatch(self, command, command_tree, args):
+        try:
+            handler_name = command_tree.resolve(args)
+        except AmbiguousCommand as e:
+            self.write_ambiguous_command([command] + e.words)
+            return
+        if handler_name:
+            if self.measurement is not None:
+                self.measurement.command = handler_name
+            getattr(self, handler_name)(*args)
+
+    def write_ambiguous_command(self, words):
+        self.write_line("% Ambiguous command:  \"{}\"".format(" ".join(words)))
+
     def continue_command(self, line):
         func = self.continuing_to
         self.continue_to(None)
         func(line)
         return True
 
-    def delegate_to_sub_processor(self, line):
-        processed = self.sub_processor.process_command(line)
-        if self.sub_processor.is_done:
-            self.sub_processor = None
-            self.show_prompt()
-        return processed
+    def on_sub_processor_done(self):
+        self.sub_processor = None
+        del self.mode_stack[self.depth + 1:]
+        self.show_prompt()
 
     def move_to(self, new_process_class, *args):
         self.sub_processor = new_process_class(self.switch_configuration, self.terminal_controller, self.logger, self.piping_processor, *args)
+        self.sub_processor.parent = self
+        self.sub_processor.depth = self.depth + 1
+        self.sub_processor.mode_stack = self.mode_stack
+        self.sub_processor.shows_prompt = self.shows_prompt
+        del self.mode_stack[self.depth + 1:]
+        self.mode_stack.append(self.sub_processor)
         self.sub_processor.show_prompt()
 
     def continue_to(self, continuing_action):
@@ -95,14 +157,55 @@ class BaseCommandProcessor(CommandProcessor):
     def write(self, data):
         filtered = self.pipe(data)
         if filtered is not False:
-            self.terminal_controller.write(filtered)
+            self.write_unfiltered(filtered)
+
+    def write_unfiltered(self, data):
+        self.output_size += len(data)
+        self.terminal_controller.write(data)
+
+    def get_output_size(self):
+        return self.output_size
 
     def write_line(self, data):
         self.write(data + "\n")
 
+    def write_lines(self, lines):
+        for line in lines:
+            self.write_line(line)
+
+    def set_terminal_length(self, length):
+        self.terminal_controller.terminal_length = int(length)
+
+    def new_pager(self, lines, page_length=None):
+        length = self.terminal_controller.terminal_length
+        if length is None:
+            length = self.page_length if page_length is None else page_length
+        return Pager(lines, length)
+
+    def write_pages(self, lines, page_length=None):
+        self.show_page(self.new_pager(lines, page_length))
+
+    def show_page(self, pager):
+        self.write_lines(pager.next_page())
+
+        if pager.has_more():
+            self.write(self.more_prompt)
+            self.on_keystroke(self.continue_pages, pager)
+
+    def continue_pages(self, pager, _):
+        self.write_line("")
+
+        self.show_page(pager)
+
+        if not self.awaiting_keystroke:
+            self.finish_piping()
+            self.show_prompt()
+
     def show_prompt(self):
+        if not self.shows_prompt:
+            return
         if self.sub_processor is not None:
-            self.sub_processor.show_prompt()
+            self.active_processor.show_prompt()
         else:
             self.write(self.get_prompt())
 
@@ -120,13 +223,40 @@ class BaseCommandProcessor(CommandProcessor):
 
     def finish_piping(self):
         if self.piping_processor.is_listening():
-            self.piping_processor.stop_listening()
+            remaining = self.piping_processor.stop_listening()
+            if remaining:
+                self.write_unfiltered(remaining)
+
+    def wait_for(self, deferred, callback=None, *args):
+        """
+        Runs callback once deferred fires. Until then this session gets no
+        prompt, while the reactor keeps serving the other sessions.
+        """
+        if deferred.called:
+            deferred.addCallback(lambda _: callback and callback(*args))
+        else:
+            self.awaiting_result = deferred
+            deferred.addCallback(self._resume, callback, args)
+
+    def _resume(self, _, callback, args):
+        self.awaiting_result = None
+        if callback:
+            callback(*args)
+        self.finish_piping()
+        self.show_prompt()
+        self.terminal_controller.flush()
 
     def on_keystroke(self, callback, *args):
+        if self.piping_processor.is_listening():
+            prompt = self.piping_processor.flush()
+            if prompt:
+                self.write_unfiltered(prompt)
+
         def on_keystroke_handler(key):
             self.awaiting_keystroke = False
             self.terminal_controller.remove_any_key_handler()
             callback(*(args + (key,)))
+            self.terminal_controller.flush()
 
         self.terminal_controller.add_any_key_handler(on_keystroke_handler)
         self.awaiting_keystroke = True
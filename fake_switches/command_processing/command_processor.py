@@ -12,26 +12,66 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import re
-
 
 class CommandProcessor(object):
 
     def get_command_func(self, line):
-        if line.startswith("!"):
+        tokens = line.tokens if isinstance(line, TokenizedLine) else tokenize(line)
+        if tokens is None:
             return (lambda: None), []
         else:
-            line_split = line.strip().split()
-            command = line_split[0]
-            args = line_split[1:]
+            command, args = tokens
+            handler_name = dispatch_table(type(self)).get(command)
+            if handler_name is not None:
+                return getattr(self, handler_name, None), list(args)
 
-            if command == "no":
-                command += "_" + args.pop(0)
+        return None, []
 
-            command = re.sub('[-]', "_", command)
 
-            matching = sorted([c for c in dir(self) if c.startswith('do_' + command)])
-            if len(matching) >= 1:
-                return getattr(self, matching[0], None), args
+def tokenize(line):
+    """
+    The command and the arguments get_command_func reads from a line, None
+    for a comment.
+    """
+    if line.startswith("!"):
+        return None
 
-        return None, []
+    line_split = line.strip().split()
+    command = line_split[0]
+    args = line_split[1:]
+
+    if command == "no":
+        command += "_" + args.pop(0)
+
+    return command.replace("-", "_"), args
+
+
+class TokenizedLine(str):
+    """
+    A line carrying its tokens, so that reading lots of lines can tokenize
+    them ahead of running them, in another thread.
+    """
+
+    def __new__(cls, line):
+        tokenized = super(TokenizedLine, cls).__new__(cls, line)
+        tokenized.tokens = tokenize(line) if line.strip() else None
+        return tokenized
+
+
+_dispatch_tables = {}
+
+
+def dispatch_table(processor_class):
+    """
+    Maps every prefix of the do_* handlers of a class to the handler it
+    resolves to: the first one, in sorted order, that starts with it.
+    """
+    table = _dispatch_tables.get(processor_class)
+    if table is None:
+        table = {}
+        for handler_name in sorted((name for name in dir(processor_class) if name.startswith("do_")), reverse=True):
+            command = handler_name[len("do_"):]
+            for length in range(len(command) + 1):
+                table[command[:length]] = handler_name
+        _dispatch_tables[processor_class] = table
+    return table
@@ -0,0 +1,71 @@
+# Copyright 2015-2016 Internap.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+class AmbiguousCommand(Exception):
+    def __init__(self, words, candidates):
+        super(AmbiguousCommand, self).__init__("Ambiguous command: %s" % " ".join(words))
+        self.words = words
+        self.candidates = candidates
+
+
+class CommandTree(object):
+    """
+    Keyword paths of a command mapped to the name of the method handling them.
+
+    Each word typed selects the keyword it is an abbreviation of, as long as
+    only one keyword starts with it. When the next word is not a keyword, the
+    handler of the path resolved so far, if any, handles the command.
+
+    >>> tree = CommandTree({"running-config": "show_run", "running-config interface": "show_run_int",
+    ...                     "version": "show_version", "vlan": "show_vlan"})
+    >>> tree.resolve(["run", "int", "1/1"])
+    'show_run_int'
+    >>> tree.resolve(["vlan", "1000"])
+    'show_vlan'
+    >>> tree.resolve(["v"])
+    Traceback (most recent call last):
+    ...
+    AmbiguousCommand: Ambiguous command: v
+    """
+
+    def __init__(self, commands):
+        self.handler = None
+        self._children = {}
+        self._keywords_by_prefix = {}
+        for path, handler in commands.items():
+            self._add(path.split(), handler)
+
+    def resolve(self, words):
+        node = self
+        for position, word in enumerate(words):
+            keywords = [word] if word in node._children else node._keywords_by_prefix.get(word, [])
+            if len(keywords) > 1:
+                raise AmbiguousCommand(list(words[:position + 1]), sorted(keywords))
+            if not keywords:
+                break
+            node = node._children[keywords[0]]
+        return node.handler
+
+    def _add(self, keywords, handler):
+        if not keywords:
+            self.handler = handler
+            return
+
+        keyword = keywords[0]
+        if keyword not in self._children:
+            self._children[keyword] = CommandTree({})
+            for length in range(1, len(keyword) + 1):
+                self._keywords_by_prefix.setdefault(keyword[:length], []).append(keyword)
+        self._children[keyword]._add(keywords[1:], handler)
@@ -0,0 +1,286 @@
+# Copyright 2016 Internap.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+from collections import OrderedDict
+from copy import copy
+
+from fake_switches.command_processing.piping_processor_base import NotPipingProcessor
+from fake_switches.switch_configuration import Port, Route, VRF, VRRP, Vlan, stored_attributes
+from fake_switches.terminal import NoopTerminalController
+from fake_switches.vlan_set import VlanSet
+
+
+class UnknownTarget(Exception):
+    pass
+
+
+class ConfigurationCompiler(object):
+    """
+    Turns a configuration text into the changes it makes to a
+    SwitchConfiguration, so it can be applied again without going through
+    the command processors.
+
+    The text is processed once, on the configuration given to compile(),
+    while its journal is followed.  The changes are then reduced to their
+    outcome: each vlan or port added is added once with its final
+    attributes and each attribute of an existing one is set once to its
+    final value.  The result can be replayed on any configuration holding
+    the vlans and ports it changes, found by number and by name, and leaves
+    it in the same state as processing the text, with fewer journal entries.
+    """
+
+    def __init__(self, command_processor_class):
+        self.command_processor_class = command_processor_class
+
+    def compile(self, lines, configuration):
+        if hasattr(lines, "split"):
+            lines = lines.split("\n")
+
+        logger = logging.getLogger("fake_switches.%s.compiler" % configuration.name)
+        processor = self.command_processor_class(configuration, NoopTerminalController(), logger,
+                                                 NotPipingProcessor())
+        outcome = _Outcome()
+
+        configuration.subscribe(outcome.follow)
+        try:
+            for line in lines:
+                processor.process_command(line)
+        finally:
+            configuration.unsubscribe(outcome.follow)
+
+        return CompiledConfiguration(*outcome.compiled())
+
+
+class CompiledConfiguration(object):
+    def __init__(self, targets, operations):
+        self.targets = tuple(targets)
+        self.operations = tuple(operations)
+
+    def replay(self, configuration):
+        """
+        Raises UnknownTarget, before changing anything, when a vlan or a port
+        the operations change is missing from the configuration.
+        """
+        targets = [_resolve(configuration, kind, key) for kind, key in self.targets]
+        for operation in self.operations:
+            operation[0](configuration, targets, *operation[1:])
+
+    def __len__(self):
+        return len(self.operations)
+
+
+def _resolve(configuration, kind, key):
+    target = configuration.get_vlan(key) if kind == "vlan" else configuration.get_port(key)
+    if target is None:
+        raise UnknownTarget("{} {} is not in the configuration".format(kind, key))
+    return target
+
+
+class _Outcome(object):
+    def __init__(self):
+        self.vrfs_and_routes = []
+        self.keys = OrderedDict()
+        self.removed = []
+        self.changed = OrderedDict()
+        self.added = OrderedDict()
+
+    def follow(self, change):
+        target = change.target
+        if isinstance(target, VRRP):
+            self._changed(target.port, "vrrps", change)
+        elif isinstance(target, (Vlan, Port)):
+            if change.action == "changed":
+                self._changed(target, change.attribute, change)
+            elif change.action == "added":
+                self.added[target] = None
+            elif self.added.pop(target, self) is self:
+                self._first_seen(target, change)
+                self.changed.pop(target, None)
+                self.removed.append(target)
+        else:
+            self.vrfs_and_routes.append(_vrf_or_route_operation(change.action, target))
+
+    def _changed(self, target, attribute, change):
+        if target not in self.added:
+            self._first_seen(target, change)
+            self.changed.setdefault(target, OrderedDict())[attribute] = None
+
+    def _first_seen(self, target, change):
+        if target not in self.keys:
+            self.keys[target] = _key(target, change)
+
+    def compiled(self):
+        indexes = dict((target, index) for index, target in enumerate(self.keys))
+        operations = list(self.vrfs_and_routes)
+        for target in self.removed:
+            operations.append((_remove_vlan if isinstance(target, Vlan) else _remove_port, indexes[target]))
+        for target, attributes in self.changed.items():
+            stored = dict(stored_attributes(target))
+            for attribute in attributes:
+                value = stored[attribute] if attribute in stored else getattr(target, attribute)
+                operations.append((_set_attribute, indexes[target], attribute, _freeze(value)))
+        for target in self.added:
+            operations.append((_add_vlan if isinstance(target, Vlan) else _add_port, _Recipe(target)))
+        return list(self.keys.values()), operations
+
+
+def _key(target, change):
+    if isinstance(target, Vlan):
+        number = change.old_value if change.target is target and change.attribute == "number" else target.number
+        return "vlan", number
+    name = change.old_value if change.target is target and change.attribute == "name" else target.name
+    return "port", name
+
+
+def _vrf_or_route_operation(action, target):
+    if isinstance(target, VRF):
+        return (_add_vrf, _Copy(target)) if action == "added" else (_remove_vrf, target.name)
+    if isinstance(target, Route):
+        return (_add_static_route, _Copy(target)) if action == "added" else \
+            (_remove_static_route, str(target.destination), str(target.mask), str(target.next_hop), target.vrf)
+    raise ValueError("Cannot compile a change of {!r}".format(target))
+
+
+def _set_attribute(configuration, targets, index, attribute, value):
+    setattr(targets[index], attribute, _thaw(value, configuration))
+
+
+def _add_vlan(configuration, _, recipe):
+    configuration.add_vlan(recipe.thaw(configuration))
+
+
+def _remove_vlan(configuration, targets, index):
+    configuration.remove_vlan(targets[index])
+
+
+def _add_port(configuration, _, recipe):
+    configuration.add_port(recipe.thaw(configuration))
+
+
+def _remove_port(configuration, targets, index):
+    configuration.remove_port(targets[index])
+
+
+def _add_vrf(configuration, _, vrf):
+    configuration.add_vrf(vrf.thaw(configuration))
+
+
+def _remove_vrf(configuration, _, name):
+    configuration.remove_vrf(name)
+
+
+def _add_static_route(configuration, _, route):
+    configuration.add_static_route(route.thaw(configuration))
+
+
+def _remove_static_route(configuration, _, destination, mask, next_hop, vrf_name):
+    configuration.remove_static_route(destination, mask, next_hop, vrf_name)
+
+
+def _freeze(value):
+    if isinstance(value, VRF):
+        return _VrfReference(value.name)
+    if isinstance(value, (Vlan, Port, VRRP)):
+        return _Recipe(value)
+    if isinstance(value, VlanSet):
+        return _Container(VlanSet, list(value))
+    if isinstance(value, list):
+        return _Container(list, [_freeze(item) for item in value])
+    if isinstance(value, dict):
+        return _Container(dict, [(key, _freeze(item)) for key, item in value.items()])
+    return value
+
+
+def _is_frozen(value):
+    return isinstance(value, (_VrfReference, _Container, _Copy, _Recipe))
+
+
+def _thaw(value, configuration):
+    return value.thaw(configuration) if _is_frozen(value) else value
+
+
+class _VrfReference(object):
+    def __init__(self, name):
+        self.name = name
+
+    def thaw(self, configuration):
+        vrf = configuration.get_vrf(self.name)
+        if vrf is None:
+            raise UnknownTarget("vrf {} is not in the configuration".format(self.name))
+        return vrf
+
+
+class _Container(object):
+    def __init__(self, factory, items):
+        self.factory = factory
+        self.items = items
+        values = items if factory is not dict else [item for _, item in items]
+        self.constant = not any(_is_frozen(item) for item in values)
+
+    def thaw(self, configuration):
+        if self.constant:
+            return self.factory(self.items)
+        if self.factory is dict:
+            return dict((key, _thaw(item, configuration)) for key, item in self.items)
+        return self.factory([_thaw(item, configuration) for item in self.items])
+
+
+class _Copy(object):
+    """
+    A route or a vrf.  Their addresses are never modified in place, so they
+    can be shared by the copies.
+    """
+
+    def __init__(self, obj):
+        self.obj = copy(obj)
+
+    def thaw(self, configuration):
+        return copy(self.obj)
+
+
+class _Recipe(object):
+    """
+    How to build a detached copy of a vlan, a port or a vrrp group with the
+    objects_factory of the configuration it is thawed for: the constructor
+    arguments, then the attributes that differ from a newly built one.
+    """
+    CONSTRUCTORS = OrderedDict([
+        ("VRRP", ("group_id",)),
+        ("VlanPort", ("vlan_id", "name")),
+        ("AggregatedPort", ("name",)),
+        ("Port", ("name",)),
+        ("Vlan", ("number",)),
+    ])
+
+    def __init__(self, obj):
+        class_names = [klass.__name__ for klass in type(obj).__mro__]
+        self.kind = next(kind for kind in self.CONSTRUCTORS if kind in class_names)
+        attributes = OrderedDict(stored_attributes(obj))
+        self.arguments = [attributes[name] for name in self.CONSTRUCTORS[self.kind]]
+        defaults = dict(stored_attributes(type(obj)(*self.arguments)))
+        self.attributes = [(attribute, _freeze(value)) for attribute, value in attributes.items()
+                           if attribute not in defaults or not _same(defaults[attribute], value)]
+
+    def thaw(self, configuration):
+        obj = configuration.new(self.kind, *self.arguments)
+        for attribute, value in self.attributes:
+            setattr(obj, attribute, _thaw(value, configuration))
+        return obj
+
+
+def _same(default, value):
+    if isinstance(value, (list, dict, VlanSet)) or isinstance(default, (list, dict, VlanSet)):
+        return False
+    return default == value
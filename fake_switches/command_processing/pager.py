@@ -0,0 +1,50 @@
+# Copyright 2016 Internap.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+_END = object()
+
+
+class Pager(object):
+    """
+    Pages of a listing, its lines being taken from their iterator only as the
+    pages are shown.  An item of the listing can also be a list of lines that
+    stay on the same page.  A page length of 0 shows everything at once.
+
+    >>> pager = Pager(("line %d" % i for i in range(5)), 2)
+    >>> list(pager.next_page())
+    ['line 0', 'line 1']
+    >>> pager.position, pager.has_more()
+    (2, True)
+    >>> list(pager.next_page()), list(pager.next_page()), pager.has_more()
+    (['line 2', 'line 3'], ['line 4'], False)
+    """
+
+    def __init__(self, lines, page_length):
+        self.page_length = page_length
+        self.position = 0
+        self._items = iter(lines)
+        self._next = next(self._items, _END)
+
+    def has_more(self):
+        return self._next is not _END
+
+    def next_page(self):
+        shown = 0
+        while self._next is not _END and (not self.page_length or shown < self.page_length):
+            item = self._next
+            for line in item if isinstance(item, list) else [item]:
+                shown += 1
+                self.position += 1
+                yield line
+            self._next = next(self._items, _END)
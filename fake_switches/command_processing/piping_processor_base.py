@@ -12,6 +12,8 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import re
+
 from fake_switches.command_processing.command_processor import CommandProcessor
 
 
@@ -22,13 +24,21 @@ class PipingProcessorBase(CommandProcessor):
         self.active_command = None
 
     def start_listening(self, command):
-        func, args = self.get_command_func(command)
+        filters = []
+        for stage in command.split(" | "):
+            func, args = self.get_command_func(stage) if stage.strip() else (None, [])
+
+            if not func:
+                self.logger.debug("%s can't process piping : %s" % (self.__class__.__name__, stage))
+                return False
 
-        if not func:
-            self.logger.debug("%s can't process piping : %s" % (self.__class__.__name__, command))
-            return False
+            try:
+                filters.append(func(*args))
+            except re.error:
+                self.logger.debug("%s invalid expression : %s" % (self.__class__.__name__, stage))
+                return False
 
-        self.active_command = func(*args)
+        self.active_command = Pipeline(filters)
         return True
 
     def is_listening(self):
@@ -37,8 +47,13 @@ class PipingProcessorBase(CommandProcessor):
     def pipe(self, data):
         return self.active_command.pipe(data)
 
+    def flush(self):
+        return self.active_command.flush()
+
     def stop_listening(self):
+        remaining = self.active_command.close()
         self.active_command = None
+        return remaining
 
 
 class NotPipingProcessor(PipingProcessorBase):
@@ -46,27 +61,109 @@ class NotPipingProcessor(PipingProcessorBase):
         super(NotPipingProcessor, self).__init__(None)
 
 
-class StartOutputAt(object):
-    def __init__(self, lookup):
-        self.lookup = lookup
-        self.found_lookup = False
+class Pipeline(object):
+    """
+    Cuts the output in lines as it is written and runs every complete line
+    through the filters, each filter receiving what the previous one let
+    through.  A line left incomplete is filtered when the pipeline closes,
+    unless it is flushed first: it then goes out as is, with the rest of that
+    line, like a pager prompt waiting for a key.
+    """
+
+    def __init__(self, filters):
+        self.filters = filters
+        self.partial_line = ""
+        self.flushed_line = False
 
     def pipe(self, data):
+        output = ""
+        if self.flushed_line:
+            rest_of_line, newline, data = data.partition("\n")
+            output = rest_of_line + newline
+            self.flushed_line = not newline
+
+        lines = (self.partial_line + data).split("\n")
+        self.partial_line = lines.pop()
+        for line_filter in self.filters:
+            lines = [out for line in lines for out in line_filter.feed(line)]
+        return output + (_as_output(lines) or "") or False
+
+    def flush(self):
+        flushed, self.partial_line = self.partial_line, ""
+        self.flushed_line = self.flushed_line or bool(flushed)
+        return flushed
+
+    def close(self):
+        lines = [self.partial_line] if self.partial_line else []
+        self.partial_line = ""
+        for line_filter in self.filters:
+            lines = [out for line in lines for out in line_filter.feed(line)] + line_filter.close()
+        return _as_output(lines)
+
+
+def _as_output(lines):
+    return "".join(line + "\n" for line in lines) if lines else False
+
+
+class LineFilter(object):
+    def __init__(self, expression):
+        self.expression = re.compile(expression)
+
+    def feed(self, line):
+        return [line]
+
+    def close(self):
+        return []
+
+
+class StartOutputAt(LineFilter):
+    def __init__(self, expression):
+        super(StartOutputAt, self).__init__(expression)
+        self.found_lookup = False
+
+    def feed(self, line):
         if not self.found_lookup:
-            self.found_lookup = self.lookup in data
+            self.found_lookup = self.expression.search(line) is not None
 
-        if self.found_lookup:
-            return data
-        else:
-            return False
+        return [line] if self.found_lookup else []
 
 
-class Grep(object):
-    def __init__(self, lookup):
-        self.lookup = lookup
+class Grep(LineFilter):
+    def feed(self, line):
+        return [line] if self.expression.search(line) else []
 
-    def pipe(self, data):
-        if self.lookup in data:
-            return data
-        else:
-            return False
+
+class Exclude(LineFilter):
+    def feed(self, line):
+        return [] if self.expression.search(line) else [line]
+
+
+class Section(LineFilter):
+    """
+    Lines matching, with the indented lines following them.
+    """
+
+    def __init__(self, expression):
+        super(Section, self).__init__(expression)
+        self.in_section = False
+
+    def feed(self, line):
+        if line.startswith(" "):
+            return [line] if self.in_section or self.expression.search(line) else []
+
+        self.in_section = self.expression.search(line) is not None
+        return [line] if self.in_section else []
+
+
+class Count(LineFilter):
+    def __init__(self, expression=""):
+        super(Count, self).__init__(expression)
+        self.count = 0
+
+    def feed(self, line):
+        if self.expression.search(line):
+            self.count += 1
+        return []
+
+    def close(self):
+        return ["Number of lines which match regexp = %d" % self.count]
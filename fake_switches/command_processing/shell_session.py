@@ -12,25 +12,145 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from collections import namedtuple
+
+from twisted.internet import defer
+
+from fake_switches.terminal import CapturingTerminalController
+
+CommandResult = namedtuple("CommandResult", ["line", "processed", "output", "pending_output"])
 
 
 class ShellSession(object):
     def __init__(self, command_processor):
         self.command_processor = command_processor
+        self.pending_lines = []
+        self.ended = defer.Deferred()
+        self._draining_after = None
 
         self.command_processor.show_prompt()
+        self.command_processor.terminal_controller.flush()
+
+    @property
+    def active_processor(self):
+        return self.command_processor.active_processor
+
+    @property
+    def awaiting_result(self):
+        for processor in self.command_processor.mode_stack:
+            if processor.awaiting_result:
+                return processor.awaiting_result
+        return None
 
     def receive(self, line):
-        self.command_processor.logger.debug("received: %s" % line)
-        if not self.command_processor.process_command(line):
-            self.command_processor.logger.info("Command not supported : %s" % line)
+        """
+        Runs the line, or queues it while a command waits for its result, the
+        way a switch reads ahead what is typed during a slow command.  Fires
+        ended once a line ends the session.
+        """
+        self.pending_lines.append(line)
+        self.process_pending_lines()
+        return not self.command_processor.is_done
+
+    def process_pending_lines(self, _=None):
+        while self.pending_lines and not self.command_processor.is_done:
+            awaiting_result = self.awaiting_result
+            if awaiting_result is not None:
+                if self._draining_after is not awaiting_result:
+                    self._draining_after = awaiting_result
+                    awaiting_result.addCallback(self.process_pending_lines)
+                return
+            self.execute(self.pending_lines.pop(0))
+
+        if self.command_processor.is_done and not self.ended.called:
+            self.ended.callback(None)
+
+    def execute(self, line):
+        self.command_processor.logger.debug("received: %s", line)
+        processed = self.command_processor.process_command(line)
+        if not processed:
+            self.command_processor.logger.info("Command not supported : %s", line)
 
             self.handle_unknown_command(line)
 
             self.command_processor.show_prompt()
 
-        return not self.command_processor.is_done
+        self.command_processor.terminal_controller.flush()
+        return processed
+
+    def execute_batch(self, lines):
+        """
+        Runs lines one after the other as if they were typed in this session,
+        stopping if one of them ends it, and returns a CommandResult for each
+        line run.  The output is whatever the terminal controller kept for that
+        line, see CapturingTerminalController, prompts included.
+
+        The batch also stops after a line that waits for a result, like a write
+        memory with a commit delay.  The pending_output of its CommandResult
+        is then a deferred firing with the rest of its output once it
+        completes; it is None for the other lines.
+        """
+        terminal_controller = self.command_processor.terminal_controller
+        terminal_controller.pop_output()
+
+        results = []
+        for line in lines:
+            processed = self.execute(line)
+            awaiting_result = self.awaiting_result
+            pending_output = None
+            if awaiting_result is not None:
+                pending_output = defer.Deferred()
+                awaiting_result.addCallback(_fire_with_output, pending_output, terminal_controller)
+            results.append(CommandResult(line, processed, terminal_controller.pop_output(), pending_output))
+            if self.command_processor.is_done or pending_output is not None:
+                break
+        return results
+
+    def execute_script(self, lines):
+        """
+        Runs lines straight through the modes of this session, for scripts
+        pushing many lines: no prompt is shown, no piping is set up, nothing
+        is logged nor flushed and listings are not paged.  Returns a
+        CommandResult per line run with the output of that line alone, and
+        stops like execute_batch does.
+
+        Once the script returns, the session is interactive again: the rest of
+        the output of a line awaiting its result goes to the session's
+        terminal controller, pending_output firing with it as in execute_batch.
+        """
+        session_terminal_controller = self.command_processor.terminal_controller
+        terminal_controller = CapturingTerminalController()
+        terminal_controller.terminal_length = 0
+        self._set_modes_output(terminal_controller, shows_prompt=False)
+
+        results = []
+        try:
+            for line in lines:
+                processed = self.command_processor.run_command(line)
+                if not processed:
+                    self.handle_unknown_command(line)
+                results.append(CommandResult(line, processed, terminal_controller.pop_output(), None))
+                if self.command_processor.is_done or self.awaiting_result is not None:
+                    break
+        finally:
+            self._set_modes_output(session_terminal_controller, shows_prompt=True)
+
+        awaiting_result = self.awaiting_result
+        if awaiting_result is not None:
+            pending_output = defer.Deferred()
+            awaiting_result.addCallback(_fire_with_output, pending_output, session_terminal_controller)
+            results[-1] = results[-1]._replace(pending_output=pending_output)
+        return results
+
+    def _set_modes_output(self, terminal_controller, shows_prompt):
+        for processor in self.command_processor.mode_stack:
+            processor.terminal_controller = terminal_controller
+            processor.shows_prompt = shows_prompt
 
     def handle_unknown_command(self, line):
         pass
 
+
+def _fire_with_output(result, pending_output, terminal_controller):
+    pending_output.callback(terminal_controller.pop_output())
+    return result
@@ -13,27 +13,220 @@
 # limitations under the License.
 
 import logging
+from functools import partial
+
+from twisted.internet import defer, reactor, task, threads
+from twisted.python.threadpool import ThreadPool
 
 from fake_switches.adapters import tftp_reader
+from fake_switches.command_processing.command_processor import TokenizedLine
 from fake_switches.command_processing.piping_processor_base import NotPipingProcessor
 from fake_switches.terminal import NoopTerminalController
 
+try:
+    from queue import Queue, Empty, Full
+except ImportError:
+    from Queue import Queue, Empty, Full
+
 
 class SwitchTftpParser(object):
+    LINES_PER_TURN = 100
+    PROGRESS_LINES = 10000
+    PENDING_BATCHES = 16
+
     def __init__(self, configuration, reader=None):
         self.configuration = configuration
         self.reader = reader if reader else tftp_reader
         self.logger = logging.getLogger("fake_switches.%s.tftp" % self.configuration.name)
 
     def parse(self, url, filename, command_processor_class):
+        command_processor = self.new_command_processor(command_processor_class)
+
+        for line in self.read_lines(url, filename):
+            self.apply(command_processor, line)
+
+    def parse_async(self, url, filename, command_processor_class, progress=None):
+        """
+        Downloads and tokenizes the lines of the file in one of the import
+        threads, LINES_PER_TURN at a time, and applies each batch on the
+        reactor, so the sessions of this switch and of the others keep being
+        served.  The download holds up while PENDING_BATCHES batches wait to
+        be applied, and stops if applying them fails.
+
+        progress, when given, is called with the number of lines applied every
+        PROGRESS_LINES lines.  Fires with the number of lines applied.
+        """
+        command_processor = self.new_command_processor(command_processor_class)
+        batches = _Batches(self.PENDING_BATCHES)
+        applied = [0]
+
+        def apply_batches():
+            while True:
+                received = []
+                yield batches.get().addCallback(received.append)
+                batch = received[0]
+                if not batch:
+                    return
+                for line in batch:
+                    self.apply(command_processor, line)
+                applied[0] += len(batch)
+                if applied[0] % self.PROGRESS_LINES < len(batch):
+                    self.logger.info("Applied %s lines" % applied[0])
+                    if progress:
+                        progress(applied[0])
+
+        import_threads.run(batches, self.read_batches, url, filename)
+        applying = task.cooperate(apply_batches()).whenDone()
+        applying.addBoth(batches.abandon)
+        return applying.addCallback(lambda _: applied[0])
+
+    def read_batches(self, url, filename, batches):
+        lines = iter(self.read_lines(url, filename))
+        try:
+            batch = []
+            for line in lines:
+                batch.append(TokenizedLine(line))
+                if len(batch) == self.LINES_PER_TURN:
+                    if not batches.put(batch):
+                        return
+                    batch = []
+            if batch:
+                batches.put(batch)
+            batches.put([])
+        finally:
+            if hasattr(lines, "close"):
+                lines.close()
+
+    def read_lines(self, url, filename):
         self.logger.info("Reading : %s/%s" % (url, filename))
 
-        data = self.reader.read_tftp(url, filename).split("\n")
+        data = self.reader.read_tftp(url, filename)
+        if hasattr(data, "split"):
+            data = data.split("\n")
+        return data
 
-        command_processor = command_processor_class(
+    def new_command_processor(self, command_processor_class):
+        return command_processor_class(
             self.configuration, NoopTerminalController(),
             self.logger, NotPipingProcessor())
 
-        for line in data:
-            self.logger.debug("Processing : %s" % line)
-            command_processor.process_command(line)
+    def apply(self, command_processor, line):
+        self.logger.debug("Processing : %s", line)
+        command_processor.process_command(line)
+
+
+def import_configurations(imports, progress=None, reader=None):
+    """
+    Imports the files of many switches at once, each item of imports being
+    a (configuration, url, filename, command_processor_class).  The
+    downloads share the import threads, the lines of every switch being
+    applied on the reactor as they come.
+
+    progress, when given, is called with a configuration and its number of
+    lines applied every PROGRESS_LINES lines, and once more with done set
+    when its import completed.  Fires with a (success, lines applied or
+    failure) per import, in order.
+    """
+    imported = []
+    for configuration, url, filename, command_processor_class in imports:
+        parsed = SwitchTftpParser(configuration, reader=reader).parse_async(
+            url, filename, command_processor_class,
+            progress=partial(progress, configuration, done=False) if progress else None)
+        if progress:
+            parsed.addCallback(_report_done, progress, configuration)
+        imported.append(parsed)
+    return defer.DeferredList(imported, consumeErrors=True)
+
+
+def _report_done(lines, progress, configuration):
+    progress(configuration, lines, done=True)
+    return lines
+
+
+class ImportThreads(object):
+    """
+    Threads downloading and tokenizing the files being imported, at most
+    tftp_reader.MAX_DOWNLOADS at once so that each of them gets a download
+    thread.  Started with the first import and stopped with the reactor,
+    abandoning the imports still running.
+    """
+
+    def __init__(self):
+        self.pool = None
+        self.imports = set()
+
+    def run(self, batches, read_batches, *args):
+        if self.pool is None:
+            self.pool = ThreadPool(0, tftp_reader.MAX_DOWNLOADS, name="tftp-import")
+            self.pool.start()
+            reactor.addSystemEventTrigger("before", "shutdown", self.stop)
+
+        self.imports.add(batches)
+        reading = threads.deferToThreadPool(reactor, self.pool, read_batches, *args + (batches,))
+        reading.addErrback(batches.fail)
+        reading.addBoth(lambda _: self.imports.discard(batches))
+
+    def stop(self):
+        for batches in list(self.imports):
+            batches.abandon()
+        self.pool.stop()
+        self.pool = None
+
+
+import_threads = ImportThreads()
+
+
+class _Batches(object):
+    """
+    Batches of lines handed by the thread reading them to the reactor.  The
+    reading thread holds up while size batches wait, until they are taken
+    or abandoned.
+    """
+
+    def __init__(self, size):
+        self.queue = Queue(maxsize=size)
+        self.waiting = None
+        self.failure = None
+        self.abandoned = False
+
+    def put(self, batch):
+        while not self.abandoned:
+            try:
+                self.queue.put(batch, timeout=1)
+                reactor.callFromThread(self._deliver)
+                return True
+            except Full:
+                pass
+        return False
+
+    def get(self):
+        self.waiting = defer.Deferred()
+        waiting = self.waiting
+        self._deliver()
+        return waiting
+
+    def fail(self, failure):
+        self.failure = failure
+        self._deliver()
+
+    def abandon(self, result=None):
+        self.abandoned = True
+        try:
+            while True:
+                self.queue.get_nowait()
+        except Empty:
+            pass
+        return result
+
+    def _deliver(self):
+        if self.waiting is None:
+            return
+        try:
+            batch = self.queue.get_nowait()
+        except Empty:
+            if self.failure is not None:
+                waiting, self.waiting = self.waiting, None
+                waiting.errback(self.failure)
+            return
+        waiting, self.waiting = self.waiting, None
+        waiting.callback(batch)
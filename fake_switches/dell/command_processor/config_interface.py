@@ -14,6 +14,7 @@
 
 from fake_switches.cisco.command_processor.config_interface import \
     ConfigInterfaceCommandProcessor
+from fake_switches.vlan_set import VlanSet
 
 
 class DellConfigInterfaceCommandProcessor(ConfigInterfaceCommandProcessor):
@@ -220,12 +221,10 @@ class DellConfigInterfaceCommandProcessor(ConfigInterfaceCommandProcessor):
 
         if "add".startswith(operation):
             if self.port.trunk_vlans is None:
-                self.port.trunk_vlans = []
-            self.port.trunk_vlans = list(set(self.port.trunk_vlans + vlans))
+                self.port.trunk_vlans = VlanSet()
+            self.port.trunk_vlans += vlans
         if "remove".startswith(operation):
-            for v in vlans:
-                if v in self.port.trunk_vlans:
-                    self.port.trunk_vlans.remove(v)
+            self.port.trunk_vlans -= vlans
             if len(self.port.trunk_vlans) == 0:
                 self.port.trunk_vlans = None
 
@@ -239,14 +238,14 @@ class DellConfigInterfaceCommandProcessor(ConfigInterfaceCommandProcessor):
 
 def parse_vlan_list(param):
     ranges = param.split(",")
-    vlans = []
+    vlans = VlanSet()
     for r in ranges:
         if "-" in r:
             start, stop = r.split("-")
             if stop < start:
                 raise ValueError
-            vlans += [v for v in range(int(start), int(stop) + 1)]
+            vlans.add_range(int(start), int(stop))
         else:
-            vlans.append(int(r))
+            vlans.add(int(r))
 
     return vlans
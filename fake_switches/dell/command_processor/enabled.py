@@ -16,15 +16,19 @@ from collections import namedtuple
 
 from fake_switches import group_sequences
 
+from fake_switches.command_processing.command_tree import CommandTree
 from fake_switches.command_processing.base_command_processor import \
     BaseCommandProcessor
 from fake_switches.dell.command_processor.config import \
     DellConfigCommandProcessor
 from fake_switches.switch_configuration import VlanPort, AggregatedPort
+from fake_switches.vlan_set import VlanSet
 
 
 class DellEnabledCommandProcessor(BaseCommandProcessor):
     configure_command_processor = DellConfigCommandProcessor
+    page_length = 23
+    more_prompt = "--More-- or (q)uit"
 
     def get_prompt(self):
         return "%s#" % self.switch_configuration.name
@@ -44,81 +48,113 @@ class DellEnabledCommandProcessor(BaseCommandProcessor):
         self.write_line("")
         self.write_line("")
         if character == 'y':
-            self.switch_configuration.commit()
-            self.write_line("Configuration Saved!")
+            self.wait_for(self.switch_configuration.commit(), self.write_line, "Configuration Saved!")
         else:
             self.write_line("Configuration Not Saved!")
-        self.show_prompt()
+        if not self.awaiting_result:
+            self.show_prompt()
 
     def do_configure(self, *_):
         self.move_to(self.configure_command_processor)
 
+    system_description = "PowerConnect 6224P, 3.3.7.3, VxWorks 6.5"
+
+    show_commands = CommandTree({
+        "running-config": "show_running_config",
+        "running-config interface": "show_running_config_interface",
+        "vlan": "show_vlan",
+        "vlan id": "show_vlan_id",
+        "interfaces status": "show_interfaces_status",
+        "version": "show_version",
+    })
+
     def do_show(self, *args):
-        if "running-config".startswith(args[0]):
-            if len(args) == 1:
-                self.write_line('!Current Configuration:')
-                self.write_line('!System Description "PowerConnect 6224P, 3.3.7.3, VxWorks 6.5"')
-                self.write_line('!System Software Version 3.3.7.3')
-                self.write_line('!Cut-through mode is configured as disabled')
-                self.write_line('!')
-                self.write_line('configure')
-                self.write_line('vlan database')
-                if len(self.switch_configuration.vlans) > 0:
-                    self.write_line('vlan %s' % ','.join(sorted([str(v.number) for v in self.switch_configuration.vlans])))
-                self.write_line('exit')
-                for port in self.switch_configuration.ports:
-                    port_config = self.get_port_configuration(port)
-
-                    if len(port_config) > 0:
-                        self.write_line('interface %s' % port.name)
-                        for item in port_config:
-                            self.write_line(item)
-                        self.write_line('exit')
-                        self.write_line('!')
-                self.write_line('exit')
-            elif "interface".startswith(args[1]):
-                interface_name = ' '.join(args[2:])
-
-                port = self.switch_configuration.get_port_by_partial_name(interface_name)
-                if port:
-                    if isinstance(port, VlanPort):
-                        config = self.get_vlan_port_configuration(port)
-                    else:
-                        config = self.get_port_configuration(port)
-                    if len(config) > 0:
-                        for line in config:
-                            self.write_line(line)
-                    else:
-                        self.write_line("")
-                    self.write_line("")
-                else:
-                    self.write_line("\nERROR: Invalid input!\n")
-        elif "vlan".startswith(args[0]):
-            if len(args) == 1:
-                self.show_vlan_page(list(self.switch_configuration.vlans))
-            elif args[1] == "id":
-                if len(args) < 3:
-                    self.write_line("")
-                    self.write_line("Command not found / Incomplete command. Use ? to list commands.")
-                    self.write_line("")
-                elif not _is_vlan_id(args[2]):
-                    self.write_line("                     ^")
-                    self.write_line("Invalid input. Please specify an integer in the range 1 to 4093.")
-                    self.write_line("")
-                else:
-                    vlan = self.switch_configuration.get_vlan(int(args[2]))
-                    if vlan is None:
-                        self.write_line("")
-                        self.write_line("ERROR: This VLAN does not exist.")
-                        self.write_line("")
-                    else:
-                        self.show_vlan_page([vlan])
-
-
-        elif "interfaces".startswith(args[0]) and "status".startswith(args[1]):
-            self.show_page(self.get_interfaces_status_output())
-        elif "version".startswith(args[0]):
-            self.show_version()
+        self.dispatch("show", self.show_commands, args)
+
+    def write_ambiguous_command(self, words):
+        self.write_line("")
+        self.write_line("Ambiguous command. Use ? to list commands.")
+        self.write_line("")
+
+    def show_running_config(self, *args):
+        if len(args) == 1:
+            self.write_lines(self.running_config())
+
+    def running_config(self):
+        yield '!Current Configuration:'
+        yield '!System Description "%s"' % self.system_description
+        yield '!System Software Version 3.3.7.3'
+        yield '!Cut-through mode is configured as disabled'
+        yield '!'
+        yield 'configure'
+        for line in self.running_vlans():
+            yield line
+        for port in self.switch_configuration.ports:
+            port_config = self.switch_configuration.rendered_fragment(
+                (self.__class__, "interface"), port, self.get_port_configuration)
+
+            if len(port_config) > 0:
+                yield 'interface %s' % port.name
+                for item in port_config:
+                    yield item
+                yield 'exit'
+                yield '!'
+        yield 'exit'
+
+    def running_vlans(self):
+        yield 'vlan database'
+        if len(self.switch_configuration.vlans) > 0:
+            yield 'vlan %s' % ','.join(sorted([str(v.number) for v in self.switch_configuration.vlans]))
+        yield 'exit'
+
+    def show_running_config_interface(self, *args):
+        interface_name = ' '.join(args[2:])
+
+        port = self.switch_configuration.get_port_by_partial_name(interface_name)
+        if port:
+            self.write_interface_configuration(port)
+        else:
+            self.write_line("\nERROR: Invalid input!\n")
+
+    def write_interface_configuration(self, port):
+        if isinstance(port, VlanPort):
+            config = self.get_vlan_port_configuration(port)
+        else:
+            config = self.get_port_configuration(port)
+        if len(config) > 0:
+            for line in config:
+                self.write_line(line)
+        else:
+            self.write_line("")
+        self.write_line("")
+
+    def show_vlan(self, *args):
+        if len(args) == 1:
+            self.show_vlan_list(list(self.switch_configuration.vlans))
+
+    def show_vlan_id(self, *args):
+        if len(args) < 3:
+            self.write_line("")
+            self.write_line("Command not found / Incomplete command. Use ? to list commands.")
+            self.write_line("")
+        elif not _is_vlan_id(args[2]):
+            self.write_line("                     ^")
+            self.write_line("Invalid input. Please specify an integer in the range 1 to 4093.")
+            self.write_line("")
+        else:
+            vlan = self.switch_configuration.get_vlan(int(args[2]))
+            if vlan is None:
+                self.write_line("")
+                self.write_line("ERROR: This VLAN does not exist.")
+                self.write_line("")
+            else:
+                self.show_vlan_list([vlan])
+
+    def show_vlan_list(self, vlans):
+        self.show_vlan_page(self.new_pager(self.vlan_lines(vlans), 18))
+
+    def show_interfaces_status(self, *_):
+        self.write_pages(self.interfaces_status_lines())
 
     def get_port_configuration(self, port):
         conf = []
@@ -160,13 +196,12 @@ class DellEnabledCommandProcessor(BaseCommandProcessor):
 
         return conf
 
-    def get_interfaces_status_output(self):
-        output_lines = [
-            "",
-            "Port   Type                            Duplex  Speed    Neg  Link  Flow Control",
-            "                                                             State Status",
-            "-----  ------------------------------  ------  -------  ---- --------- ------------",
-        ]
+    def interfaces_status_lines(self):
+        yield ""
+        yield "Port   Type                            Duplex  Speed    Neg  Link  Flow Control"
+        yield "                                                             State Status"
+        yield "-----  ------------------------------  ------  -------  ---- --------- ------------"
+
         interfaces = []
         bonds = []
         for port in self.switch_configuration.ports:
@@ -176,61 +211,52 @@ class DellEnabledCommandProcessor(BaseCommandProcessor):
                 interfaces.append(port)
 
         for port in sorted(interfaces, key=lambda e: e.name):
-            output_lines.append(
-                "{name: <5}  {type: <30}  {duplex: <6}  {speed: <7}  {neg: <4} {state: <9} {flow}".format(
-                    name=port.name.split(" ")[-1], type="10G - Level" if "x" in port.name else "Gigabit - Level",
-                    duplex="Full", speed="Unknown", neg="Auto", state="Down", flow="Inactive"))
-
-        output_lines += [
-            "",
-            "",
-            "Ch   Type                            Link",
-            "                                     State",
-            "---  ------------------------------  -----",
-        ]
+            yield "{name: <5}  {type: <30}  {duplex: <6}  {speed: <7}  {neg: <4} {state: <9} {flow}".format(
+                name=port.name.split(" ")[-1], type="10G - Level" if "x" in port.name else "Gigabit - Level",
+                duplex="Full", speed="Unknown", neg="Auto", state="Down", flow="Inactive")
+
+        yield ""
+        yield ""
+        yield "Ch   Type                            Link"
+        yield "                                     State"
+        yield "---  ------------------------------  -----"
 
         for port in sorted(bonds, key=lambda e: int(e.name.split(" ")[-1])):
-            output_lines.append("ch{name: <2} {type: <30}  {state}".format(
-                name=port.name.split(" ")[-1], type="Link Aggregate", state="Down", flow="Inactive"))
+            yield "ch{name: <2} {type: <30}  {state}".format(
+                name=port.name.split(" ")[-1], type="Link Aggregate", state="Down", flow="Inactive")
 
-        output_lines += [
-            "",
-            "Flow Control:Enabled",
-        ]
-        return output_lines
+        yield ""
+        yield "Flow Control:Enabled"
 
-    def show_vlan_page(self, vlans):
-        lines_per_pages = 18
+    def show_vlan_page(self, pager):
         self.write_line("")
         self.write_line("VLAN       Name                         Ports          Type      Authorization")
         self.write_line("-----  ---------------                  -------------  -----     -------------")
 
-        line_count = 0
-        while len(vlans) > 0 and line_count < lines_per_pages:
-            vlan = vlans.pop(0)
+        self.write_lines(pager.next_page())
+        self.write_line("")
+
+        if pager.has_more():
+            self.write(self.more_prompt)
+            self.on_keystroke(self.continue_vlan_pages, pager)
+
+    def vlan_lines(self, vlans):
+        for vlan in vlans:
             ports_strings = self._build_port_strings(self.get_ports_for_vlan(vlan))
 
-            self.write_line("{number: <5}  {name: <32} {ports: <13}  {type: <8}  {auth: <13}".format(
+            lines = ["{number: <5}  {name: <32} {ports: <13}  {type: <8}  {auth: <13}".format(
                 number=vlan.number, name=vlan_name(vlan), ports=ports_strings[0],
-                type="Default" if vlan.number == 1 else "Static", auth="Required"))
-            line_count += 1
+                type="Default" if vlan.number == 1 else "Static", auth="Required")]
             for port_string in ports_strings[1:]:
-                self.write_line("{number: <5}  {name: <32} {ports: <13}  {type: <8}  {auth: <13}".format(
+                lines.append("{number: <5}  {name: <32} {ports: <13}  {type: <8}  {auth: <13}".format(
                         number="", name="", ports=port_string, type="", auth=""))
-                line_count += 1
-        self.write_line("")
-
-        if len(vlans) > 0:
-            self.write("--More-- or (q)uit")
-            self.on_keystroke(self.continue_vlan_pages, vlans)
+            yield lines
 
     def get_ports_for_vlan(self, vlan):
-        ports = []
-        for port in self.switch_configuration.ports:
-            if not isinstance(port, VlanPort):
-                if (port.trunk_vlans and vlan.number in port.trunk_vlans) or port.access_vlan == vlan.number:
-                    ports.append(port)
-        return ports
+        conf = self.switch_configuration
+        return [port for port in conf.in_port_order(conf.get_ports_by_tagged_vlan(vlan.number) +
+                                                    conf.get_ports_by_access_vlan(vlan.number))
+                if not isinstance(port, VlanPort)]
 
     def _build_port_strings(self, ports):
         port_range_list = group_sequences(ports, are_in_sequence=self._are_in_sequence)
@@ -255,37 +281,27 @@ class DellEnabledCommandProcessor(BaseCommandProcessor):
         details_b = self._get_interface_details(b.name)
         return details_a.port + 1 == details_b.port and details_a.port_prefix == details_b.port_prefix
 
-    def continue_vlan_pages(self, lines, _):
+    def continue_vlan_pages(self, pager, _):
         self.write_line("\r                     ")
         self.write_line("")
 
-        self.show_vlan_page(lines)
+        self.show_vlan_page(pager)
 
         if not self.awaiting_keystroke:
+            self.finish_piping()
             self.show_prompt()
 
-    def show_page(self, lines):
-        lines_per_pages = 23
-
-        line = 0
-        while len(lines) > 0 and line < lines_per_pages:
-            self.write_line(lines.pop(0))
-            line += 1
-
-        if len(lines) > 0:
-            self.write("--More-- or (q)uit")
-            self.on_keystroke(self.continue_pages, lines)
-
-    def continue_pages(self, lines, _):
+    def continue_pages(self, pager, _):
         self.write_line("")
 
-        self.show_page(lines)
+        self.show_page(pager)
 
         if not self.awaiting_keystroke:
             self.write_line("")
+            self.finish_piping()
             self.show_prompt()
 
-    def show_version(self):
+    def show_version(self, *_):
         self.write_line("")
         self.write_line("Image Descriptions")
         self.write_line("")
@@ -316,16 +332,14 @@ def to_vlan_ranges(vlans):
     if len(vlans) == 0:
         return "none"
 
-    ranges = group_sequences(vlans, are_in_sequence=lambda a, b: a + 1 == b)
-
-    return ",".join([to_range_string(r) for r in ranges])
+    return ",".join([to_range_string(first, last) for first, last in VlanSet(vlans).ranges()])
 
 
-def to_range_string(range_array):
-    if len(range_array) < 2:
-        return ",".join([str(n) for n in range_array])
+def to_range_string(first, last):
+    if first == last:
+        return str(first)
     else:
-        return "%s-%s" % (range_array[0], range_array[-1])
+        return "%s-%s" % (first, last)
 
 
 def _is_vlan_id(text):
@@ -21,7 +21,7 @@ from fake_switches.brocade.command_processor.piping import \
 from fake_switches.brocade.brocade_core import BrocadeSwitchCore
 from fake_switches.dell.command_processor.default import \
     DellDefaultCommandProcessor
-from fake_switches.terminal import LoggingTerminalController
+from fake_switches.terminal import LoggingTerminalController, BufferedTerminalController
 
 
 class DellSwitchCore(BrocadeSwitchCore):
@@ -31,7 +31,7 @@ class DellSwitchCore(BrocadeSwitchCore):
 
         command_processor = DellDefaultCommandProcessor(
             switch_configuration=self.switch_configuration,
-            terminal_controller=LoggingTerminalController(self.logger, terminal_controller),
+            terminal_controller=BufferedTerminalController(LoggingTerminalController(self.logger, terminal_controller)),
             piping_processor=PipingProcessor(self.logger),
             logger=self.logger)
 
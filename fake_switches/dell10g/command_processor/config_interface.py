@@ -14,6 +14,7 @@
 
 from fake_switches.dell.command_processor.config_interface import DellConfigInterfaceCommandProcessor, parse_vlan_list
 from fake_switches.switch_configuration import AggregatedPort
+from fake_switches.vlan_set import VlanSet
 
 
 class Dell10GConfigInterfaceCommandProcessor(DellConfigInterfaceCommandProcessor):
@@ -69,17 +70,15 @@ class Dell10GConfigInterfaceCommandProcessor(DellConfigInterfaceCommandProcessor
                 else:
                     if args[0:4] == ("trunk", "allowed", "vlan", "add"):
                         if self.port.trunk_vlans is not None:
-                            self.port.trunk_vlans = sorted(list(set(self.port.trunk_vlans + parse_vlan_list(args[4]))))
+                            self.port.trunk_vlans += parse_vlan_list(args[4])
                     elif args[0:4] == ("trunk", "allowed", "vlan", "remove"):
                         if self.port.trunk_vlans is None:
-                            self.port.trunk_vlans = list(range(1, 4097))
-                        for v in parse_vlan_list(args[4]):
-                            if v in self.port.trunk_vlans:
-                                self.port.trunk_vlans.remove(v)
+                            self.port.trunk_vlans = VlanSet.of_range(1, 4096)
+                        self.port.trunk_vlans -= parse_vlan_list(args[4])
                         if len(self.port.trunk_vlans) == 0:
                             self.port.trunk_vlans = None
                     elif args[0:4] == ("trunk", "allowed", "vlan", "none"):
-                        self.port.trunk_vlans = []
+                        self.port.trunk_vlans = VlanSet()
                     elif args[0:4] == ("trunk", "allowed", "vlan", "all"):
                         self.port.trunk_vlans = None
                     elif args[0:3] == ("trunk", "allowed", "vlan"):
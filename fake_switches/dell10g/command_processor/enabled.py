@@ -15,11 +15,12 @@ import re
 from collections import namedtuple
 
 from fake_switches import group_sequences
-from fake_switches.dell.command_processor.enabled import DellEnabledCommandProcessor, to_vlan_ranges, _is_vlan_id, \
+from fake_switches.command_processing.command_tree import CommandTree
+from fake_switches.dell.command_processor.enabled import DellEnabledCommandProcessor, to_vlan_ranges, \
     _assemble_elements_on_lines
 from fake_switches.dell10g.command_processor.config import \
     Dell10GConfigCommandProcessor
-from fake_switches.switch_configuration import VlanPort, AggregatedPort
+from fake_switches.switch_configuration import AggregatedPort
 
 
 class Dell10GEnabledCommandProcessor(DellEnabledCommandProcessor):
@@ -60,70 +61,30 @@ class Dell10GEnabledCommandProcessor(DellEnabledCommandProcessor):
 
         return conf
 
-    def do_show(self, *args):
-        if "running-config".startswith(args[0]):
-            if len(args) == 1:
-                self.write_line('!Current Configuration:')
-                self.write_line('!System Description "............."')
-                self.write_line('!System Software Version 3.3.7.3')
-                self.write_line('!Cut-through mode is configured as disabled')
-                self.write_line('!')
-                self.write_line('configure')
-                self.write_vlans()
-                for port in self.switch_configuration.ports:
-                    port_config = self.get_port_configuration(port)
-
-                    if len(port_config) > 0:
-                        self.write_line('interface %s' % port.name)
-                        for item in port_config:
-                            self.write_line(item)
-                        self.write_line('exit')
-                        self.write_line('!')
-                self.write_line('exit')
-            elif "interface".startswith(args[1]):
-                interface_name = ' '.join(args[2:])
-
-                port = self.switch_configuration.get_port_by_partial_name(interface_name)
-                if port:
-                    if isinstance(port, VlanPort):
-                        config = self.get_vlan_port_configuration(port)
-                    else:
-                        config = self.get_port_configuration(port)
-                    if len(config) > 0:
-                        for line in config:
-                            self.write_line(line)
-                    else:
-                        self.write_line("")
-                    self.write_line("")
-                else:
-                    self.write_line("")
-                    self.write_line("An invalid interface has been used for this function")
-
-        elif "vlan".startswith(args[0]):
-            if len(args) == 1:
-                self.show_vlans(self.switch_configuration.vlans)
-            elif args[1] == "id":
-                if len(args) < 3:
-                    self.write_line("")
-                    self.write_line("Command not found / Incomplete command. Use ? to list commands.")
-                    self.write_line("")
-                elif not _is_vlan_id(args[2]):
-                    self.write_line("                     ^")
-                    self.write_line("Invalid input. Please specify an integer in the range 1 to 4093.")
-                    self.write_line("")
-                else:
-                    vlan = self.switch_configuration.get_vlan(int(args[2]))
-                    if vlan is None:
-                        self.write_line("")
-                        self.write_line("ERROR: This VLAN does not exist.")
-                        self.write_line("")
-                    else:
-                        self.show_vlans([vlan])
-
-        elif "interfaces".startswith(args[0]) and "status".startswith(args[1]):
-            self.show_interfaces_status()
-
-    def write_vlans(self):
+    system_description = "............."
+
+    show_commands = CommandTree({
+        "running-config": "show_running_config",
+        "running-config interface": "show_running_config_interface",
+        "vlan": "show_vlan",
+        "vlan id": "show_vlan_id",
+        "interfaces status": "show_interfaces_status",
+    })
+
+    def show_running_config_interface(self, *args):
+        interface_name = ' '.join(args[2:])
+
+        port = self.switch_configuration.get_port_by_partial_name(interface_name)
+        if port:
+            self.write_interface_configuration(port)
+        else:
+            self.write_line("")
+            self.write_line("An invalid interface has been used for this function")
+
+    def show_vlan_list(self, vlans):
+        self.show_vlans(vlans)
+
+    def running_vlans(self):
         named_vlans = []
         other_vlans = []
         for v in self.switch_configuration.vlans:
@@ -133,15 +94,15 @@ class Dell10GEnabledCommandProcessor(DellEnabledCommandProcessor):
                 other_vlans.append(v)
 
         for vlan in named_vlans:
-            self.write_line('vlan {}'.format(vlan.number))
+            yield 'vlan {}'.format(vlan.number)
             if vlan.name is not None:
-                self.write_line('name {}'.format(vlan.name))
-            self.write_line('exit')
+                yield 'name {}'.format(vlan.name)
+            yield 'exit'
 
-        self.write_line('vlan {}'.format(to_vlan_ranges([v.number for v in other_vlans])))
-        self.write_line('exit')
+        yield 'vlan {}'.format(to_vlan_ranges([v.number for v in other_vlans]))
+        yield 'exit'
 
-    def show_interfaces_status(self):
+    def show_interfaces_status(self, *_):
 
         self.write_line("")
         self.write_line("Port      Description               Vlan  Duplex Speed   Neg  Link   Flow Ctrl")
@@ -206,6 +167,8 @@ class Dell10GEnabledCommandProcessor(DellEnabledCommandProcessor):
         return interface_descriptor(interface, port_prefix, int(port))
 
     def do_terminal(self, *args):
+        if len(args) == 2 and "length".startswith(args[0]) and args[1].isdigit():
+            self.set_terminal_length(args[1])
         self.write_line("")
 
 def vlan_name(vlan):
@@ -19,7 +19,7 @@ from fake_switches.brocade.command_processor.piping import \
 from fake_switches.dell.dell_core import DellSwitchCore, DellShellSession
 from fake_switches.dell10g.command_processor.default import \
     Dell10GDefaultCommandProcessor
-from fake_switches.terminal import LoggingTerminalController
+from fake_switches.terminal import LoggingTerminalController, BufferedTerminalController
 
 
 class Dell10GSwitchCore(DellSwitchCore):
@@ -29,7 +29,7 @@ class Dell10GSwitchCore(DellSwitchCore):
 
         command_processor = Dell10GDefaultCommandProcessor(
             switch_configuration=self.switch_configuration,
-            terminal_controller=LoggingTerminalController(self.logger, terminal_controller),
+            terminal_controller=BufferedTerminalController(LoggingTerminalController(self.logger, terminal_controller)),
             piping_processor=PipingProcessor(self.logger),
             logger=self.logger)
 
@@ -0,0 +1,161 @@
+# Copyright 2016 Internap.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from contextlib import contextmanager
+from timeit import default_timer
+
+
+class Histogram(object):
+    """
+    Counts of the recorded values, in buckets of bounded relative width as in
+    HdrHistogram.  Values up to 2 ** SUB_BUCKET_BITS have a bucket each, every
+    power of two above is split in 2 ** (SUB_BUCKET_BITS - 1) buckets, so a
+    percentile is off by less than 1 / 2 ** (SUB_BUCKET_BITS - 1) of its value.
+
+    >>> histogram = Histogram()
+    >>> for value in range(1, 1001):
+    ...     histogram.record(value)
+    >>> histogram.count, histogram.value_at_percentile(50), histogram.value_at_percentile(99)
+    (1000, 503, 991)
+    """
+    SUB_BUCKET_BITS = 7
+
+    def __init__(self):
+        self.counts = {}
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+
+    def record(self, value):
+        value = int(value)
+        bucket = _bucket(value, self.SUB_BUCKET_BITS)
+        self.counts[bucket] = self.counts.get(bucket, 0) + 1
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def value_at_percentile(self, percentile):
+        if not self.count:
+            return None
+
+        threshold = max(1, -(-self.count * percentile // 100))
+        seen = 0
+        for shift, sub_bucket in sorted(self.counts):
+            seen += self.counts[shift, sub_bucket]
+            if seen >= threshold:
+                return min(((sub_bucket + 1) << shift) - 1, self.max)
+
+    @property
+    def mean(self):
+        return float(self.total) / self.count if self.count else None
+
+
+def _bucket(value, sub_bucket_bits):
+    shift = max(0, value.bit_length() - sub_bucket_bits)
+    return shift, value >> shift
+
+
+class CommandMetrics(object):
+    def __init__(self):
+        self.latency = Histogram()
+        self.output_size = Histogram()
+
+    @property
+    def count(self):
+        return self.latency.count
+
+
+class CommandStatistics(object):
+    """
+    Wall time, in microseconds, and output size, in bytes, of the commands
+    handled, by vendor and command.
+    """
+    PERCENTILES = (50, 90, 99)
+
+    def __init__(self):
+        self._metrics = {}
+
+    def record(self, vendor, command, seconds, output_size):
+        metrics = self._metrics.get((vendor, command))
+        if metrics is None:
+            metrics = self._metrics[vendor, command] = CommandMetrics()
+        metrics.latency.record(seconds * 1000000)
+        metrics.output_size.record(output_size)
+
+    def get(self, vendor, command):
+        return self._metrics.get((vendor, command))
+
+    def reset(self):
+        self._metrics.clear()
+
+    def snapshot(self):
+        return dict(((vendor, command), {
+            "count": metrics.count,
+            "latency_us": _summary(metrics.latency, self.PERCENTILES),
+            "output_bytes": _summary(metrics.output_size, self.PERCENTILES),
+        }) for (vendor, command), metrics in self._metrics.items())
+
+    def dump(self):
+        """
+        One line per command, the slowest at the 99th percentile first.
+        """
+        yield "{:<20} {:<32} {:>8} {:>10} {:>10} {:>10} {:>10} {:>12}".format(
+            "vendor", "command", "count", "p50 us", "p90 us", "p99 us", "max us", "p99 bytes")
+
+        for (vendor, command), metrics in sorted(self._metrics.items(),
+                                                 key=lambda item: -item[1].latency.value_at_percentile(99)):
+            latency = metrics.latency
+            yield "{:<20} {:<32} {:>8} {:>10} {:>10} {:>10} {:>10} {:>12}".format(
+                vendor, command, metrics.count, latency.value_at_percentile(50), latency.value_at_percentile(90),
+                latency.value_at_percentile(99), latency.max, metrics.output_size.value_at_percentile(99))
+
+
+def _summary(histogram, percentiles):
+    summary = dict(("p%d" % percentile, histogram.value_at_percentile(percentile)) for percentile in percentiles)
+    summary.update(min=histogram.min, max=histogram.max, mean=histogram.mean)
+    return summary
+
+
+command_statistics = CommandStatistics()
+
+
+def vendor_of(obj):
+    """
+    The fake_switches package the class of obj comes from, such as "cisco".
+    """
+    parts = type(obj).__module__.split(".")
+    return parts[1] if parts[0] == "fake_switches" and len(parts) > 1 else type(obj).__module__
+
+
+class Measurement(object):
+    def __init__(self, command):
+        self.command = command
+
+
+@contextmanager
+def measured(vendor, command, output_size):
+    """
+    Records in command_statistics the time spent in the block and how much
+    output_size() grew meanwhile.  The block gets a Measurement through which
+    it can rename the command, once it knows more precisely what runs.
+    """
+    measurement = Measurement(command)
+    started, initial_output_size = default_timer(), output_size()
+    try:
+        yield measurement
+    finally:
+        command_statistics.record(vendor, measurement.command, default_timer() - started,
+                                  output_size() - initial_output_size)
@@ -0,0 +1,148 @@
+# Copyright 2015-2016 Internap.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from copy import deepcopy
+
+from fake_switches.switch_configuration import VlanPort, AggregatedPort, split_port_name
+
+
+class CandidateConfiguration(object):
+    """
+    Copy-on-write view over a running SwitchConfiguration.
+
+    The vlans and ports lists show the running objects, except for the ones
+    that were changed, added or removed in the candidate. Looking up an object
+    with one of the get_* methods means it is about to be modified, so a
+    private copy of it is made then and returned from then on.
+    """
+
+    def __init__(self, running):
+        self.running = running
+        self.locked = running.locked
+        self.clear()
+
+    def clear(self):
+        self._copies = {}
+        self._originals = {}
+        self._removed = {}
+        self._added_vlans = []
+        self._added_ports = []
+        self._renamed = False
+
+    def has_changes(self):
+        return bool(self._copies or self._removed or self._added_vlans or self._added_ports)
+
+    @property
+    def vlans(self):
+        return self._view(self.running.vlans, self._added_vlans)
+
+    @property
+    def ports(self):
+        return self._view(self.running.ports, self._added_ports)
+
+    def changed_vlans(self):
+        return [vlan for vlan in self.vlans if vlan.switch_configuration is self]
+
+    def changed_ports(self):
+        return [port for port in self.ports if port.switch_configuration is self]
+
+    def removed_vlans(self):
+        return [vlan for vlan in self._removed.values() if vlan in self.running.vlans]
+
+    def removed_ports(self):
+        return [port for port in self._removed.values() if port in self.running.ports]
+
+    def new(self, class_name, *args, **kwargs):
+        return self.running.new(class_name, *args, **kwargs)
+
+    def get_vlan(self, number):
+        return self._find(self.running.get_vlan(number), self._added_vlans, lambda: self.vlans,
+                          lambda vlan: vlan.number == number)
+
+    def get_vlan_by_name(self, name):
+        return self._find(self.running.get_vlan_by_name(name), self._added_vlans, lambda: self.vlans,
+                          lambda vlan: vlan.name == name)
+
+    def add_vlan(self, vlan):
+        self._added_vlans.append(vlan)
+        vlan.switch_configuration = self
+
+    def remove_vlan(self, vlan):
+        self._remove(vlan, self._added_vlans)
+
+    def get_port(self, name):
+        return self._find(self.running.get_port(name), self._added_ports, lambda: self.ports,
+                          lambda port: port.name == name)
+
+    def get_port_by_partial_name(self, name):
+        partial_name, number = split_port_name(name.lower())
+        partial_name, number = partial_name.strip(), number.strip()
+
+        return self._find(self.running.get_port_by_partial_name(name), self._added_ports, lambda: self.ports,
+                          lambda port: port.name.lower().startswith(partial_name) and port.name.lower().endswith(number))
+
+    def add_port(self, port):
+        self._added_ports.append(port)
+        port.switch_configuration = self
+
+    def remove_port(self, port):
+        self._remove(port, self._added_ports)
+
+    def get_physical_ports(self):
+        return [p for p in self.ports if not (isinstance(p, VlanPort) or isinstance(p, AggregatedPort))]
+
+    def get_vlan_ports(self):
+        return [p for p in self.ports if isinstance(p, VlanPort)]
+
+    def commit(self):
+        return self.running.commit()
+
+    def _view(self, running_objects, added_objects):
+        return [self._current(obj) for obj in running_objects if id(obj) not in self._removed] + added_objects
+
+    def _current(self, obj):
+        original, copy = self._copies.get(id(obj), (None, None))
+        return copy if original is obj else obj
+
+    def _find(self, running_match, added_objects, candidate_objects, matches):
+        candidates = added_objects
+        if self._renamed or running_match is not None:
+            if not self._renamed and id(running_match) not in self._removed:
+                return self._editable(running_match)
+            candidates = candidate_objects()
+
+        return self._editable(next((obj for obj in candidates if matches(obj)), None))
+
+    def _editable(self, obj):
+        if obj is None or obj.switch_configuration is self:
+            return obj
+
+        original, copy = self._copies.get(id(obj), (None, None))
+        if original is not obj:
+            copy = deepcopy(obj, {id(self.running): self})
+            self._copies[id(obj)] = (obj, copy)
+            self._originals[id(copy)] = obj
+        return copy
+
+    def _remove(self, obj, added_objects):
+        obj.switch_configuration = None
+        if any(added is obj for added in added_objects):
+            added_objects.remove(obj)
+        else:
+            original = self._originals.pop(id(obj), obj)
+            self._copies.pop(id(original), None)
+            self._removed[id(original)] = original
+
+    def _attribute_changed(self, target, attribute, old_value, new_value):
+        if attribute in ("name", "number"):
+            self._renamed = True
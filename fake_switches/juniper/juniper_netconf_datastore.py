@@ -22,6 +22,8 @@ from fake_switches.netconf import XML_NS, XML_ATTRIBUTES, CANDIDATE, RUNNING, Al
     AggregatePortOutOfRange, PhysicalPortOutOfRange,  MultipleNetconfErrors, InvalidNumericValue, InvalidMTUValue
 from fake_switches.netconf.netconf_protocol import dict_2_etree
 from fake_switches.switch_configuration import AggregatedPort
+from fake_switches.vlan_set import VlanSet
+from fake_switches.juniper.candidate_configuration import CandidateConfiguration
 
 NS_JUNOS = "http://xml.juniper.net/junos/11.4R1/junos"
 
@@ -38,12 +40,10 @@ class JuniperNetconfDatastore(object):
 
     def reset(self):
         self.configurations = {
-            CANDIDATE: deepcopy(self.original_configuration),
+            CANDIDATE: CandidateConfiguration(self.original_configuration),
             RUNNING: self.original_configuration,
         }
 
-        self.configurations[CANDIDATE].routing_engine = None
-
     def to_etree(self, source):
         etree.register_namespace("junos", NS_JUNOS)
 
@@ -82,31 +82,30 @@ class JuniperNetconfDatastore(object):
 
     def commit_candidate(self):
         self._validate(self.configurations[CANDIDATE])
-        for updated_vlan in self.configurations[CANDIDATE].vlans:
+        for updated_vlan in self.configurations[CANDIDATE].changed_vlans():
             actual_vlan = self.configurations[RUNNING].get_vlan_by_name(updated_vlan.name)
             if not actual_vlan:
-                self.configurations[RUNNING].add_vlan(deepcopy(updated_vlan))
+                self.configurations[RUNNING].add_vlan(updated_vlan)
             else:
                 actual_vlan.number = updated_vlan.number
                 actual_vlan.description = updated_vlan.description
 
-        for p in self.configurations[RUNNING].vlans[:]:
+        for p in self.configurations[CANDIDATE].removed_vlans():
             if self.configurations[CANDIDATE].get_vlan_by_name(p.name) is None:
                 self.configurations[RUNNING].remove_vlan(p)
 
-        for updated_port in self.configurations[CANDIDATE].ports:
+        for updated_port in self.configurations[CANDIDATE].changed_ports():
             actual_port = self.configurations[RUNNING].get_port_by_partial_name(updated_port.name)
 
             if actual_port is None:
-                actual_port = deepcopy(updated_port)
-                self.configurations[RUNNING].add_port(actual_port)
+                self.configurations[RUNNING].add_port(updated_port)
             else:
                 actual_port.mode = updated_port.mode
                 actual_port.shutdown = updated_port.shutdown
                 actual_port.description = updated_port.description
                 actual_port.mtu = updated_port.mtu
                 actual_port.access_vlan = updated_port.access_vlan
-                actual_port.trunk_vlans = deepcopy(updated_port.trunk_vlans)
+                actual_port.trunk_vlans = updated_port.trunk_vlans
                 actual_port.trunk_native_vlan = updated_port.trunk_native_vlan
                 actual_port.speed = updated_port.speed
                 actual_port.auto_negotiation = updated_port.auto_negotiation
@@ -119,12 +118,15 @@ class JuniperNetconfDatastore(object):
                     actual_port.lacp_active = updated_port.lacp_active
                     actual_port.lacp_periodic = updated_port.lacp_periodic
 
-        for p in self.configurations[RUNNING].ports[:]:
+        for p in self.configurations[CANDIDATE].removed_ports():
             if self.configurations[CANDIDATE].get_port_by_partial_name(p.name) is None:
                 self.configurations[RUNNING].remove_port(p)
 
+        self.configurations[CANDIDATE].clear()
+
     def lock(self, target):
-        if etree.tostring(self.to_etree(RUNNING)) != etree.tostring(self.to_etree(CANDIDATE)):
+        if self.configurations[CANDIDATE].has_changes() and \
+                etree.tostring(self.to_etree(RUNNING)) != etree.tostring(self.to_etree(CANDIDATE)):
             raise CannotLockUncleanCandidate()
         if self.configurations[target].locked:
             raise AlreadyLocked()
@@ -190,7 +192,7 @@ class JuniperNetconfDatastore(object):
             if port.mode is not None:
                 ethernet_switching[self.PORT_MODE_TAG] = port.mode
 
-            vlans = port.trunk_vlans or []
+            vlans = list(port.trunk_vlans or [])
             if port.access_vlan: vlans.append(port.access_vlan)
 
             if len(vlans) > 0:
@@ -229,7 +231,7 @@ class JuniperNetconfDatastore(object):
 
             operation = resolve_operation(interface_node)
             if operation in ("delete", "replace"):
-                backup = deepcopy(vars(port))
+                backup = _backup_protocols_specific_data(port)
 
                 port.reset()
 
@@ -302,10 +304,10 @@ class JuniperNetconfDatastore(object):
                                     port.trunk_vlans = None
                         else:
                             if port_is_in_access_mode(port):
-                                port.access_vlan = parse_range(member.text)[0]
+                                port.access_vlan = min(parse_range(member.text))
                             else:
                                 if port.trunk_vlans is None:
-                                    port.trunk_vlans = []
+                                    port.trunk_vlans = VlanSet()
                                 port.trunk_vlans += parse_range(member.text)
 
             if resolve_operation(first(self.get_trunk_native_vlan_node(interface_node))) == "delete":
@@ -555,9 +557,9 @@ class SyntaxError(NetconfError):
 def parse_range(r):
     m = re.match("(\d+)-(\d+)", r)
     if m:
-        return list(range(int(m.groups()[0]), int(m.groups()[1]) + 1))
+        return VlanSet.of_range(int(m.groups()[0]), int(m.groups()[1]))
     else:
-        return [int(r)]
+        return VlanSet([int(r)])
 
 
 def extract_protocols(configuration):
@@ -609,6 +611,14 @@ def _add_if_not_empty(target_dict, key, value):
         target_dict[key] = value
 
 
+def _backup_protocols_specific_data(port):
+    return {
+        "vendor_specific": deepcopy(port.vendor_specific),
+        "lldp_transmit": port.lldp_transmit,
+        "lldp_receive": port.lldp_receive
+    }
+
+
 def _restore_protocols_specific_data(backup, port):
     port.vendor_specific["rstp-edge"] = backup.get("vendor_specific", {}).get("rstp-edge")
     port.vendor_specific["rstp-no-root-port"] = backup.get("vendor_specific", {}).get("rstp-no-root-port")
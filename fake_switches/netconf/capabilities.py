@@ -62,8 +62,8 @@ class Base1_0(Capability):
 
     def commit(self, _):
         self.datastore.commit_candidate()
-        self.datastore.configurations.get('candidate').commit()
-        return Response(etree.Element("ok"))
+        committed = self.datastore.configurations.get('candidate').commit()
+        return committed.addCallback(lambda _: Response(etree.Element("ok")))
 
 
 def filter_content(content, filtering):
@@ -15,11 +15,14 @@
 import logging
 import re
 
+from twisted.internet import defer
 from twisted.internet.protocol import Protocol
 from lxml import etree
 from fake_switches.netconf import dict_2_etree, NS_BASE_1_0, normalize_operation_name, SimpleDatastore, \
     Response, OperationNotSupported, NetconfError, FailingCommitResults, MultipleNetconfErrors
 from fake_switches.netconf.capabilities import Base1_0
+from fake_switches.instrumentation import command_statistics, vendor_of
+from timeit import default_timer
 
 
 class NetconfProtocol(Protocol):
@@ -27,8 +30,12 @@ class NetconfProtocol(Protocol):
         self.logger = logger or logging.getLogger("fake_switches.netconf")
 
         self.input_buffer = ""
+        self.pending_requests = []
+        self.awaiting_result = None
         self.session_count = 0
         self.been_greeted = False
+        self.output_size = 0
+        self.measurement = None
 
         self.datastore = datastore or SimpleDatastore()
         caps_class_list = capabilities or []
@@ -55,8 +62,13 @@ class NetconfProtocol(Protocol):
         self.logger.info("Received : %s" % repr(data))
         self.input_buffer += data
         if self.input_buffer.rstrip().endswith("]]>]]>"):
-            self.process(self.input_buffer.rstrip()[0:-6])
+            self.pending_requests.append(self.input_buffer.rstrip()[0:-6])
             self.input_buffer = ""
+            self.process_pending_requests()
+
+    def process_pending_requests(self):
+        while self.pending_requests and self.awaiting_result is None:
+            self.process(self.pending_requests.pop(0))
 
     def process(self, data):
         if not self.been_greeted:
@@ -64,6 +76,7 @@ class NetconfProtocol(Protocol):
             self.been_greeted = True
             return
 
+        started = default_timer()
         xml_request_root = remove_namespaces(etree.fromstring(data))
         message_id = xml_request_root.get("message-id")
         operation = xml_request_root[0]
@@ -71,10 +84,11 @@ class NetconfProtocol(Protocol):
 
         handled = False
         operation_name = normalize_operation_name(operation)
+        self.measurement = operation_name, started, self.output_size
         for capability in self.capabilities:
             if hasattr(capability, operation_name):
                 try:
-                    self.reply(message_id, getattr(capability, operation_name)(operation))
+                    self.reply_when_ready(message_id, getattr(capability, operation_name)(operation))
                 except NetconfError as e:
                     self.reply(message_id, error_to_response(e))
                 except MultipleNetconfErrors as e:
@@ -86,6 +100,42 @@ class NetconfProtocol(Protocol):
         if not handled:
             self.reply(message_id, error_to_response(OperationNotSupported(operation_name)))
 
+        if self.awaiting_result is None:
+            self.end_measurement()
+
+    def end_measurement(self, result=None):
+        operation_name, started, initial_output_size = self.measurement
+        command_statistics.record(vendor_of(self.datastore), operation_name, default_timer() - started,
+                                  self.output_size - initial_output_size)
+        return result
+
+    def reply_when_ready(self, message_id, response):
+        if not isinstance(response, defer.Deferred):
+            self.reply(message_id, response)
+            return
+
+        response.addErrback(failure_to_response)
+        response.addErrback(self.unexpected_failure_to_response)
+        response.addCallback(lambda r: self.reply(message_id, r))
+        if not response.called:
+            self.awaiting_result = response
+            response.addBoth(self.end_measurement)
+            response.addErrback(self.abort)
+            response.addBoth(self.resume)
+
+    def unexpected_failure_to_response(self, failure):
+        self.logger.error("Operation failed : %s" % failure.getTraceback())
+        return error_to_response(NetconfError(failure.getErrorMessage(), err_type="application",
+                                              tag="operation-failed"))
+
+    def resume(self, _):
+        self.awaiting_result = None
+        self.process_pending_requests()
+
+    def abort(self, failure):
+        self.logger.error("Operation failed : %s" % failure.getTraceback())
+        self.transport.loseConnection()
+
     def reply(self, message_id, response):
         reply = etree.Element("rpc-reply", xmlns=NS_BASE_1_0, nsmap=self.additionnal_namespaces)
         reply.attrib["message-id"] = message_id
@@ -100,7 +150,9 @@ class NetconfProtocol(Protocol):
 
     def say(self, etree_root):
         self.logger.info("Saying : %s" % repr(etree.tostring(etree_root)))
-        self.transport.write(etree.tostring(etree_root, pretty_print=True) + "]]>]]>\n")
+        output = etree.tostring(etree_root, pretty_print=True) + "]]>]]>\n"
+        self.output_size += len(output)
+        self.transport.write(output)
 
 
 def error_to_rpcerror_dict(error):
@@ -116,6 +168,15 @@ def error_to_rpcerror_dict(error):
     return {"rpc-error": error_specs}
 
 
+def failure_to_response(failure):
+    failure.trap(NetconfError, MultipleNetconfErrors, FailingCommitResults)
+    if failure.check(MultipleNetconfErrors):
+        return errors_to_response(failure.value.errors)
+    if failure.check(FailingCommitResults):
+        return commit_results_error_to_response(failure.value)
+    return error_to_response(failure.value)
+
+
 def error_to_response(error):
     return Response(dict_2_etree(error_to_rpcerror_dict(error)))
 
@@ -0,0 +1,109 @@
+# Copyright 2015-2016 Internap.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from bisect import insort, bisect_left
+from collections import OrderedDict
+
+from netaddr import IPAddress, IPNetwork
+
+
+class RouteTable(object):
+    """
+    Static routes of one VRF, keyed by destination prefix.
+
+    Iterating gives the routes in the order they were configured, sorted()
+    gives them by destination, both without copying the table, which must
+    not change meanwhile. A prefix can have several next hops but the same
+    destination and next hop is only kept once.
+    """
+
+    def __init__(self):
+        self._routes = OrderedDict()
+        self._by_prefix = {}
+        self._sorted_prefixes = []
+        self._prefix_lengths = {4: {}, 6: {}}
+
+    def add(self, route):
+        key = _prefix_key(route.dest), route.next_hop
+        if key in self._routes:
+            return False
+
+        self._routes[key] = route
+        prefix = key[0]
+        if prefix not in self._by_prefix:
+            self._by_prefix[prefix] = []
+            insort(self._sorted_prefixes, prefix)
+            lengths = self._prefix_lengths[route.dest.version]
+            lengths[route.dest.prefixlen] = lengths.get(route.dest.prefixlen, 0) + 1
+        self._by_prefix[prefix].append(route)
+        return True
+
+    def remove(self, destination, next_hop=None):
+        """
+        Removes the route to destination through next_hop, or the first one
+        configured to destination when no next hop is given.
+        """
+        if next_hop is None:
+            route = self.get(destination)
+        else:
+            route = self._routes.get((_prefix_key(IPNetwork(destination)), IPAddress(next_hop)))
+        if route is None:
+            return None
+
+        prefix = _prefix_key(route.dest)
+        del self._routes[prefix, route.next_hop]
+        routes = self._by_prefix[prefix]
+        routes.remove(route)
+        if not routes:
+            del self._by_prefix[prefix]
+            del self._sorted_prefixes[bisect_left(self._sorted_prefixes, prefix)]
+            lengths = self._prefix_lengths[route.dest.version]
+            lengths[route.dest.prefixlen] -= 1
+            if lengths[route.dest.prefixlen] == 0:
+                del lengths[route.dest.prefixlen]
+        return route
+
+    def get(self, destination):
+        routes = self._by_prefix.get(_prefix_key(IPNetwork(destination)))
+        return routes[0] if routes else None
+
+    def lookup(self, address):
+        address = IPAddress(address)
+        width = 32 if address.version == 4 else 128
+        for prefix_length in sorted(self._prefix_lengths[address.version], reverse=True):
+            host_bits = width - prefix_length
+            routes = self._by_prefix.get((address.version, int(address) >> host_bits << host_bits, prefix_length))
+            if routes:
+                return routes[0]
+        return None
+
+    def sorted(self):
+        for prefix in self._sorted_prefixes:
+            for route in self._by_prefix[prefix]:
+                yield route
+
+    def __iter__(self):
+        for key in self._routes:
+            yield self._routes[key]
+
+    def __len__(self):
+        return len(self._routes)
+
+    def __bool__(self):
+        return bool(self._routes)
+
+    __nonzero__ = __bool__
+
+
+def _prefix_key(network):
+    return network.version, int(network.network), network.prefixlen
@@ -11,13 +11,35 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
-from time import sleep
+import weakref
+from types import MemberDescriptorType
+from copy import deepcopy
+from bisect import insort, bisect_left
+from collections import deque, namedtuple, OrderedDict
+from itertools import count
 from netaddr import IPNetwork, IPAddress
+from twisted.internet import defer, task
 
 import re
 
+from fake_switches.route_table import RouteTable
+from fake_switches.vlan_set import VlanSet
+
+
+class Change(namedtuple("Change", ["version", "action", "target", "attribute", "old_value", "new_value"])):
+    """
+    A journal entry of a SwitchConfiguration.
+
+    action is "added" or "removed" for vlans, ports, vrfs and static routes and
+    "changed" for an attribute of a vlan, a port or a vrrp. A list, dict or vlan
+    set modified in place is reported with the container as both old and new value.
+    """
+    __slots__ = ()
+
 
 class SwitchConfiguration(object):
+    JOURNAL_SIZE = 1024
+
     def __init__(self, ip, name="", auto_enabled=False, privileged_passwords=None, ports=None, vlans=None, objects_overrides=None, commit_delay=0):
         self.ip = ip
         self.name = name
@@ -25,8 +47,23 @@ class SwitchConfiguration(object):
         self.auto_enabled = auto_enabled
         self.vlans = []
         self.ports = []
-        self.static_routes = []
-        self.vrfs = [VRF('DEFAULT-LAN')]
+        self._route_tables = {None: RouteTable()}
+        self.vrfs = []
+        self.version = 0
+        self._journal = deque(maxlen=self.JOURNAL_SIZE)
+        self._subscribers = []
+        self._ranks = count()
+        self._vlans_by_number = _Index()
+        self._vlans_by_name = _Index()
+        self._ports_by_name = _Index()
+        self._ports_by_partial_name = _PartialNameIndex()
+        self._vrfs_by_name = {}
+        self._vlan_members = _VlanMembershipIndex()
+        self._indexed_values = {}
+        self._addresses = _AddressIndex()
+        self._revisions = {}
+        self._fragments = {}
+        self.add_vrf(VRF('DEFAULT-LAN'))
         self.locked = False
         self.objects_factory = {
             "Route": Route,
@@ -49,62 +86,119 @@ class SwitchConfiguration(object):
     def new(self, class_name, *args, **kwargs):
         return self.objects_factory[class_name](*args, **kwargs)
 
+    def subscribe(self, subscriber):
+        self._subscribers.append(subscriber)
+
+    def unsubscribe(self, subscriber):
+        self._subscribers.remove(subscriber)
+
+    def changes_since(self, version):
+        missed = self.version - version
+        if missed > len(self._journal):
+            return None
+        return [self._journal[i] for i in range(len(self._journal) - missed, len(self._journal))]
+
+    @property
+    def static_routes(self):
+        return self._route_tables[None]
+
+    def get_route_table(self, vrf_name=None):
+        return self._route_tables.get(vrf_name) or RouteTable()
+
     def add_static_route(self, route):
-        self.static_routes.append(route)
+        if self._route_tables.setdefault(route.vrf, RouteTable()).add(route):
+            self._record("added", route)
 
-    def remove_static_route(self, destination, mask):
-        subnet = IPNetwork("{}/{}".format(destination, mask))
-        route = next(route for route in self.static_routes if route.dest == subnet)
-        self.static_routes.remove(route)
+    def remove_static_route(self, destination, mask, next_hop=None, vrf_name=None):
+        route = self.get_route_table(vrf_name).remove("{}/{}".format(destination, mask), next_hop)
+        if route is None:
+            raise ValueError("{}/{} via {} is not a static route".format(destination, mask, next_hop or "any next hop"))
+        self._record("removed", route)
 
     def get_vlan(self, number):
-        return next((vlan for vlan in self.vlans if vlan.number == number), None)
+        return self._vlans_by_number.first(number)
 
     def get_vlan_by_name(self, name):
-        return next((vlan for vlan in self.vlans if vlan.name == name), None)
+        return self._vlans_by_name.first(name)
 
     def add_vlan(self, vlan):
         self.vlans.append(vlan)
         vlan.switch_configuration = self
+        vlan._rank = next(self._ranks)
+        self._vlans_by_number.add(vlan.number, vlan)
+        self._vlans_by_name.add(vlan.name, vlan)
+        self._indexed_values[vlan] = {"number": vlan.number, "name": vlan.name}
+        self._record("added", vlan)
 
     def remove_vlan(self, vlan):
         vlan.switch_configuration = None
         self.vlans.remove(vlan)
+        indexed = self._indexed_values.pop(vlan)
+        self._vlans_by_number.remove(indexed["number"], vlan)
+        self._vlans_by_name.remove(indexed["name"], vlan)
+        self._record("removed", vlan)
 
     def get_port(self, name):
-        return next((port for port in self.ports if port.name == name), None)
+        return self._ports_by_name.first(name)
 
     def add_port(self, port):
         self.ports.append(port)
         port.switch_configuration = self
+        port._rank = next(self._ranks)
+        self._ports_by_name.add(port.name, port)
+        self._ports_by_partial_name.add(port.name, port)
+        self._vlan_members.add(port)
+        self._addresses.update(port)
+        self._indexed_values[port] = {"name": port.name, "access_vlan": port.access_vlan,
+                                      "trunk_native_vlan": port.trunk_native_vlan}
+        self._record("added", port)
 
     def remove_port(self, port):
         port.switch_configuration = None
         self.ports.remove(port)
+        indexed = self._indexed_values.pop(port)
+        self._ports_by_name.remove(indexed["name"], port)
+        self._ports_by_partial_name.remove(indexed["name"], port)
+        self._vlan_members.remove(port, indexed["access_vlan"], indexed["trunk_native_vlan"])
+        self._addresses.remove(port)
+        self._record("removed", port)
 
     def get_port_by_partial_name(self, name):
         partial_name, number = split_port_name(name.lower())
 
-        return next((port for port in self.ports if port.name.lower().startswith(partial_name.strip()) and port.name.lower().endswith(number.strip())), None)
+        return self._ports_by_partial_name.first(partial_name.strip(), number.strip())
+
+    def get_ports_by_access_vlan(self, *vlan_numbers):
+        return self._vlan_members.access.all(*vlan_numbers)
+
+    def get_ports_by_native_vlan(self, *vlan_numbers):
+        return self._vlan_members.native.all(*vlan_numbers)
+
+    def get_ports_by_tagged_vlan(self, *vlan_numbers):
+        return self._vlan_members.tagged.all(*vlan_numbers)
+
+    def in_port_order(self, ports):
+        return _in_rank_order(ports)
 
     def get_port_and_ip_by_ip(self, ip_string):
-        for port in [e for e in self.ports if isinstance(e, VlanPort)]:
-            for ip in port.ips:
-                if ip_string in ip:
-                    return port, ip
-        return None, None
+        return self._addresses.find(IPAddress(ip_string))
 
     def add_vrf(self, vrf):
         if not self.get_vrf(vrf.name):
             self.vrfs.append(vrf)
+            self._vrfs_by_name[vrf.name] = vrf
+            self._record("added", vrf)
 
     def get_vrf(self, name):
-        return next((vrf for vrf in self.vrfs if vrf.name == name), None)
+        return self._vrfs_by_name.get(name)
 
     def remove_vrf(self, name):
         vrf = self.get_vrf(name)
         if vrf:
             self.vrfs.remove(vrf)
+            del self._vrfs_by_name[name]
+            self._route_tables.pop(name, None)
+            self._record("removed", vrf)
             for port in self.ports:
                 if port.vrf and port.vrf.name == name:
                     port.vrf = None
@@ -115,8 +209,204 @@ class SwitchConfiguration(object):
     def get_vlan_ports(self):
         return [p for p in self.ports if isinstance(p, VlanPort)]
 
+    def rendered_fragment(self, key, obj, render):
+        """
+        Lines returned by render(obj), kept under key for that object and
+        generated again only once the object changed.  A change to one of the
+        VRRP groups of a port counts as a change of the port.
+        """
+        return self._rendered(key, obj, render)[0]
+
+    def rendered_size(self, key, obj, render):
+        """
+        Bytes taken by rendered_fragment(key, obj, render) once written a line
+        at a time, kept along with the fragment.
+        """
+        return self._rendered(key, obj, render)[1]
+
+    def _rendered(self, key, obj, render):
+        revision = self._revisions.get(obj)
+        if revision is None:
+            lines = render(obj)
+            return lines, sum(len(line) + 1 for line in lines)
+
+        fragments = self._fragments.setdefault(obj, {})
+        rendered_revision, lines, size = fragments.get(key, (None, None, None))
+        if rendered_revision != revision:
+            lines = render(obj)
+            size = sum(len(line) + 1 for line in lines)
+            fragments[key] = revision, lines, size
+        return lines, size
+
     def commit(self):
-        sleep(self.commit_delay)
+        if not self.commit_delay:
+            return defer.succeed(None)
+
+        from twisted.internet import reactor
+        return task.deferLater(reactor, self.commit_delay, lambda: None)
+
+    def _attribute_changed(self, target, attribute, old_value, new_value):
+        indexed = self._indexed_values.get(target, {})
+        indexed_value = indexed.get(attribute)
+        if attribute in indexed:
+            indexed[attribute] = new_value
+
+        if isinstance(target, Vlan) and attribute == "number":
+            self._vlans_by_number.move(indexed_value, new_value, target)
+        elif isinstance(target, Vlan) and attribute == "name":
+            self._vlans_by_name.move(indexed_value, new_value, target)
+        elif isinstance(target, Port) and attribute == "name":
+            self._ports_by_name.move(indexed_value, new_value, target)
+            self._ports_by_partial_name.remove(indexed_value, target)
+            self._ports_by_partial_name.add(new_value, target)
+        elif isinstance(target, Port) and attribute in _VlanMembershipIndex.ATTRIBUTES:
+            self._vlan_members.update(target, attribute, indexed_value, new_value)
+        elif isinstance(target, Port) and attribute == "ips":
+            self._addresses.update(target)
+
+        self._record("changed", target, attribute, old_value, new_value)
+
+    def _record(self, action, target, attribute=None, old_value=None, new_value=None):
+        self.version += 1
+        owner = target.port or target if isinstance(target, VRRP) else target
+        if action == "removed":
+            self._revisions.pop(owner, None)
+            self._fragments.pop(owner, None)
+        else:
+            self._revisions[owner] = self.version
+        change = Change(self.version, action, target, attribute, old_value, new_value)
+        self._journal.append(change)
+        for subscriber in list(self._subscribers):
+            subscriber(change)
+
+
+class _Index(object):
+    def __init__(self):
+        self._buckets = {}
+
+    def first(self, key):
+        bucket = self._buckets.get(key)
+        return bucket[0][1] if bucket else None
+
+    def add(self, key, obj):
+        insort(self._buckets.setdefault(key, []), (obj._rank, obj))
+
+    def remove(self, key, obj):
+        bucket = self._buckets.get(key, [])
+        position = bisect_left(bucket, (obj._rank,))
+        if position < len(bucket) and bucket[position][1] is obj:
+            bucket.pop(position)
+            if not bucket:
+                del self._buckets[key]
+
+    def move(self, old_key, new_key, obj):
+        self.remove(old_key, obj)
+        self.add(new_key, obj)
+
+    def all(self, *keys):
+        if len(keys) == 1:
+            return [obj for _, obj in self._buckets.get(keys[0], [])]
+        return _in_rank_order(obj for key in keys for _, obj in self._buckets.get(key, []))
+
+
+def _in_rank_order(objects):
+    by_rank = dict((obj._rank, obj) for obj in objects)
+    return [by_rank[rank] for rank in sorted(by_rank)]
+
+
+class _VlanMembershipIndex(object):
+    """
+    Ports by access vlan, native vlan and tagged vlan, in port order.
+
+    The tagged vlans of each port are remembered so that a trunk vlan list
+    changed in place only moves the port in and out of the vlans that differ.
+    """
+    ATTRIBUTES = ("access_vlan", "trunk_native_vlan", "trunk_vlans")
+
+    def __init__(self):
+        self.access = _Index()
+        self.native = _Index()
+        self.tagged = _Index()
+        self._tagged_vlans = {}
+
+    def add(self, port):
+        self.access.add(port.access_vlan, port)
+        self.native.add(port.trunk_native_vlan, port)
+        self._tag(port, port.trunk_vlans)
+
+    def remove(self, port, access_vlan, native_vlan):
+        self.access.remove(access_vlan, port)
+        self.native.remove(native_vlan, port)
+        self._tag(port, None)
+
+    def update(self, port, attribute, old_value, new_value):
+        if attribute == "access_vlan":
+            self.access.move(old_value, new_value, port)
+        elif attribute == "trunk_native_vlan":
+            self.native.move(old_value, new_value, port)
+        else:
+            self._tag(port, new_value)
+
+    def _tag(self, port, trunk_vlans):
+        vlans = VlanSet(trunk_vlans or [])
+        previous = self._tagged_vlans.pop(port, VlanSet())
+        for vlan in previous - vlans:
+            self.tagged.remove(vlan, port)
+        for vlan in vlans - previous:
+            self.tagged.add(vlan, port)
+        if vlans:
+            self._tagged_vlans[port] = vlans
+
+
+class _AddressIndex(object):
+    """
+    Interface networks of the vlan ports, keyed by prefix length and network bits.
+
+    Finding the networks containing an address is one lookup per prefix length
+    in use. Among them, the first network of the first port wins, as when
+    scanning the ports in order.
+    """
+
+    def __init__(self):
+        self._networks = {}
+        self._prefix_lengths = {4: {}, 6: {}}
+        self._indexed_ips = {}
+
+    def find(self, address):
+        matches = [self._networks[key][0] for key in
+                   (_network_key(address, prefix_length) for prefix_length in self._prefix_lengths[address.version])
+                   if key in self._networks]
+        if not matches:
+            return None, None
+        _, _, port, ip = min(matches)
+        return port, ip
+
+    def update(self, port):
+        self.remove(port)
+        if isinstance(port, VlanPort) and port.ips:
+            self._indexed_ips[port] = list(port.ips)
+            for position, ip in enumerate(port.ips):
+                insort(self._networks.setdefault(_network_key(ip.ip, ip.prefixlen), []), (port._rank, position, port, ip))
+                lengths = self._prefix_lengths[ip.version]
+                lengths[ip.prefixlen] = lengths.get(ip.prefixlen, 0) + 1
+
+    def remove(self, port):
+        for position, ip in enumerate(self._indexed_ips.pop(port, [])):
+            key = _network_key(ip.ip, ip.prefixlen)
+            bucket = self._networks[key]
+            bucket.pop(bisect_left(bucket, (port._rank, position)))
+            if not bucket:
+                del self._networks[key]
+
+            lengths = self._prefix_lengths[ip.version]
+            lengths[ip.prefixlen] -= 1
+            if lengths[ip.prefixlen] == 0:
+                del lengths[ip.prefixlen]
+
+
+def _network_key(address, prefix_length):
+    width = 32 if address.version == 4 else 128
+    return address.version, prefix_length, int(address) >> (width - prefix_length)
 
 
 class VRF(object):
@@ -125,9 +415,10 @@ class VRF(object):
 
 
 class Route(object):
-    def __init__(self, destination, mask, next_hop):
+    def __init__(self, destination, mask, next_hop, vrf=None):
         self.dest = IPNetwork("{}/{}".format(destination, mask))
         self.next_hop = IPAddress(next_hop)
+        self.vrf = vrf
 
     @property
     def destination(self):
@@ -138,7 +429,249 @@ class Route(object):
         return self.dest.netmask
 
 
-class Vlan(object):
+class _PartialNameIndex(object):
+    """
+    Resolves abbreviated port names such as "fa0/1" or "ethernet 1/2".
+
+    A port is keyed by its lowercased type (the part before the first digit)
+    and by every suffix of its name that starts with a digit, so a query is
+    one lookup per known type having the abbreviation as prefix.
+    """
+
+    def __init__(self):
+        self._ports = _Index()
+        self._types_by_abbreviation = {}
+
+    def first(self, type_abbreviation, number):
+        candidates = [port for port in (self._ports.first((port_type, number))
+                                        for port_type in self._types_by_abbreviation.get(type_abbreviation, {}))
+                      if port is not None]
+
+        return min(candidates, key=lambda port: port._rank) if candidates else None
+
+    def add(self, name, port):
+        port_type, suffixes = _split_for_abbreviations(name)
+        for suffix in suffixes:
+            self._ports.add((port_type, suffix), port)
+
+        for length in range(len(port_type) + 1):
+            types = self._types_by_abbreviation.setdefault(port_type[:length], {})
+            types[port_type] = types.get(port_type, 0) + 1
+
+    def remove(self, name, port):
+        port_type, suffixes = _split_for_abbreviations(name)
+        for suffix in suffixes:
+            self._ports.remove((port_type, suffix), port)
+
+        for length in range(len(port_type) + 1):
+            types = self._types_by_abbreviation[port_type[:length]]
+            types[port_type] -= 1
+            if types[port_type] == 0:
+                del types[port_type]
+                if not types:
+                    del self._types_by_abbreviation[port_type[:length]]
+
+
+def _split_for_abbreviations(name):
+    name = name.lower()
+    digits = [i for i, char in enumerate(name) if char.isdigit()]
+    port_type = name[:digits[0]] if digits else name
+    return port_type, [name[i:] for i in digits]
+
+
+class _ObservedContainer(object):
+    __slots__ = ()
+
+    def _changed(self):
+        if self._observer is not None:
+            owner, attribute = self._observer
+            owner._container_changed(attribute, self)
+
+
+class _ObservedList(_ObservedContainer, list):
+    __slots__ = ("_observer",)
+
+    def __init__(self, *args):
+        super(_ObservedList, self).__init__(*args)
+        self._observer = None
+
+    def __deepcopy__(self, memo):
+        return _ObservedList(deepcopy(list(self), memo))
+
+    def __copy__(self):
+        return _ObservedList(self)
+
+
+class _ObservedDict(_ObservedContainer, dict):
+    __slots__ = ("_observer",)
+
+    def __init__(self, *args, **kwargs):
+        super(_ObservedDict, self).__init__(*args, **kwargs)
+        self._observer = None
+
+    def __deepcopy__(self, memo):
+        return _ObservedDict(deepcopy(dict(self), memo))
+
+    def __copy__(self):
+        return _ObservedDict(self)
+
+
+def _notify_after(container_class, base_class, method_name):
+    method = getattr(base_class, method_name)
+
+    def notifying_method(self, *args, **kwargs):
+        result = method(self, *args, **kwargs)
+        self._changed()
+        return result
+
+    notifying_method.__name__ = method_name
+    setattr(container_class, method_name, notifying_method)
+
+
+for _method_name in ["append", "extend", "insert", "remove", "pop", "sort", "reverse",
+                     "__setitem__", "__delitem__", "__iadd__", "__imul__", "__setslice__", "__delslice__"]:
+    if hasattr(list, _method_name):
+        _notify_after(_ObservedList, list, _method_name)
+
+for _method_name in ["__setitem__", "__delitem__", "clear", "pop", "popitem", "setdefault", "update"]:
+    _notify_after(_ObservedDict, dict, _method_name)
+
+
+_CONTAINERS = (_ObservedList, _ObservedDict, VlanSet)
+
+
+def _observed(value, owner, attribute):
+    if type(value) is list:
+        value = _ObservedList(value)
+    elif type(value) is dict:
+        value = _ObservedDict(value)
+
+    if isinstance(value, _CONTAINERS):
+        value._observer = (owner, attribute)
+    return value
+
+
+class _Observed(object):
+    """
+    Base of the model objects: once the object belongs to a SwitchConfiguration,
+    its attribute changes, including the ones made in place on its lists, dicts
+    and vlan sets, are reported to that configuration.
+    """
+    __slots__ = ()
+
+    def __setattr__(self, attribute, value):
+        if attribute.startswith("_") or attribute == "switch_configuration":
+            object.__setattr__(self, attribute, value)
+            return
+
+        old_value = _peek(self, attribute)
+        value = _observed(value, self, attribute)
+        object.__setattr__(self, attribute, value)
+        if old_value is _UNKNOWN:
+            self._changed(attribute, None, value)
+        elif old_value is not _UNSET and old_value is not value and \
+                (isinstance(value, _CONTAINERS) or old_value != value):
+            self._changed(attribute, old_value, value)
+
+    def _container_changed(self, attribute, container):
+        self._changed(attribute, container, container)
+
+    def _changed(self, attribute, old_value, new_value):
+        configuration = self._observing_configuration()
+        if configuration is not None:
+            configuration._attribute_changed(self, attribute, old_value, new_value)
+
+    def _container_adopted(self, attribute, container):
+        pass
+
+    def _observing_configuration(self):
+        return getattr(self, "switch_configuration", None) if hasattr(self, "_rank") else None
+
+
+_UNSET = object()
+_UNKNOWN = object()
+
+
+def _peek(obj, attribute):
+    """
+    The stored value of an attribute, read without running any getter.  An
+    attribute that an objects_overrides class turned into a property has an
+    _UNKNOWN value: its changes are reported with None as old value.
+    """
+    descriptor = getattr(type(obj), attribute, None)
+    if isinstance(descriptor, _LazyContainer):
+        return descriptor.peek(obj)
+    if isinstance(descriptor, MemberDescriptorType):
+        try:
+            return descriptor.__get__(obj, type(obj))
+        except AttributeError:
+            return _UNSET
+    if hasattr(descriptor, "__set__"):
+        return _UNKNOWN
+    return getattr(obj, "__dict__", {}).get(attribute, _UNSET)
+
+
+def stored_attributes(obj):
+    """
+    The public attributes of a vlan, a port or a vrrp group as (name, value)
+    pairs, read from where they are stored: no getter runs and no lazy
+    container gets allocated.  Attributes that an objects_overrides class
+    turned into properties are left out, whatever they store is in its own
+    attributes.
+    """
+    for attribute in _stored_attribute_names(type(obj)) + list(getattr(obj, "__dict__", ())):
+        if not attribute.startswith("_") and attribute != "switch_configuration":
+            value = _peek(obj, attribute)
+            if value is not _UNSET and value is not _UNKNOWN:
+                yield attribute, value
+
+
+_attribute_names_by_class = {}
+
+
+def _stored_attribute_names(cls):
+    if cls not in _attribute_names_by_class:
+        names = []
+        for klass in reversed(cls.__mro__):
+            names.extend(getattr(klass, "__slots__", ()))
+            names.extend(value.attribute for value in vars(klass).values() if isinstance(value, _LazyContainer))
+        _attribute_names_by_class[cls] = list(OrderedDict.fromkeys(names))
+    return _attribute_names_by_class[cls]
+
+
+class _LazyContainer(object):
+    def __init__(self, slot, factory):
+        self.slot = slot
+        self.attribute = slot.lstrip("_")
+        self.factory = factory
+
+    def __get__(self, obj, owner):
+        if obj is None:
+            return self
+
+        container = self.peek(obj)
+        if container is None:
+            container = self.factory()
+            setattr(obj, self.slot, container)
+        if not isinstance(container, _CONTAINERS) or container._observer is None or container._observer[0] is not obj:
+            container = _observed(container, obj, self.attribute)
+            setattr(obj, self.slot, container)
+            obj._container_adopted(self.attribute, container)
+        return container
+
+    def __set__(self, obj, container):
+        if container is not None:
+            container = _observed(container, obj, self.attribute)
+            obj._container_adopted(self.attribute, container)
+        setattr(obj, self.slot, container)
+
+    def peek(self, obj):
+        return getattr(obj, self.slot, None)
+
+
+class Vlan(_Observed):
+    __slots__ = ("number", "name", "_rank", "description", "switch_configuration")
+
     def __init__(self, number=None, name=None, description=None, switch_configuration=None):
         self.number = number
         self.name = name
@@ -146,12 +679,21 @@ class Vlan(object):
         self.switch_configuration = switch_configuration
 
 
-class Port(object):
+class Port(_Observed):
+    __slots__ = ("name", "_rank", "switch_configuration", "description", "mode", "access_vlan", "trunk_vlans",
+                 "trunk_native_vlan", "trunk_encapsulation_mode", "shutdown", "vrf", "speed", "auto_negotiation",
+                 "aggregation_membership", "mtu", "_vendor_specific", "_ip_helpers", "lldp_transmit", "lldp_receive",
+                 "lldp_med", "lldp_med_transmit_capabilities", "lldp_med_transmit_network_policy", "spanning_tree",
+                 "spanning_tree_portfast", "__weakref__")
+
     def __init__(self, name):
         self.name = name
         self.switch_configuration = None
         self.reset()
 
+    vendor_specific = _LazyContainer("_vendor_specific", _ObservedDict)
+    ip_helpers = _LazyContainer("_ip_helpers", _ObservedList)
+
     def reset(self):
         self.description = None
         self.mode = None
@@ -165,8 +707,8 @@ class Port(object):
         self.auto_negotiation = None
         self.aggregation_membership = None
         self.mtu = None
-        self.vendor_specific = {}
-        self.ip_helpers = []
+        self.vendor_specific = None
+        self.ip_helpers = None
         self.lldp_transmit = None
         self.lldp_receive = None
         self.lldp_med = None
@@ -180,8 +722,12 @@ class Port(object):
         return name[:length] + number
 
 
-class VRRP(object):
+class VRRP(_Observed):
+    __slots__ = ("group_id", "ip_addresses", "description", "authentication", "timers_hello", "timers_hold",
+                 "priority", "_track", "preempt", "preempt_delay_minimum", "activated", "advertising", "_port")
+
     def __init__(self, group_id):
+        self._port = None
         self.group_id = group_id
         self.ip_addresses = None
         self.description = None
@@ -189,26 +735,46 @@ class VRRP(object):
         self.timers_hello = None
         self.timers_hold = False
         self.priority = None
-        self.track = {}
+        self.track = None
         self.preempt = None
         self.preempt_delay_minimum = None
         self.activated = None
         self.advertising = None
 
+    track = _LazyContainer("_track", _ObservedDict)
+
+    @property
+    def port(self):
+        port = self._port() if self._port is not None else None
+        if port is not None and any(vrrp is self for vrrp in port._vrrps or []):
+            return port
+        return None
+
+    def _observing_configuration(self):
+        port = self.port
+        return port._observing_configuration() if port is not None else None
+
 
 class VlanPort(Port):
+    __slots__ = ("vlan_id", "access_group_in", "access_group_out", "_ips", "_secondary_ips",
+                 "vrrp_common_authentication", "_vrrps", "ip_redirect")
+
     def __init__(self, vlan_id, *args, **kwargs):
         super(VlanPort, self).__init__(*args, **kwargs)
 
         self.vlan_id = vlan_id
         self.access_group_in = None
         self.access_group_out = None
-        self.ips = []
-        self.secondary_ips = []
+        self.ips = None
+        self.secondary_ips = None
         self.vrrp_common_authentication = None
-        self.vrrps = []
+        self.vrrps = None
         self.ip_redirect = True
 
+    ips = _LazyContainer("_ips", _ObservedList)
+    secondary_ips = _LazyContainer("_secondary_ips", _ObservedList)
+    vrrps = _LazyContainer("_vrrps", _ObservedList)
+
     def get_vrrp_group(self, group):
         return next((vrrp for vrrp in self.vrrps if vrrp.group_id == group), None)
 
@@ -233,8 +799,20 @@ class VlanPort(Port):
         if ip:
             self.secondary_ips.remove(ip)
 
+    def _container_changed(self, attribute, container):
+        if attribute == "vrrps":
+            self._container_adopted(attribute, container)
+        super(VlanPort, self)._container_changed(attribute, container)
+
+    def _container_adopted(self, attribute, container):
+        if attribute == "vrrps":
+            for vrrp in container:
+                vrrp._port = weakref.ref(self)
+
 
 class AggregatedPort(Port):
+    __slots__ = ("lacp_active", "lacp_periodic")
+
     def reset(self):
         self.lacp_active = False
         self.lacp_periodic = None
@@ -39,7 +39,10 @@ class TerminalController(object):
 
     Resume normal input handling:
     >>> terminal_controller.remove_any_key_handler()
+
+    The lines per page of the session, when set, are kept in terminal_length.
     """
+    terminal_length = None
 
     def write(self, text):
         """
@@ -67,6 +70,19 @@ class TerminalController(object):
         """
         raise NotImplemented()
 
+    def flush(self):
+        """
+        Send out anything written but held back by the controller.
+        """
+        return None
+
+    def pop_output(self):
+        """
+        Return the text written since the last call for controllers keeping
+        it, None for the others.
+        """
+        return None
+
 
 class LoggingTerminalController(TerminalController):
 
@@ -81,7 +97,7 @@ class LoggingTerminalController(TerminalController):
         self.terminal_controller = terminal_controller
 
     def write(self, text):
-        self.logger.debug("replying: %s" % repr(text))
+        self.logger.debug("replying: %r", text)
         return self.terminal_controller.write(text)
 
     def add_any_key_handler(self, callback, *params):
@@ -90,6 +106,55 @@ class LoggingTerminalController(TerminalController):
     def remove_any_key_handler(self):
         return self.terminal_controller.remove_any_key_handler()
 
+    def flush(self):
+        return self.terminal_controller.flush()
+
+    def pop_output(self):
+        return self.terminal_controller.pop_output()
+
+
+class BufferedTerminalController(TerminalController):
+
+    def __init__(self, terminal_controller, max_pending=65536):
+        """
+        Hold everything written until flush() sends it to the wrapped
+        controller as a single write.  Starting to wait for a keystroke
+        flushes, the user has to see what they are answering to.
+
+        :param terminal_controller: the real terminal controller
+        :type terminal_controller: TerminalController
+        :param max_pending: flush as soon as that many characters are held
+        """
+        self.terminal_controller = terminal_controller
+        self.max_pending = max_pending
+        self.pending = []
+        self.pending_size = 0
+
+    def write(self, text):
+        self.pending.append(text)
+        self.pending_size += len(text)
+        if self.pending_size >= self.max_pending:
+            self.flush()
+
+    def add_any_key_handler(self, callback, *params):
+        self.flush()
+        return self.terminal_controller.add_any_key_handler(callback, *params)
+
+    def remove_any_key_handler(self):
+        return self.terminal_controller.remove_any_key_handler()
+
+    def flush(self):
+        if self.pending:
+            text = "".join(self.pending)
+            del self.pending[:]
+            self.pending_size = 0
+            self.terminal_controller.write(text)
+        return self.terminal_controller.flush()
+
+    def pop_output(self):
+        self.flush()
+        return self.terminal_controller.pop_output()
+
 
 class NoopTerminalController(TerminalController):
 
@@ -101,3 +166,21 @@ class NoopTerminalController(TerminalController):
 
     def remove_any_key_handler(self):
         return None
+
+
+class CapturingTerminalController(NoopTerminalController):
+    """
+    Keeps what is written instead of sending it anywhere, for sessions
+    driven in-process with ShellSession.execute_batch.
+    """
+
+    def __init__(self):
+        self.output = []
+
+    def write(self, text):
+        self.output.append(text)
+
+    def pop_output(self):
+        text = "".join(self.output)
+        del self.output[:]
+        return text
@@ -32,11 +32,10 @@ class SwitchSSHShell(recvline.HistoricRecvLine):
         self.session = self.switch_core.launch("ssh", SshTerminalController(
             shell=self
         ))
+        self.session.ended.addCallback(lambda _: self.terminal.loseConnection())
 
     def lineReceived(self, line):
-        still_listening = self.session.receive(line)
-        if not still_listening:
-            self.terminal.loseConnection()
+        self.session.receive(line)
 
     def keystrokeReceived(self, keyID, modifier):
         if keyID in self._printableChars:
@@ -64,10 +63,7 @@ class SwitchSSHShell(recvline.HistoricRecvLine):
         self.lineBufferIndex += 1
 
     def get_actual_processor(self):
-        proc = self.session.command_processor
-        while proc.sub_processor is not None:
-            proc = proc.sub_processor
-        return proc
+        return self.session.active_processor
 
 
 class SshTerminalController(TerminalController):
@@ -116,19 +116,17 @@ class SwitchTelnetShell(StatefulTelnet):
         self.disable_input_replacement()
         self.session = self.switch_core.launch(
             "telnet", TelnetTerminalController(shell=self))
+        self.session.ended.addCallback(lambda _: self.transport.loseConnection())
         self.handler = self.command
 
     def command(self, line):
-        keep_going = self.session.receive(line)
+        self.session.receive(line)
 
         if self.session.command_processor.replace_input is False:
             self.disable_input_replacement()
         else:
             self.enable_input_replacement(self.session.command_processor.replace_input)
 
-        if not keep_going:
-            self.transport.loseConnection()
-
     def applicationDataReceived(self, data):
         if data in self._printable_chars:
             if self.awaiting_keystroke is not None:
@@ -142,10 +140,7 @@ class SwitchTelnetShell(StatefulTelnet):
     def get_actual_processor(self):
         if not self.session:
             return None
-        command_processor = self.session.command_processor
-        while command_processor.sub_processor is not None:
-            command_processor = command_processor.sub_processor
-        return command_processor
+        return self.session.active_processor
 
     def handle_keystroke(self, data):
         command_processor = self.get_actual_processor()
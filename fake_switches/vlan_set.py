@@ -0,0 +1,160 @@
+# Copyright 2015-2016 Internap.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+class VlanSet(object):
+    """
+    Set of vlan numbers stored as a bitmap.
+
+    It iterates in ascending order and accepts the list operations used on
+    trunk vlans (append, remove, +=, len, in), so it can stand in for the
+    lists that were used before.
+
+    >>> vlans = VlanSet([10, 3])
+    >>> vlans.add_range(5, 7)
+    >>> list(vlans)
+    [3, 5, 6, 7, 10]
+    >>> list(vlans.ranges())
+    [(3, 3), (5, 7), (10, 10)]
+    """
+    __slots__ = ("_bits", "_observer")
+
+    def __init__(self, vlans=None):
+        self._bits = 0
+        self._observer = None
+        if vlans is not None:
+            self.update(vlans)
+
+    @classmethod
+    def of_range(cls, first, last):
+        vlans = cls()
+        vlans.add_range(first, last)
+        return vlans
+
+    def add(self, vlan):
+        self._set_bits(self._bits | 1 << vlan)
+
+    append = add
+
+    def discard(self, vlan):
+        self._set_bits(self._bits & ~(1 << vlan))
+
+    def remove(self, vlan):
+        if vlan not in self:
+            raise ValueError("{} is not in the vlan set".format(vlan))
+        self.discard(vlan)
+
+    def add_range(self, first, last):
+        if first <= last:
+            self._set_bits(self._bits | _mask(first, last))
+
+    def remove_range(self, first, last):
+        if first <= last:
+            self._set_bits(self._bits & ~_mask(first, last))
+
+    def update(self, vlans):
+        self._set_bits(self._bits | _bits_of(vlans))
+
+    extend = update
+
+    def difference_update(self, vlans):
+        self._set_bits(self._bits & ~_bits_of(vlans))
+
+    def ranges(self):
+        starts = self._bits & ~(self._bits << 1)
+        ends = self._bits & ~(self._bits >> 1)
+        while starts:
+            start, starts = _pop_lowest(starts)
+            end, ends = _pop_lowest(ends)
+            yield start, end
+
+    def _set_bits(self, bits):
+        if bits != self._bits:
+            self._bits = bits
+            if self._observer is not None:
+                owner, attribute = self._observer
+                owner._container_changed(attribute, self)
+
+    def __iadd__(self, vlans):
+        self.update(vlans)
+        return self
+
+    def __isub__(self, vlans):
+        self.difference_update(vlans)
+        return self
+
+    def __add__(self, vlans):
+        result = VlanSet(self)
+        result.update(vlans)
+        return result
+
+    def __sub__(self, vlans):
+        result = VlanSet(self)
+        result.difference_update(vlans)
+        return result
+
+    def __contains__(self, vlan):
+        return isinstance(vlan, int) and vlan >= 0 and bool(self._bits >> vlan & 1)
+
+    def __iter__(self):
+        bits = self._bits
+        while bits:
+            vlan, bits = _pop_lowest(bits)
+            yield vlan
+
+    def __len__(self):
+        return bin(self._bits).count("1")
+
+    def __bool__(self):
+        return self._bits != 0
+
+    __nonzero__ = __bool__
+
+    def __eq__(self, other):
+        if isinstance(other, VlanSet):
+            return self._bits == other._bits
+        return list(self) == other
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = None
+
+    def __copy__(self):
+        return VlanSet(self)
+
+    def __deepcopy__(self, memo):
+        return VlanSet(self)
+
+    def __repr__(self):
+        return "VlanSet({!r})".format(list(self))
+
+
+def _bits_of(vlans):
+    if isinstance(vlans, VlanSet):
+        return vlans._bits
+
+    bits = 0
+    for vlan in vlans:
+        bits |= 1 << vlan
+    return bits
+
+
+def _mask(first, last):
+    return ((1 << (last - first + 1)) - 1) << first
+
+
+def _pop_lowest(bits):
+    lowest = bits & -bits
+    return lowest.bit_length() - 1, bits ^ lowest
@@ -0,0 +1,72 @@
+# Copyright 2016 Internap.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Throughput of a Cisco session running configuration lines interactively,
+one ShellSession.receive per line, against the same lines run with
+ShellSession.execute_script.  Every run is checked against the vlans its lines
+define before its throughput is reported.
+
+    python -m tests.benchmark_shell_session [lines ...]
+"""
+
+import logging
+import sys
+import time
+
+from fake_switches.cisco.cisco_core import CiscoSwitchCore
+from fake_switches.switch_configuration import SwitchConfiguration
+from fake_switches.terminal import CapturingTerminalController
+from tests.benchmark_tftp_config_push import CISCO_BLOCK, generate_config, expected_vlans
+
+SIZES = [1000, 10000, 100000]
+
+
+def interactively(session, lines):
+    for line in lines:
+        session.receive(line)
+        session.command_processor.terminal_controller.pop_output()
+
+
+def scripted(session, lines):
+    session.execute_script(lines)
+
+
+def run(execute, lines):
+    configuration = SwitchConfiguration("127.0.0.1", name="benchmark", auto_enabled=True)
+    session = CiscoSwitchCore(configuration).launch("benchmark", CapturingTerminalController())
+
+    start = time.time()
+    execute(session, ["configure terminal"] + lines)
+    return configuration, time.time() - start
+
+
+def main(*sizes):
+    for size in [int(size) for size in sizes] or SIZES:
+        lines = generate_config(CISCO_BLOCK, size).splitlines()
+        elapsed = {}
+        for execute in (interactively, scripted):
+            configuration, elapsed[execute] = run(execute, lines)
+
+            vlans = dict((vlan.number, vlan.name) for vlan in configuration.vlans if vlan.number != 1)
+            if vlans != expected_vlans(CISCO_BLOCK, 1, size):
+                raise AssertionError("{} did not configure the vlans of its {} lines".format(execute.__name__, size))
+            print("{:<14} {:>8} lines {:>8.2f}s {:>10.0f} lines/s".format(
+                execute.__name__, size, elapsed[execute], size / elapsed[execute]))
+        print("{:<14} {:>8} lines {:>8.2f}x".format("speedup", size, elapsed[interactively] / elapsed[scripted]))
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING)
+    main(*sys.argv[1:])
@@ -0,0 +1,109 @@
+# Copyright 2016 Internap.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Configuration push throughput of the Cisco and Brocade configuration
+processors, the file being downloaded the way copy tftp:// and ncopy tftp do
+from an in-process TFTP server.  Every push is checked against the vlans its
+file defines before its throughput is reported.
+
+    python -m tests.benchmark_tftp_config_push [lines ...]
+"""
+
+import logging
+import sys
+import time
+
+from twisted.internet import defer, task
+
+from fake_switches.adapters import tftp_reader
+from fake_switches.brocade.command_processor.config import ConfigCommandProcessor as BrocadeConfigCommandProcessor
+from fake_switches.cisco.command_processor.config import ConfigCommandProcessor as CiscoConfigCommandProcessor
+from fake_switches.command_processing.switch_tftp_parser import SwitchTftpParser
+from fake_switches.switch_configuration import SwitchConfiguration
+from tests.util.tftp_server import LocalTftpServer
+
+SIZES = [1000, 10000, 100000, 1000000]
+VLAN_NUMBERS = 4000
+
+CISCO_BLOCK = ["vlan {number}", " name VLAN{index}", "exit"]
+BROCADE_BLOCK = ["vlan {number} name VLAN{index}", "exit"]
+
+VENDORS = [
+    ("cisco", CiscoConfigCommandProcessor, CISCO_BLOCK, 1),
+    ("brocade", BrocadeConfigCommandProcessor, BROCADE_BLOCK, 0),
+]
+
+
+def generate_config(block, size):
+    return "\n".join(block[i % len(block)].format(number=_vlan_number(i // len(block)), index=i // len(block))
+                     for i in range(size)) + "\n"
+
+
+def expected_vlans(block, name_line, size):
+    names = {}
+    for start in range(0, size, len(block)):
+        index = start // len(block)
+        names.setdefault(_vlan_number(index), None)
+        if start + name_line < size:
+            names[_vlan_number(index)] = "VLAN{}".format(index)
+    return names
+
+
+def _vlan_number(index):
+    return 2 + index % VLAN_NUMBERS
+
+
+class PortReader(object):
+    def __init__(self, port):
+        self.port = port
+
+    def read_tftp(self, server, remote_filename):
+        return tftp_reader.read_tftp(server, remote_filename, port=self.port)
+
+
+@defer.inlineCallbacks
+def push(reader, processor_class, filename):
+    configuration = SwitchConfiguration("127.0.0.1", name="benchmark")
+    parser = SwitchTftpParser(configuration, reader=reader)
+
+    start = time.time()
+    yield parser.parse_async("127.0.0.1", filename, processor_class)
+    defer.returnValue((configuration, time.time() - start))
+
+
+@defer.inlineCallbacks
+def main(_, *sizes):
+    sizes = [int(size) for size in sizes] or SIZES
+    files = {}
+
+    with LocalTftpServer(files=files) as server:
+        reader = PortReader(server.port)
+        for name, processor_class, block, name_line in VENDORS:
+            for size in sizes:
+                filename = "{}-{}.cfg".format(name, size)
+                files[filename] = generate_config(block, size)
+
+                configuration, elapsed = yield push(reader, processor_class, filename)
+
+                vlans = dict((vlan.number, vlan.name) for vlan in configuration.vlans)
+                if vlans != expected_vlans(block, name_line, size):
+                    raise AssertionError("{} did not configure the vlans of its {} lines".format(name, size))
+                print("{:<8} {:>8} lines {:>8.2f}s {:>10.0f} lines/s".format(name, size, elapsed, size / elapsed))
+                del files[filename]
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING)
+    task.react(main, sys.argv[1:])
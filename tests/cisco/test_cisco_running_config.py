@@ -0,0 +1,28 @@
+import logging
+import unittest
+
+from hamcrest import assert_that, equal_to
+
+from fake_switches.cisco.command_processor.enabled import EnabledCommandProcessor
+from fake_switches.command_processing.piping_processor_base import NotPipingProcessor
+from fake_switches.switch_configuration import SwitchConfiguration, Port, Vlan
+from fake_switches.terminal import CapturingTerminalController
+
+
+class CiscoRunningConfigTest(unittest.TestCase):
+    def setUp(self):
+        self.configuration = SwitchConfiguration("127.0.0.1", name="my_switch", vlans=[Vlan(10, "ten")],
+                                                 ports=[Port("FastEthernet0/1"), Port("FastEthernet0/2")])
+        self.terminal = CapturingTerminalController()
+        self.terminal.terminal_length = 0
+        self.processor = EnabledCommandProcessor(self.configuration, self.terminal, logging.getLogger(),
+                                                 NotPipingProcessor())
+
+    def test_the_announced_size_is_the_size_of_the_configuration_shown(self):
+        self.processor.process_command("show running-config")
+        self.configuration.ports[1].description = "uplink"
+        self.processor.process_command("show running-config")
+
+        for output in self.terminal.pop_output().split("my_switch#")[:-1]:
+            header, body = output.split(" bytes\n", 1)
+            assert_that(int(header.rsplit(" ", 1)[1]), equal_to(len(body)))
@@ -0,0 +1,56 @@
+import unittest
+from hamcrest import assert_that, is_, equal_to, is_not, none
+from fake_switches.juniper.candidate_configuration import CandidateConfiguration
+from fake_switches.switch_configuration import SwitchConfiguration, Port, Vlan
+
+
+class CandidateConfigurationTest(unittest.TestCase):
+    def setUp(self):
+        self.running = SwitchConfiguration("127.0.0.1", ports=[Port("ge-0/0/1"), Port("ge-0/0/2")],
+                                           vlans=[Vlan(10, "VLAN10")])
+        self.candidate = CandidateConfiguration(self.running)
+
+    def test_reads_the_running_objects_until_they_are_modified(self):
+        assert_that(self.candidate.has_changes(), is_(False))
+        assert_that(self.candidate.ports[0], is_(self.running.ports[0]))
+
+        port = self.candidate.get_port_by_partial_name("ge-0/0/1")
+        port.description = "candidate"
+
+        assert_that(port, is_not(self.running.ports[0]))
+        assert_that(self.candidate.ports[0], is_(port))
+        assert_that(self.candidate.get_port_by_partial_name("ge-0/0/1"), is_(port))
+        assert_that(self.running.ports[0].description, is_(none()))
+        assert_that(self.candidate.changed_ports(), equal_to([port]))
+
+    def test_added_and_removed_objects(self):
+        self.candidate.remove_vlan(self.candidate.get_vlan_by_name("VLAN10"))
+        self.candidate.add_vlan(Vlan(20, "VLAN20"))
+
+        assert_that([v.name for v in self.candidate.vlans], equal_to(["VLAN20"]))
+        assert_that(self.candidate.get_vlan_by_name("VLAN10"), is_(none()))
+        assert_that(self.candidate.removed_vlans(), equal_to([self.running.vlans[0]]))
+        assert_that([v.name for v in self.running.vlans], equal_to(["VLAN10"]))
+
+    def test_vlans_are_found_by_number_through_the_running_index(self):
+        vlan = self.candidate.get_vlan(10)
+        self.candidate.add_vlan(Vlan(20, "VLAN20"))
+
+        assert_that(vlan, is_not(self.running.vlans[0]))
+        assert_that(self.candidate.get_vlan(10), is_(vlan))
+        assert_that(self.candidate.get_vlan(20).name, equal_to("VLAN20"))
+        assert_that(self.candidate.get_vlan(30), is_(none()))
+
+        vlan.number = 11
+        assert_that(self.candidate.get_vlan(10), is_(none()))
+        assert_that(self.candidate.get_vlan(11), is_(vlan))
+
+    def test_clear_drops_the_changes(self):
+        self.candidate.get_vlan_by_name("VLAN10").number = 11
+        self.candidate.add_port(Port("ge-0/0/3"))
+
+        self.candidate.clear()
+
+        assert_that(self.candidate.has_changes(), is_(False))
+        assert_that(self.candidate.vlans[0].number, equal_to(10))
+        assert_that(len(self.candidate.ports), equal_to(2))
@@ -4,11 +4,14 @@ import unittest
 from hamcrest.core.base_matcher import BaseMatcher
 import re
 from hamcrest import assert_that, ends_with, equal_to, has_length, has_key
+from lxml import etree
 from mock import Mock
 from ncclient.xml_ import to_ele, to_xml
-from fake_switches.netconf import RUNNING, dict_2_etree
+from twisted.internet.defer import Deferred
+from fake_switches.netconf import RUNNING, dict_2_etree, Response
 from fake_switches.netconf.capabilities import filter_content
 from fake_switches.netconf.netconf_protocol import NetconfProtocol
+from fake_switches.instrumentation import command_statistics
 
 
 class NetconfProtocolTest(unittest.TestCase):
@@ -213,6 +216,84 @@ class NetconfProtocolTest(unittest.TestCase):
         assert_that(content.xpath("//data/configuration/element/*"), has_length(2))
         assert_that(content.xpath("//data/configuration/element/attribute/*"), has_length(1))
 
+    def test_requests_received_while_a_reply_is_pending_are_answered_in_order(self):
+        committed = Deferred()
+        self.netconf.datastore.set_data(RUNNING, {"configuration": {"stuff": "is cool!"}})
+        self.netconf.capabilities[0].commit = lambda _: committed.addCallback(lambda _: Response(etree.Element("ok")))
+        self.netconf.connectionMade()
+        self.say_hello()
+
+        self.netconf.dataReceived("""
+            <rpc xmlns="urn:ietf:params:xml:ns:netconf:base:1.0" message-id="1"><commit/></rpc>
+            ]]>]]>""")
+        self.netconf.dataReceived("""
+            <rpc xmlns="urn:ietf:params:xml:ns:netconf:base:1.0" message-id="2">
+              <get-config><source><running /></source></get-config>
+            </rpc>
+            ]]>]]>""")
+
+        assert_that(self.netconf.transport.write.call_count, equal_to(1))
+
+        committed.callback(None)
+
+        assert_that(self.netconf.transport.write.call_count, equal_to(3))
+        assert_that(self.netconf.transport.write.call_args_list[1][0][0], xml_equals_to("""
+            <rpc-reply xmlns="urn:ietf:params:xml:ns:netconf:base:1.0" message-id="1">
+              <ok/>
+            </rpc-reply>
+            ]]>]]>
+            """))
+        self.assert_xml_response("""
+            <rpc-reply xmlns="urn:ietf:params:xml:ns:netconf:base:1.0" message-id="2">
+                <data>
+                  <configuration>
+                    <stuff>is cool!</stuff>
+                  </configuration>
+                </data>
+            </rpc-reply>
+            """)
+
+    def test_an_operation_failing_unexpectedly_is_answered_with_an_error(self):
+        committed = Deferred()
+        self.netconf.capabilities[0].commit = lambda _: committed
+        self.netconf.connectionMade()
+        self.say_hello()
+
+        self.netconf.dataReceived("""
+            <rpc xmlns="urn:ietf:params:xml:ns:netconf:base:1.0" message-id="1"><commit/></rpc>
+            ]]>]]>""")
+        committed.errback(KeyError("stuff"))
+
+        self.assert_xml_response("""
+            <rpc-reply xmlns="urn:ietf:params:xml:ns:netconf:base:1.0" message-id="1">
+              <rpc-error>
+                <error-type>application</error-type>
+                <error-tag>operation-failed</error-tag>
+                <error-severity>error</error-severity>
+                <error-message>'stuff'</error-message>
+              </rpc-error>
+            </rpc-reply>
+            """)
+        assert_that(self.netconf.transport.loseConnection.called, equal_to(False))
+        assert_that(self.netconf.awaiting_result, equal_to(None))
+
+    def test_operations_are_recorded_in_the_command_statistics(self):
+        command_statistics.reset()
+        self.netconf.connectionMade()
+        self.say_hello()
+
+        self.netconf.dataReceived("""
+            <rpc xmlns="urn:ietf:params:xml:ns:netconf:base:1.0" message-id="67890">
+              <get-config>
+                <source><running /></source>
+              </get-config>
+            </rpc>
+            ]]>]]>""")
+
+        metrics = command_statistics.get("netconf", "get_config")
+        assert_that(metrics.count, equal_to(1))
+        assert_that(metrics.output_size.max, equal_to(len(self.netconf.transport.write.call_args[0][0])))
+
     def say_hello(self):
         self.netconf.dataReceived(
             '<hello xmlns:nc="urn:ietf:params:xml:ns:netconf:base:1.0"><capabilities><capability>urn:ietf:params:xml:ns:netconf:base:1.0</capability></capabilities></hello>]]>]]>')
@@ -0,0 +1,89 @@
+import logging
+import unittest
+from hamcrest import assert_that, equal_to, is_
+from fake_switches.command_processing.base_command_processor import BaseCommandProcessor
+from fake_switches.command_processing.piping_processor_base import NotPipingProcessor
+from fake_switches.terminal import TerminalController
+
+
+class BaseCommandProcessorTest(unittest.TestCase):
+    def setUp(self):
+        self.terminal = RecordingTerminalController()
+        self.root = RootProcessor(None, self.terminal, logging.getLogger(), NotPipingProcessor())
+
+    def test_lines_go_to_the_active_mode(self):
+        self.root.process_command("configure")
+        self.root.process_command("interface 1")
+
+        assert_that(self.modes(), equal_to(["root", "config", "interface 1"]))
+        assert_that(self.root.active_processor.parent, is_(self.root.sub_processor))
+        assert_that(self.terminal.written[-1], equal_to("(config-if 1)#"))
+
+    def test_lines_unknown_to_the_active_mode_fall_back_to_its_parents(self):
+        self.root.process_command("configure")
+        self.root.process_command("interface 1")
+
+        assert_that(self.root.process_command("interface 2"), is_(True))
+        assert_that(self.modes(), equal_to(["root", "config", "interface 2"]))
+
+        assert_that(self.root.process_command("reload"), is_(False))
+        assert_that(self.modes(), equal_to(["root", "config", "interface 2"]))
+
+    def test_exiting_a_mode_returns_to_its_parent(self):
+        self.root.process_command("configure")
+        self.root.process_command("interface 1")
+
+        self.root.process_command("exit")
+        assert_that(self.modes(), equal_to(["root", "config"]))
+        assert_that(self.terminal.written[-1], equal_to("(config)#"))
+
+        self.root.process_command("exit")
+        assert_that(self.modes(), equal_to(["root"]))
+        assert_that(self.root.sub_processor, is_(None))
+        assert_that(self.terminal.written[-1], equal_to("#"))
+
+    def modes(self):
+        return [processor.name for processor in self.root.mode_stack]
+
+
+class RecordingTerminalController(TerminalController):
+    def __init__(self):
+        self.written = []
+
+    def write(self, text):
+        self.written.append(text)
+
+
+class RootProcessor(BaseCommandProcessor):
+    name = "root"
+
+    def get_prompt(self):
+        return "#"
+
+    def do_configure(self):
+        self.move_to(ConfigProcessor)
+
+
+class ConfigProcessor(BaseCommandProcessor):
+    name = "config"
+
+    def get_prompt(self):
+        return "(config)#"
+
+    def do_interface(self, number):
+        self.move_to(InterfaceProcessor, number)
+
+    def do_exit(self):
+        self.is_done = True
+
+
+class InterfaceProcessor(BaseCommandProcessor):
+    def __init__(self, switch_configuration, terminal_controller, logger, piping_processor, number):
+        super(InterfaceProcessor, self).__init__(switch_configuration, terminal_controller, logger, piping_processor)
+        self.name = "interface " + number
+
+    def get_prompt(self):
+        return "(config-if {})#".format(self.name.split()[1])
+
+    def do_exit(self):
+        self.is_done = True
@@ -0,0 +1,39 @@
+import unittest
+from hamcrest import assert_that, equal_to, is_, none
+from fake_switches.command_processing.command_processor import CommandProcessor
+
+
+class CommandProcessorTest(unittest.TestCase):
+    def test_abbreviations_resolve_to_the_first_handler_in_sorted_order(self):
+        processor = MyProcessor()
+
+        assert_that(processor.get_command_func("show run")[0](), equal_to("show"))
+        assert_that(processor.get_command_func("sh")[0](), equal_to("show"))
+        assert_that(processor.get_command_func("shutdown")[0](), equal_to("shutdown"))
+        assert_that(processor.get_command_func("s")[0](), equal_to("show"))
+        assert_that(processor.get_command_func("no shut")[0](), equal_to("no_shutdown"))
+        assert_that(processor.get_command_func("ip-helper 1.1.1.1"), equal_to((processor.do_ip_helper, ["1.1.1.1"])))
+        assert_that(processor.get_command_func("reload")[0], is_(none()))
+
+    def test_subclasses_get_their_own_handlers(self):
+        assert_that(MySubProcessor().get_command_func("sh")[0](), equal_to("shell"))
+        assert_that(MyProcessor().get_command_func("sh")[0](), equal_to("show"))
+
+
+class MyProcessor(CommandProcessor):
+    def do_show(self):
+        return "show"
+
+    def do_shutdown(self):
+        return "shutdown"
+
+    def do_no_shutdown(self):
+        return "no_shutdown"
+
+    def do_ip_helper(self, *args):
+        return "ip_helper"
+
+
+class MySubProcessor(MyProcessor):
+    def do_shell(self):
+        return "shell"
@@ -0,0 +1,43 @@
+import unittest
+from hamcrest import assert_that, equal_to, is_, none, calling, raises
+from fake_switches.command_processing.command_tree import CommandTree, AmbiguousCommand
+
+
+class CommandTreeTest(unittest.TestCase):
+    def setUp(self):
+        self.tree = CommandTree({
+            "running-config": "show_run",
+            "running-config interface": "show_run_int",
+            "interfaces status": "show_int_status",
+            "version": "show_version",
+            "vlan": "show_vlan",
+            "vlan brief": "show_vlan_brief"})
+
+    def test_abbreviated_keywords_resolve_to_the_deepest_handler(self):
+        assert_that(self.tree.resolve(["run"]), equal_to("show_run"))
+        assert_that(self.tree.resolve(["r", "int", "1/1"]), equal_to("show_run_int"))
+        assert_that(self.tree.resolve(["vlan", "1000"]), equal_to("show_vlan"))
+        assert_that(self.tree.resolve(["vla", "b"]), equal_to("show_vlan_brief"))
+
+    def test_paths_without_handler_resolve_to_nothing(self):
+        assert_that(self.tree.resolve(["interfaces"]), is_(none()))
+        assert_that(self.tree.resolve(["interfaces", "counters"]), is_(none()))
+        assert_that(self.tree.resolve(["clock"]), is_(none()))
+
+    def test_exact_keyword_wins_over_longer_keywords(self):
+        tree = CommandTree({"vlan": "show_vlan", "vlans": "show_vlans"})
+
+        assert_that(tree.resolve(["vlan"]), equal_to("show_vlan"))
+        assert_that(tree.resolve(["vlans"]), equal_to("show_vlans"))
+
+    def test_ambiguous_words_are_reported_with_their_candidates(self):
+        assert_that(calling(self.tree.resolve).with_args(["v"]), raises(AmbiguousCommand))
+
+        assert_that(self.tree.resolve(["ve"]), equal_to("show_version"))
+
+        try:
+            self.tree.resolve(["v", "1000"])
+            self.fail("should be ambiguous")
+        except AmbiguousCommand as e:
+            assert_that(e.words, equal_to(["v"]))
+            assert_that(e.candidates, equal_to(["version", "vlan"]))
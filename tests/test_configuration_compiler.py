@@ -0,0 +1,183 @@
+import logging
+import unittest
+
+from hamcrest import assert_that, equal_to, is_, is_not, less_than, same_instance, contains_string, calling, raises, \
+    instance_of
+
+from fake_switches.brocade.command_processor.config import ConfigCommandProcessor as BrocadeConfigCommandProcessor
+from fake_switches.brocade.command_processor.enabled import EnabledCommandProcessor as BrocadeEnabledCommandProcessor
+from fake_switches.cisco.command_processor.config import ConfigCommandProcessor as CiscoConfigCommandProcessor
+from fake_switches.cisco.command_processor.enabled import EnabledCommandProcessor as CiscoEnabledCommandProcessor
+from fake_switches.command_processing.configuration_compiler import ConfigurationCompiler, UnknownTarget
+from fake_switches.command_processing.piping_processor_base import NotPipingProcessor
+from fake_switches.switch_configuration import SwitchConfiguration, Port, VlanPort
+from fake_switches.terminal import NoopTerminalController, CapturingTerminalController
+
+CISCO_CONFIGURATION = """vlan 10
+ name TEN
+exit
+vlan 20
+exit
+no vlan 20
+ip vrf BLUE
+exit
+interface FastEthernet0/1
+ description uplink
+ switchport mode trunk
+ switchport trunk allowed vlan 10,30-35
+ switchport trunk allowed vlan add 40
+exit
+interface vlan 10
+ ip vrf forwarding BLUE
+ ip address 10.0.0.1 255.255.255.0
+ ip address 10.0.1.1 255.255.255.0 secondary
+ standby 1 ip 10.0.0.2
+ standby 1 priority 110
+ standby 1 track 10 decrement 5
+ ip helper-address 10.1.1.1
+exit
+ip route 1.1.1.0 255.255.255.0 10.0.0.3
+ip route 2.2.2.0 255.255.255.0 10.0.0.3
+no ip route 2.2.2.0 255.255.255.0 10.0.0.3
+interface vlan 20
+exit
+no interface vlan 20
+"""
+
+BROCADE_CONFIGURATION = """vlan 100 name SERVERS
+ tagged ethernet 1/1
+ untagged ethernet 1/2
+ router-interface ve 100
+exit
+interface ve 100
+ ip address 10.0.0.2/29
+ ip vrrp-extended vrid 1
+  backup priority 160 track-priority 13
+  ip-address 10.0.0.1
+  hello-interval 5
+  activate
+exit
+interface ethernet 1/3
+ disable
+exit
+"""
+
+
+class ConfigurationCompilerTest(unittest.TestCase):
+    def test_cisco_replay_gives_the_state_of_processing_the_configuration(self):
+        self.assert_replay_is_equivalent(cisco_configuration, CiscoConfigCommandProcessor, CISCO_CONFIGURATION,
+                                         cisco_running_config)
+
+    def test_brocade_replay_gives_the_state_of_processing_the_configuration(self):
+        running_config = self.assert_replay_is_equivalent(brocade_configuration, BrocadeConfigCommandProcessor,
+                                                          BROCADE_CONFIGURATION, brocade_running_config)
+
+        assert_that(running_config, contains_string("  ip-address 10.0.0.1\n"))
+
+    def test_changes_are_reduced_to_their_outcome(self):
+        configuration = cisco_configuration()
+        compiled = ConfigurationCompiler(CiscoConfigCommandProcessor).compile(CISCO_CONFIGURATION, configuration)
+
+        replayed = cisco_configuration()
+        compiled.replay(replayed)
+
+        assert_that(replayed.version, less_than(configuration.version))
+        assert_that(replayed.get_vlan(20), is_(None))
+        assert_that(replayed.get_port("FastEthernet0/1").description, equal_to("uplink"))
+
+    def test_replays_do_not_share_their_objects(self):
+        compiled = ConfigurationCompiler(CiscoConfigCommandProcessor).compile(CISCO_CONFIGURATION,
+                                                                             cisco_configuration())
+        first, second = cisco_configuration(), cisco_configuration()
+        compiled.replay(first)
+        compiled.replay(second)
+
+        first_port, second_port = first.get_port("FastEthernet0/1"), second.get_port("FastEthernet0/1")
+        assert_that(first_port.trunk_vlans, is_not(same_instance(second_port.trunk_vlans)))
+        first_port.trunk_vlans.remove(40)
+
+        assert_that(first.get_ports_by_tagged_vlan(40), equal_to([]))
+        assert_that(second.get_ports_by_tagged_vlan(40), equal_to([second_port]))
+        assert_that(first.get_port("Vlan10").vrrps[0].port, is_(first.get_port("Vlan10")))
+
+    def test_vlans_and_ports_are_found_by_number_and_name(self):
+        compiled = ConfigurationCompiler(CiscoConfigCommandProcessor).compile(CISCO_CONFIGURATION,
+                                                                             cisco_configuration())
+        replayed = SwitchConfiguration("127.0.0.1", name="my_switch",
+                                       ports=[Port("FastEthernet0/2"), Port("FastEthernet0/1")])
+        replayed.add_vlan(replayed.new("Vlan", 1))
+        compiled.replay(replayed)
+
+        assert_that(replayed.get_port("FastEthernet0/1").description, equal_to("uplink"))
+        assert_that(replayed.get_port("FastEthernet0/2").description, is_(None))
+
+    def test_replay_fails_before_changing_anything_when_a_target_is_missing(self):
+        compiled = ConfigurationCompiler(CiscoConfigCommandProcessor).compile(CISCO_CONFIGURATION,
+                                                                             cisco_configuration())
+        replayed = SwitchConfiguration("127.0.0.1", name="my_switch", ports=[Port("FastEthernet0/2")])
+        version = replayed.version
+
+        assert_that(calling(compiled.replay).with_args(replayed), raises(UnknownTarget, "FastEthernet0/1"))
+        assert_that(replayed.version, equal_to(version))
+
+    def test_added_objects_are_built_with_the_objects_factory(self):
+        compiled = ConfigurationCompiler(CiscoConfigCommandProcessor).compile(CISCO_CONFIGURATION,
+                                                                             cisco_configuration())
+        replayed = SwitchConfiguration("127.0.0.1", name="my_switch", ports=[Port("FastEthernet0/1")],
+                                       objects_overrides={"VlanPort": MyVlanPort})
+        compiled.replay(replayed)
+
+        port = replayed.get_port("Vlan10")
+        assert_that(port, instance_of(MyVlanPort))
+        assert_that(port.created_by_factory, is_(True))
+        assert_that([str(ip) for ip in port.ips], equal_to(["10.0.0.1/24", "10.0.1.1/24"]))
+
+    def assert_replay_is_equivalent(self, new_configuration, processor_class, text, running_config):
+        processed = new_configuration()
+        processor = processor_class(processed, NoopTerminalController(), logging.getLogger(), NotPipingProcessor())
+        for line in text.split("\n"):
+            processor.process_command(line)
+
+        compiled_on = new_configuration()
+        compiled = ConfigurationCompiler(processor_class).compile(text, compiled_on)
+        replayed = new_configuration()
+        compiled.replay(replayed)
+
+        assert_that(running_config(compiled_on), equal_to(running_config(processed)))
+        assert_that(running_config(replayed), equal_to(running_config(processed)))
+        return running_config(replayed)
+
+
+def cisco_configuration():
+    configuration = SwitchConfiguration("127.0.0.1", name="my_switch",
+                                        ports=[Port("FastEthernet0/1"), Port("FastEthernet0/2")])
+    configuration.add_vlan(configuration.new("Vlan", 1))
+    return configuration
+
+
+def brocade_configuration():
+    configuration = SwitchConfiguration("127.0.0.1", name="my_switch",
+                                        ports=[Port("ethernet 1/1"), Port("ethernet 1/2"), Port("ethernet 1/3")])
+    configuration.add_vlan(configuration.new("Vlan", 1))
+    return configuration
+
+
+def cisco_running_config(configuration):
+    return list(enabled_processor(CiscoEnabledCommandProcessor, configuration).running_config())
+
+
+def brocade_running_config(configuration):
+    processor = enabled_processor(BrocadeEnabledCommandProcessor, configuration)
+    processor.show_run_vlan()
+    processor.show_run_int()
+    return processor.terminal_controller.pop_output()
+
+
+def enabled_processor(processor_class, configuration):
+    return processor_class(configuration, CapturingTerminalController(), logging.getLogger(), NotPipingProcessor())
+
+
+class MyVlanPort(VlanPort):
+    def __init__(self, *args, **kwargs):
+        super(MyVlanPort, self).__init__(*args, **kwargs)
+        self.created_by_factory = True
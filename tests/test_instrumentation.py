@@ -0,0 +1,72 @@
+import logging
+import unittest
+
+from hamcrest import assert_that, equal_to, is_, has_length, less_than_or_equal_to, greater_than_or_equal_to
+
+from fake_switches.cisco.command_processor.enabled import EnabledCommandProcessor as CiscoEnabledCommandProcessor
+from fake_switches.cisco.command_processor.piping import PipingProcessor as CiscoPipingProcessor
+from fake_switches.dell.command_processor.enabled import DellEnabledCommandProcessor
+from fake_switches.command_processing.piping_processor_base import NotPipingProcessor
+from fake_switches.instrumentation import Histogram, command_statistics
+from fake_switches.switch_configuration import SwitchConfiguration, Port
+from fake_switches.terminal import CapturingTerminalController
+
+
+class HistogramTest(unittest.TestCase):
+    def test_percentiles_are_within_the_bucket_precision(self):
+        histogram = Histogram()
+        for value in range(1, 100001):
+            histogram.record(value)
+
+        for percentile in (50, 90, 99, 99.9):
+            exact = 100000 * percentile / 100
+            assert_that(histogram.value_at_percentile(percentile), greater_than_or_equal_to(exact))
+            assert_that(histogram.value_at_percentile(percentile), less_than_or_equal_to(exact * 65 / 64))
+        assert_that(histogram.value_at_percentile(100), equal_to(100000))
+        assert_that(histogram.counts, has_length(less_than_or_equal_to(1024)))
+
+    def test_an_empty_histogram_has_no_percentile(self):
+        assert_that(Histogram().value_at_percentile(50), is_(None))
+
+
+class CommandStatisticsTest(unittest.TestCase):
+    def setUp(self):
+        command_statistics.reset()
+        self.terminal = CapturingTerminalController()
+        configuration = SwitchConfiguration("127.0.0.1", name="my_switch", ports=[Port("ethernet 1/g1")])
+        configuration.add_vlan(configuration.new("Vlan", 1))
+        self.processor = DellEnabledCommandProcessor(configuration, self.terminal, logging.getLogger(),
+                                                     NotPipingProcessor())
+
+    def test_show_commands_are_recorded_once_under_the_handler_they_dispatch_to(self):
+        self.processor.process_command("show vlan")
+        self.processor.process_command("show vlan")
+
+        output = self.terminal.pop_output()
+        show_vlan = command_statistics.get("dell", "show_vlan")
+
+        assert_that(command_statistics.get("dell", "do_show"), is_(None))
+        assert_that(show_vlan.count, equal_to(2))
+        assert_that(show_vlan.output_size.total, equal_to(len(output) - 2 * len("my_switch#")))
+
+    def test_output_held_by_the_piping_until_the_command_ends_is_recorded(self):
+        processor = CiscoEnabledCommandProcessor(SwitchConfiguration("127.0.0.1", name="my_switch"), self.terminal,
+                                                 logging.getLogger(), CiscoPipingProcessor(logging.getLogger()))
+
+        processor.process_command("show running-config | count vlan")
+
+        output = self.terminal.pop_output()
+        assert_that(output.startswith("Number of lines which match regexp = "), is_(True))
+        assert_that(command_statistics.get("cisco", "show_running_config").output_size.total,
+                    equal_to(len(output) - len("my_switch#")))
+        assert_that(processor.get_output_size(), equal_to(len(output)))
+
+    def test_dump_lists_the_slowest_commands_first(self):
+        command_statistics.record("dell", "fast", 0.001, 10)
+        command_statistics.record("dell", "slow", 0.5, 10)
+
+        lines = list(command_statistics.dump())
+
+        assert_that(lines, has_length(3))
+        assert_that(lines[1].split()[:2], equal_to(["dell", "slow"]))
+        assert_that(command_statistics.snapshot()["dell", "fast"]["latency_us"]["max"], equal_to(1000))
@@ -0,0 +1,104 @@
+import logging
+import unittest
+
+from hamcrest import assert_that, equal_to, is_
+
+from fake_switches.brocade.command_processor.enabled import EnabledCommandProcessor as BrocadeEnabledCommandProcessor
+from fake_switches.brocade.command_processor.piping import PipingProcessor as BrocadePipingProcessor
+from fake_switches.cisco.command_processor.enabled import EnabledCommandProcessor as CiscoEnabledCommandProcessor
+from fake_switches.command_processing.pager import Pager
+from fake_switches.command_processing.piping_processor_base import NotPipingProcessor
+from fake_switches.dell.command_processor.enabled import DellEnabledCommandProcessor
+from fake_switches.switch_configuration import SwitchConfiguration, Port, Vlan
+from fake_switches.terminal import CapturingTerminalController
+
+
+class PagerTest(unittest.TestCase):
+    def test_lines_are_taken_only_as_the_pages_are_shown(self):
+        taken = []
+        pager = Pager((taken.append(i) or "line %d" % i for i in range(1000)), 3)
+
+        assert_that(list(pager.next_page()), equal_to(["line 0", "line 1", "line 2"]))
+        assert_that(taken, equal_to([0, 1, 2, 3]))
+        assert_that(pager.position, equal_to(3))
+        assert_that(pager.has_more(), is_(True))
+
+    def test_grouped_lines_stay_on_the_same_page(self):
+        pager = Pager([["a1", "a2"], ["b1", "b2"], "c"], 3)
+
+        assert_that(list(pager.next_page()), equal_to(["a1", "a2", "b1", "b2"]))
+        assert_that(list(pager.next_page()), equal_to(["c"]))
+        assert_that(pager.has_more(), is_(False))
+
+    def test_a_page_length_of_0_shows_everything(self):
+        pager = Pager(("line %d" % i for i in range(1000)), 0)
+
+        assert_that(len(list(pager.next_page())), equal_to(1000))
+        assert_that(pager.has_more(), is_(False))
+
+
+class TerminalLengthTest(unittest.TestCase):
+    def setUp(self):
+        self.terminal = KeyCapturingTerminalController()
+        configuration = SwitchConfiguration("127.0.0.1", name="my_switch", ports=[Port("FastEthernet0/1")])
+        self.processor = CiscoEnabledCommandProcessor(configuration, self.terminal, logging.getLogger(),
+                                                      NotPipingProcessor())
+
+    def test_cisco_pages_once_a_terminal_length_is_set(self):
+        self.processor.process_command("terminal length 4")
+        self.terminal.pop_output()
+
+        self.processor.process_command("show running-config")
+        assert_that(self.terminal.pop_output().split("\n")[-2:], equal_to(["!", " --More-- "]))
+
+        self.terminal.press("m")
+        assert_that(self.terminal.pop_output(), equal_to("\n!\ninterface FastEthernet0/1\n!\nend\n --More-- "))
+
+        self.terminal.press("m")
+        assert_that(self.terminal.pop_output(), equal_to("\n\nmy_switch#"))
+        assert_that(self.terminal.key_handler, is_(None))
+
+    def test_cisco_terminal_length_0_does_not_page(self):
+        self.processor.process_command("terminal length 0")
+        self.processor.process_command("show running-config")
+
+        assert_that(self.terminal.pop_output().endswith("end\n\nmy_switch#"), is_(True))
+
+    def test_brocade_skip_page_display_sets_a_terminal_length_of_0(self):
+        processor = BrocadeEnabledCommandProcessor(SwitchConfiguration("127.0.0.1"), self.terminal,
+                                                   logging.getLogger(), NotPipingProcessor())
+        processor.process_command("skip-page-display")
+
+        assert_that(self.terminal.terminal_length, equal_to(0))
+
+    def test_dell_shows_the_more_prompt_of_a_piped_listing(self):
+        configuration = SwitchConfiguration("127.0.0.1", name="my_switch", vlans=[Vlan(i) for i in range(1, 31)])
+        processor = DellEnabledCommandProcessor(configuration, self.terminal, logging.getLogger(),
+                                                BrocadePipingProcessor(logging.getLogger()))
+
+        processor.process_command("show vlan | include ^2")
+        assert_that(self.terminal.pop_output(), equal_to(
+            "2                                                      Static    Required     \n"
+            "--More-- or (q)uit"))
+
+        self.terminal.press("m")
+        output = self.terminal.pop_output().split("\n")
+        assert_that(output[0], equal_to("\r                     "))
+        assert_that([line.split()[0] for line in output[1:-1]], equal_to([str(i) for i in range(20, 30)]))
+        assert_that(output[-1], equal_to("my_switch#"))
+
+
+class KeyCapturingTerminalController(CapturingTerminalController):
+    def __init__(self):
+        super(KeyCapturingTerminalController, self).__init__()
+        self.key_handler = None
+
+    def add_any_key_handler(self, callback, *params):
+        self.key_handler = callback, params
+
+    def remove_any_key_handler(self):
+        self.key_handler = None
+
+    def press(self, key):
+        callback, params = self.key_handler
+        callback(*(params + (key,)))
@@ -0,0 +1,48 @@
+import logging
+import unittest
+from hamcrest import assert_that, equal_to, is_
+from fake_switches.cisco.command_processor.piping import PipingProcessor
+
+
+class PipingProcessorTest(unittest.TestCase):
+    def setUp(self):
+        self.processor = PipingProcessor(logging.getLogger())
+
+    def test_lines_are_filtered_whole_whatever_the_writes(self):
+        self.processor.start_listening("include ^vlan [0-9]+")
+
+        assert_that(self.processor.pipe("interface vl"), is_(False))
+        assert_that(self.processor.pipe("an 10\n no ip address\nvlan 10\n name TEN\nvlan"), equal_to("vlan 10\n"))
+        assert_that(self.processor.stop_listening(), is_(False))
+
+    def test_a_flushed_line_goes_out_unfiltered_to_its_end(self):
+        self.processor.start_listening("include ^vlan")
+
+        assert_that(self.processor.pipe("vlan 1\n --More-- "), equal_to("vlan 1\n"))
+        assert_that(self.processor.flush(), equal_to(" --More-- "))
+        assert_that(self.processor.pipe("\r   \n name\nvlan 2\n"), equal_to("\r   \nvlan 2\n"))
+
+    def test_stages_are_chained(self):
+        self.processor.start_listening("begin ^vlan | exclude name | include 1")
+
+        output = self.processor.pipe("hostname switch\nvlan 1\n name default\nvlan 10\nvlan 20\n")
+
+        assert_that(output, equal_to("vlan 1\nvlan 10\n"))
+
+    def test_section_keeps_the_indented_lines_of_matching_lines(self):
+        self.processor.start_listening("section interface Vlan")
+
+        output = self.processor.pipe("interface Fa0/1\n shutdown\ninterface Vlan10\n no ip address\n!\n")
+
+        assert_that(output, equal_to("interface Vlan10\n no ip address\n"))
+
+    def test_count_reports_when_the_output_ends(self):
+        self.processor.start_listening("exclude ! | count interface")
+
+        assert_that(self.processor.pipe("interface Fa0/1\n!\ninterface Fa0/2\n"), is_(False))
+        assert_that(self.processor.stop_listening(), equal_to("Number of lines which match regexp = 2\n"))
+
+    def test_unknown_commands_and_invalid_expressions_are_refused(self):
+        assert_that(self.processor.start_listening("include a | sort"), is_(False))
+        assert_that(self.processor.start_listening("include ("), is_(False))
+        assert_that(self.processor.is_listening(), is_(False))
@@ -0,0 +1,79 @@
+import logging
+import unittest
+from hamcrest import assert_that, equal_to, is_, none, calling, raises
+from fake_switches.cisco.command_processor.config import ConfigCommandProcessor as CiscoConfigCommandProcessor
+from fake_switches.command_processing.piping_processor_base import NotPipingProcessor
+from fake_switches.route_table import RouteTable
+from fake_switches.switch_configuration import Route, SwitchConfiguration
+from fake_switches.terminal import NoopTerminalController
+
+
+class RouteTableTest(unittest.TestCase):
+    def setUp(self):
+        self.table = RouteTable()
+        self.wide = Route("10.0.0.0", "255.0.0.0", "1.1.1.1")
+        self.narrow = Route("10.1.0.0", "255.255.0.0", "1.1.1.2")
+        self.other_hop = Route("10.1.0.0", "255.255.0.0", "1.1.1.3")
+        self.default = Route("0.0.0.0", "0.0.0.0", "1.1.1.4")
+        for route in [self.narrow, self.wide, self.other_hop, self.default]:
+            self.table.add(route)
+
+    def test_iterates_in_configuration_order_or_sorted(self):
+        assert_that(list(self.table), equal_to([self.narrow, self.wide, self.other_hop, self.default]))
+        assert_that(list(self.table.sorted()), equal_to([self.default, self.wide, self.narrow, self.other_hop]))
+
+    def test_duplicates_are_ignored(self):
+        assert_that(self.table.add(Route("10.1.0.0", "255.255.0.0", "1.1.1.2")), is_(False))
+        assert_that(len(self.table), equal_to(4))
+
+    def test_lookups(self):
+        assert_that(self.table.get("10.1.0.0/16"), is_(self.narrow))
+        assert_that(self.table.get("10.1.0.0/24"), is_(none()))
+        assert_that(self.table.lookup("10.1.2.3"), is_(self.narrow))
+        assert_that(self.table.lookup("10.2.0.1"), is_(self.wide))
+        assert_that(self.table.lookup("11.0.0.1"), is_(self.default))
+        assert_that(self.table.lookup("2001:db8::1"), is_(none()))
+
+    def test_remove_takes_the_first_next_hop_of_the_prefix(self):
+        assert_that(self.table.remove("10.1.0.0/16"), is_(self.narrow))
+        assert_that(self.table.remove("10.1.0.0/16"), is_(self.other_hop))
+        assert_that(self.table.remove("10.1.0.0/16"), is_(none()))
+
+        assert_that(self.table.lookup("10.1.2.3"), is_(self.wide))
+        assert_that(list(self.table.sorted()), equal_to([self.default, self.wide]))
+
+    def test_remove_takes_the_route_through_the_given_next_hop(self):
+        assert_that(self.table.remove("10.1.0.0/16", "1.1.1.3"), is_(self.other_hop))
+        assert_that(self.table.remove("10.1.0.0/16", "1.1.1.3"), is_(none()))
+
+        assert_that(list(self.table), equal_to([self.narrow, self.wide, self.default]))
+
+    def test_switch_configuration_keeps_a_table_per_vrf(self):
+        conf = SwitchConfiguration("127.0.0.1")
+        conf.add_static_route(Route("10.0.0.0", "255.0.0.0", "1.1.1.1"))
+        conf.add_static_route(Route("10.0.0.0", "255.0.0.0", "1.1.1.1", vrf="BLUE"))
+
+        conf.remove_static_route("10.0.0.0", "255.0.0.0")
+
+        assert_that(len(conf.static_routes), equal_to(0))
+        assert_that(len(conf.get_route_table("BLUE")), equal_to(1))
+
+    def test_removing_a_missing_static_route_is_an_error(self):
+        conf = SwitchConfiguration("127.0.0.1")
+        conf.add_static_route(Route("10.0.0.0", "255.0.0.0", "1.1.1.1", vrf="BLUE"))
+        version = conf.version
+
+        assert_that(calling(conf.remove_static_route).with_args("10.0.0.0", "255.0.0.0"), raises(ValueError))
+        assert_that(conf.version, equal_to(version))
+
+    def test_no_ip_route_removes_the_route_through_its_next_hop(self):
+        conf = SwitchConfiguration("127.0.0.1")
+        first, second = Route("10.0.0.0", "255.0.0.0", "1.1.1.1"), Route("10.0.0.0", "255.0.0.0", "1.1.1.2")
+        conf.add_static_route(first)
+        conf.add_static_route(second)
+        processor = CiscoConfigCommandProcessor(conf, NoopTerminalController(), logging.getLogger(),
+                                                NotPipingProcessor())
+
+        processor.process_command("no ip route 10.0.0.0 255.0.0.0 1.1.1.2")
+
+        assert_that(list(conf.static_routes), equal_to([first]))
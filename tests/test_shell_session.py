@@ -0,0 +1,125 @@
+import unittest
+from hamcrest import assert_that, equal_to, is_, none
+from twisted.internet import defer
+from fake_switches.cisco.cisco_core import CiscoSwitchCore
+from fake_switches.switch_configuration import SwitchConfiguration, Port
+from fake_switches.terminal import CapturingTerminalController, NoopTerminalController
+
+
+class ShellSessionTest(unittest.TestCase):
+    def setUp(self):
+        self.conf = SwitchConfiguration("127.0.0.1", name="my_switch", ports=[Port("FastEthernet0/1")])
+        self.core = CiscoSwitchCore(self.conf)
+
+    def test_execute_batch_collects_the_output_of_each_line(self):
+        session = self.core.launch("batch", CapturingTerminalController())
+
+        results = session.execute_batch(["enable", "", "configure terminal", "vlan 10", "name TEN", "exit", "reload"])
+
+        assert_that([(r.line, r.processed) for r in results], equal_to([
+            ("enable", True), ("", True), ("configure terminal", True), ("vlan 10", True), ("name TEN", True),
+            ("exit", True), ("reload", False)]))
+        assert_that(results[0].output, equal_to("Password: "))
+        assert_that(results[1].output, equal_to("my_switch#"))
+        assert_that(results[-1].output, equal_to("No such command : reload\nmy_switch(config)#"))
+        assert_that(self.conf.get_vlan(10).name, equal_to("TEN"))
+
+    def test_execute_batch_stops_when_the_session_ends(self):
+        session = self.core.launch("batch", NoopTerminalController())
+
+        results = session.execute_batch(["enable", "", "exit", "enable"])
+
+        assert_that([r.line for r in results], equal_to(["enable", "", "exit"]))
+        assert_that(results[0].output, is_(none()))
+
+    def test_execute_batch_stops_at_a_line_awaiting_its_result(self):
+        committed = defer.Deferred()
+        self.conf.commit = lambda: committed
+        session = self.core.launch("batch", CapturingTerminalController())
+
+        results = session.execute_batch(["enable", "", "write memory", "configure terminal"])
+
+        assert_that([r.line for r in results], equal_to(["enable", "", "write memory"]))
+        assert_that(results[1].pending_output, is_(none()))
+        assert_that(results[2].output, equal_to("Building configuration...\n"))
+        pending_output = []
+        results[2].pending_output.addCallback(pending_output.append)
+
+        committed.callback(None)
+
+        assert_that(pending_output, equal_to(["OK\nmy_switch#"]))
+        assert_that(session.execute_batch(["configure terminal"])[0].output, equal_to(
+            "Enter configuration commands, one per line.  End with CNTL/Z.\nmy_switch(config)#"))
+
+    def test_execute_script_collects_the_output_of_each_line_without_prompts(self):
+        terminal_controller = CountingTerminalController()
+        session = self.core.launch("batch", terminal_controller)
+        session.execute_batch(["enable", ""])
+        terminal_controller.flushes = 0
+
+        results = session.execute_script(["configure terminal", "vlan 10", "name TEN", "exit", "reload", "exit",
+                                          "show vlan brief", "configure terminal"])
+
+        assert_that([(r.line, r.processed) for r in results], equal_to([
+            ("configure terminal", True), ("vlan 10", True), ("name TEN", True), ("exit", True), ("reload", False),
+            ("exit", True), ("show vlan brief", True), ("configure terminal", True)]))
+        assert_that(results[0].output, equal_to("Enter configuration commands, one per line.  End with CNTL/Z.\n"))
+        assert_that([r.output for r in results[1:4]], equal_to(["", "", ""]))
+        assert_that(results[4].output, equal_to("No such command : reload\n"))
+        assert_that(results[6].output.endswith("\n10   TEN                              active\n"), is_(True))
+        assert_that(self.conf.get_vlan(10).name, equal_to("TEN"))
+        assert_that(terminal_controller.flushes, equal_to(0))
+        assert_that(terminal_controller.pop_output(), equal_to(""))
+
+        assert_that(session.execute_batch(["exit"])[0].output, equal_to("my_switch#"))
+
+    def test_execute_script_leaves_the_rest_of_a_line_awaiting_its_result_to_the_session(self):
+        committed = defer.Deferred()
+        self.conf.commit = lambda: committed
+        session = self.core.launch("batch", CapturingTerminalController())
+        session.execute_batch(["enable", ""])
+
+        results = session.execute_script(["write memory", "configure terminal"])
+
+        assert_that([(r.line, r.output) for r in results], equal_to([("write memory", "Building configuration...\n")]))
+        pending_output = []
+        results[0].pending_output.addCallback(pending_output.append)
+
+        committed.callback(None)
+
+        assert_that(pending_output, equal_to(["OK\nmy_switch#"]))
+
+    def test_lines_received_while_a_commit_is_pending_run_once_it_completes(self):
+        committed = defer.Deferred()
+        self.conf.commit = lambda: committed
+        terminal_controller = CapturingTerminalController()
+        session = self.core.launch("ssh", terminal_controller)
+        ended = []
+        session.ended.addCallback(ended.append)
+        for line in ["enable", ""]:
+            session.receive(line)
+        terminal_controller.pop_output()
+
+        for line in ["write memory", "show vlan brief", "configure terminal", "exit", "exit"]:
+            assert_that(session.receive(line), is_(True))
+
+        assert_that(terminal_controller.pop_output(), equal_to("Building configuration...\n"))
+        assert_that(session.pending_lines, equal_to(["show vlan brief", "configure terminal", "exit", "exit"]))
+
+        committed.callback(None)
+
+        output = terminal_controller.pop_output()
+        assert_that(output.startswith("OK\nmy_switch#\nVLAN Name"), is_(True))
+        assert_that(output.endswith("my_switch#Enter configuration commands, one per line.  End with CNTL/Z.\n"
+                                    "my_switch(config)#my_switch#"), is_(True))
+        assert_that(session.pending_lines, equal_to([]))
+        assert_that(ended, equal_to([None]))
+
+
+class CountingTerminalController(CapturingTerminalController):
+    def __init__(self):
+        super(CountingTerminalController, self).__init__()
+        self.flushes = 0
+
+    def flush(self):
+        self.flushes += 1
@@ -1,8 +1,13 @@
+import threading
 import unittest
+from time import time
+
+import mock
+from hamcrest import assert_that, less_than
 
 from tests.util.global_reactor import brocade_privileged_password, cisco_privileged_password
 from tests.util.global_reactor import brocade_switch_ip, brocade_switch_ssh_port, cisco_switch_ip, \
-    cisco_switch_telnet_port
+    cisco_switch_telnet_port, cisco_switch_ssh_with_commit_delay_port, COMMIT_DELAY
 from tests.util.protocol_util import SshTester, TelnetTester
 
 
@@ -83,3 +88,84 @@ class RoutingEngineTest(unittest.TestCase):
         tester2.write("exit")
         tester2.read_eof()
         tester2.disconnect()
+
+    def test_commit_delay_only_holds_the_committing_session(self):
+        tester1 = SshTester("ssh-1", cisco_switch_ip, cisco_switch_ssh_with_commit_delay_port, 'root', 'root')
+        tester2 = SshTester("ssh-2", cisco_switch_ip, cisco_switch_ssh_with_commit_delay_port, 'root', 'root')
+
+        for tester in [tester1, tester2]:
+            tester.connect()
+            tester.write("enable")
+            tester.read("Password: ")
+            tester.write_invisible(cisco_privileged_password)
+            tester.read("my_switch#")
+
+        start_time = time()
+        tester1.write("write memory")
+        tester1.readln("Building configuration...")
+
+        tester2.write("terminal length 0")
+        tester2.read("my_switch#")
+        assert_that(time() - start_time, less_than(COMMIT_DELAY))
+
+        tester1.readln("OK")
+        tester1.read("my_switch#")
+
+        for tester in [tester1, tester2]:
+            tester.write("exit")
+            tester.read_eof()
+            tester.disconnect()
+
+    @mock.patch("fake_switches.adapters.tftp_reader.read_tftp")
+    def test_tftp_import_only_holds_the_importing_session(self, read_tftp):
+        download_released = threading.Event()
+
+        def read_when_released(url, filename):
+            download_released.wait(5)
+            return ""
+        read_tftp.side_effect = read_when_released
+
+        tester1 = SshTester("ssh-1", brocade_switch_ip, brocade_switch_ssh_port, 'root', 'root')
+        tester2 = SshTester("ssh-2", brocade_switch_ip, brocade_switch_ssh_port, 'root', 'root')
+
+        for tester in [tester1, tester2]:
+            tester.connect()
+            tester.write("enable")
+            tester.read("Password:")
+            tester.write_invisible(brocade_privileged_password)
+            tester.read("SSH@my_switch#")
+
+        tester1.write("ncopy tftp 1.2.3.4 my-file running-config")
+
+        tester2.write("skip-page-display")
+        tester2.read("SSH@my_switch#")
+
+        download_released.set()
+        tester1.readln("done")
+        tester1.read("SSH@my_switch#")
+
+        for tester in [tester1, tester2]:
+            tester.write("exit")
+            tester.read_eof()
+            tester.disconnect()
+
+    @mock.patch("fake_switches.adapters.tftp_reader.read_tftp")
+    def test_tftp_import_reports_its_progress_to_the_importing_session(self, read_tftp):
+        read_tftp.return_value = iter(["!"] * 25000)
+
+        tester = SshTester("ssh-1", brocade_switch_ip, brocade_switch_ssh_port, 'root', 'root')
+        tester.connect()
+        tester.write("enable")
+        tester.read("Password:")
+        tester.write_invisible(brocade_privileged_password)
+        tester.read("SSH@my_switch#")
+
+        tester.write("ncopy tftp 1.2.3.4 my-file running-config")
+        tester.readln("10000 lines applied")
+        tester.readln("20000 lines applied")
+        tester.readln("done")
+        tester.read("SSH@my_switch#")
+
+        tester.write("exit")
+        tester.read_eof()
+        tester.disconnect()
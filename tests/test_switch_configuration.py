@@ -0,0 +1,279 @@
+import unittest
+from hamcrest import assert_that, is_, none, equal_to, has_length
+from copy import deepcopy
+from netaddr import IPNetwork, IPAddress
+from fake_switches.switch_configuration import SwitchConfiguration, Port, Vlan, VRF, VlanPort, VRRP, stored_attributes
+from fake_switches.vlan_set import VlanSet
+
+
+class SwitchConfigurationTest(unittest.TestCase):
+    def setUp(self):
+        self.conf = SwitchConfiguration("127.0.0.1", ports=[Port("FastEthernet0/1"), Port("FastEthernet0/2")])
+
+    def test_get_port(self):
+        assert_that(self.conf.get_port("FastEthernet0/2"), is_(self.conf.ports[1]))
+        assert_that(self.conf.get_port("FastEthernet0/3"), is_(none()))
+
+    def test_removed_port_is_no_longer_found(self):
+        self.conf.remove_port(self.conf.ports[0])
+
+        assert_that(self.conf.get_port("FastEthernet0/1"), is_(none()))
+
+    def test_get_vlan_returns_the_first_matching_vlan(self):
+        first, second = Vlan(10, "first"), Vlan(10, "second")
+        self.conf.add_vlan(first)
+        self.conf.add_vlan(second)
+
+        assert_that(self.conf.get_vlan(10), is_(first))
+        self.conf.remove_vlan(first)
+        assert_that(self.conf.get_vlan(10), is_(second))
+
+    def test_vlan_changes_are_reindexed_in_list_order(self):
+        first, second = Vlan(10, "first"), Vlan(20, "second")
+        self.conf.add_vlan(first)
+        self.conf.add_vlan(second)
+
+        first.number = 20
+        first.name = "renamed"
+
+        assert_that(self.conf.get_vlan(20), is_(first))
+        assert_that(self.conf.get_vlan(10), is_(none()))
+        assert_that(self.conf.get_vlan_by_name("renamed"), is_(first))
+        assert_that(self.conf.get_vlan_by_name("first"), is_(none()))
+
+    def test_vrfs(self):
+        self.conf.add_vrf(VRF("BLUE"))
+        self.conf.ports[0].vrf = self.conf.get_vrf("BLUE")
+
+        self.conf.remove_vrf("BLUE")
+
+        assert_that(self.conf.get_vrf("BLUE"), is_(none()))
+        assert_that(self.conf.ports[0].vrf, is_(none()))
+        assert_that([vrf.name for vrf in self.conf.vrfs], equal_to(["DEFAULT-LAN"]))
+
+    def test_get_port_by_partial_name_returns_the_first_matching_port(self):
+        conf = SwitchConfiguration("127.0.0.1", ports=[
+            Port("ethernet1/1"), Port("ethernet1/11"), Port("FastEthernet0/1"), Port("Port-channel1"),
+            Port("ve 1"), Port("TenGigabitEthernet0/0/1")])
+        ethernet1_1, ethernet1_11, fast_ethernet0_1, port_channel1, ve1, ten_gigabit0_0_1 = conf.ports
+
+        assert_that(conf.get_port_by_partial_name("e1/1"), is_(ethernet1_1))
+        assert_that(conf.get_port_by_partial_name("ETHERNET 1/11"), is_(ethernet1_11))
+        assert_that(conf.get_port_by_partial_name("1"), is_(ethernet1_1))
+        assert_that(conf.get_port_by_partial_name("f1"), is_(fast_ethernet0_1))
+        assert_that(conf.get_port_by_partial_name("fastethernet 0/1"), is_(fast_ethernet0_1))
+        assert_that(conf.get_port_by_partial_name("p1"), is_(port_channel1))
+        assert_that(conf.get_port_by_partial_name("ve 1"), is_(ve1))
+        assert_that(conf.get_port_by_partial_name("t0/1"), is_(ten_gigabit0_0_1))
+        assert_that(conf.get_port_by_partial_name("x1"), is_(none()))
+        assert_that(conf.get_port_by_partial_name("e2"), is_(none()))
+
+    def test_get_port_by_partial_name_follows_added_and_removed_ports(self):
+        assert_that(self.conf.get_port_by_partial_name("fa0/1"), is_(self.conf.ports[0]))
+
+        first = self.conf.ports[0]
+        self.conf.remove_port(first)
+        assert_that(self.conf.get_port_by_partial_name("fa0/1"), is_(none()))
+        assert_that(self.conf.get_port_by_partial_name("f2"), is_(self.conf.ports[0]))
+
+        self.conf.add_port(Port("FastEthernet1/2"))
+        assert_that(self.conf.get_port_by_partial_name("f2"), is_(self.conf.ports[0]))
+        assert_that(self.conf.get_port_by_partial_name("f1/2"), is_(self.conf.ports[1]))
+
+    def test_overridden_ports_can_add_properties(self):
+        conf = SwitchConfiguration("127.0.0.1", objects_overrides={"Port": MyPort})
+        port = conf.new("Port", "FastEthernet0/1")
+        conf.add_port(port)
+
+        port.access_vlan = 1000
+
+        assert_that(port.changes, equal_to([None, 1000]))
+        assert_that(deepcopy(conf).get_port("FastEthernet0/1").access_vlan, equal_to(1000))
+
+    def test_overridden_port_properties_are_reindexed_without_reading_their_getter(self):
+        conf = SwitchConfiguration("127.0.0.1", objects_overrides={"Port": MyPort})
+        port = conf.new("Port", "FastEthernet0/1")
+        conf.add_port(port)
+
+        port.access_vlan = 1000
+        port.access_vlan = 2000
+
+        assert_that(conf.get_ports_by_access_vlan(1000), equal_to([]))
+        assert_that(conf.get_ports_by_access_vlan(2000), equal_to([port]))
+        assert_that(conf.changes_since(conf.version - 1)[0].old_value, is_(none()))
+
+    def test_stored_attributes_are_read_without_getters_or_allocation(self):
+        port = MyPort("FastEthernet0/1")
+        port.access_vlan = 1000
+
+        attributes = dict(stored_attributes(port))
+
+        assert_that(attributes["name"], equal_to("FastEthernet0/1"))
+        assert_that(attributes["changes"], equal_to([None, 1000]))
+        assert_that(attributes["ip_helpers"], is_(none()))
+        assert_that("access_vlan" in attributes, is_(False))
+
+    def test_containers_are_allocated_on_first_use(self):
+        port = VlanPort(1000, "vlan1000")
+        port.vrrps.append(VRRP(1))
+
+        copied = deepcopy(port)
+        copied.vrrps.append(VRRP(2))
+
+        assert_that([vrrp.group_id for vrrp in port.vrrps], equal_to([1]))
+        assert_that([vrrp.group_id for vrrp in copied.vrrps], equal_to([1, 2]))
+        assert_that(copied.ips, equal_to([]))
+
+    def test_journal_records_additions_removals_and_attribute_changes(self):
+        version = self.conf.version
+        vlan = Vlan(10)
+        self.conf.add_vlan(vlan)
+        vlan.name = "TEN"
+        self.conf.ports[0].access_vlan = 10
+        self.conf.ports[0].access_vlan = 10
+        self.conf.remove_vlan(vlan)
+        vlan.name = "no longer tracked"
+
+        changes = self.conf.changes_since(version)
+
+        assert_that([(c.action, c.target, c.attribute, c.old_value, c.new_value) for c in changes], equal_to([
+            ("added", vlan, None, None, None),
+            ("changed", vlan, "name", None, "TEN"),
+            ("changed", self.conf.ports[0], "access_vlan", None, 10),
+            ("removed", vlan, None, None, None)]))
+        assert_that([c.version for c in changes], equal_to(list(range(version + 1, version + 5))))
+        assert_that(self.conf.version, equal_to(version + 4))
+        assert_that(self.conf.get_vlan_by_name("TEN"), is_(none()))
+
+    def test_journal_records_in_place_container_changes(self):
+        conf = SwitchConfiguration("127.0.0.1", ports=[VlanPort(1000, "vlan1000")])
+        port = conf.ports[0]
+        port.trunk_vlans = [1]
+        port.vrrps.append(VRRP(1))
+        version = conf.version
+
+        port.trunk_vlans.append(2)
+        port.vendor_specific["key"] = "value"
+        port.vrrps[0].priority = 110
+        port.vrrps[0].track["1"] = "2"
+
+        assert_that([(c.target, c.attribute) for c in conf.changes_since(version)], equal_to([
+            (port, "trunk_vlans"), (port, "vendor_specific"), (port.vrrps[0], "priority"), (port.vrrps[0], "track")]))
+
+    def test_subscribers_receive_every_change(self):
+        received = []
+        self.conf.subscribe(received.append)
+        self.conf.ports[0].description = "hello"
+        self.conf.unsubscribe(received.append)
+        self.conf.ports[0].description = "bye"
+
+        assert_that([c.new_value for c in received], equal_to(["hello"]))
+
+    def test_changes_since_a_forgotten_version_are_unknown(self):
+        version = self.conf.version
+        for i in range(SwitchConfiguration.JOURNAL_SIZE + 1):
+            self.conf.ports[0].mtu = i
+
+        assert_that(self.conf.changes_since(version), is_(none()))
+        assert_that(len(self.conf.changes_since(version + 1)), equal_to(SwitchConfiguration.JOURNAL_SIZE))
+
+    def test_ports_by_vlan_membership(self):
+        first, second = self.conf.ports
+        first.access_vlan = 10
+        second.trunk_native_vlan = 10
+        second.trunk_vlans = [20, 30]
+        first.trunk_vlans = VlanSet([30])
+
+        assert_that(self.conf.get_ports_by_access_vlan(10), equal_to([first]))
+        assert_that(self.conf.get_ports_by_access_vlan(10, None), equal_to([first, second]))
+        assert_that(self.conf.get_ports_by_native_vlan(10), equal_to([second]))
+        assert_that(self.conf.get_ports_by_tagged_vlan(30), equal_to([first, second]))
+        assert_that(self.conf.get_ports_by_tagged_vlan(20, 30), equal_to([first, second]))
+
+        second.trunk_vlans.remove(30)
+        first.trunk_vlans.add(20)
+        first.access_vlan = None
+        assert_that(self.conf.get_ports_by_tagged_vlan(30), equal_to([first]))
+        assert_that(self.conf.get_ports_by_tagged_vlan(20), equal_to([first, second]))
+        assert_that(self.conf.get_ports_by_access_vlan(10), equal_to([]))
+
+        self.conf.remove_port(first)
+        assert_that(self.conf.get_ports_by_tagged_vlan(20), equal_to([second]))
+        assert_that(self.conf.in_port_order([second, first, second]), equal_to([first, second]))
+
+    def test_get_port_and_ip_by_ip(self):
+        conf = SwitchConfiguration("127.0.0.1", ports=[VlanPort(1, "vlan1"), VlanPort(2, "vlan2")])
+        vlan1, vlan2 = conf.ports
+        vlan2.add_ip(IPNetwork("10.0.0.1/8"))
+        vlan1.add_ip(IPNetwork("10.1.0.1/16"))
+        vlan1.add_ip(IPNetwork("2001:db8::1/64"))
+
+        assert_that(conf.get_port_and_ip_by_ip(IPAddress("10.1.2.3")), equal_to((vlan1, IPNetwork("10.1.0.1/16"))))
+        assert_that(conf.get_port_and_ip_by_ip("10.2.0.1"), equal_to((vlan2, IPNetwork("10.0.0.1/8"))))
+        assert_that(conf.get_port_and_ip_by_ip("2001:db8::ff"), equal_to((vlan1, IPNetwork("2001:db8::1/64"))))
+        assert_that(conf.get_port_and_ip_by_ip("11.0.0.1"), equal_to((None, None)))
+
+        vlan1.ips[0] = IPNetwork("10.2.0.1/16")
+        assert_that(conf.get_port_and_ip_by_ip("10.1.2.3"), equal_to((vlan2, IPNetwork("10.0.0.1/8"))))
+        assert_that(conf.get_port_and_ip_by_ip("10.2.0.2"), equal_to((vlan1, IPNetwork("10.2.0.1/16"))))
+
+        conf.remove_port(vlan1)
+        vlan2.ips = []
+        assert_that(conf.get_port_and_ip_by_ip("10.2.0.2"), equal_to((None, None)))
+
+    def test_fragment_sizes_are_kept_with_their_fragments(self):
+        port = self.conf.ports[0]
+        renders = []
+
+        def render(p):
+            renders.append(p.description)
+            return ["interface %s" % p.name, " description %s" % p.description]
+
+        assert_that(self.conf.rendered_size("key", port, render), equal_to(len("interface FastEthernet0/1\n description None\n")))
+        assert_that(self.conf.rendered_fragment("key", port, render), has_length(2))
+        port.description = "hello"
+        assert_that(self.conf.rendered_size("key", port, render), equal_to(len("interface FastEthernet0/1\n description hello\n")))
+        assert_that(renders, equal_to([None, "hello"]))
+
+    def test_fragments_are_rendered_again_only_for_the_changed_port(self):
+        conf = SwitchConfiguration("127.0.0.1", ports=[Port("FastEthernet0/1"), VlanPort(1000, "vlan1000")])
+        port, vlan_port = conf.ports
+        vlan_port.vrrps.append(VRRP(1))
+        renders = []
+
+        def render(p):
+            renders.append(p.name)
+            return [p.name]
+
+        def render_all():
+            for p in conf.ports:
+                conf.rendered_fragment("key", p, render)
+
+        render_all()
+        render_all()
+        port.description = "hello"
+        render_all()
+        vlan_port.vrrps[0].priority = 110
+        render_all()
+
+        assert_that(renders, equal_to(["FastEthernet0/1", "vlan1000", "FastEthernet0/1", "vlan1000"]))
+
+        conf.remove_port(port)
+        assert_that(conf.rendered_fragment("key", port, render), equal_to(["FastEthernet0/1"]))
+        assert_that(conf.rendered_fragment("key", port, render), equal_to(["FastEthernet0/1"]))
+        assert_that(len(renders), equal_to(6))
+
+
+class MyPort(Port):
+    def __init__(self, name):
+        self.changes = []
+
+        super(MyPort, self).__init__(name)
+
+    @property
+    def access_vlan(self):
+        return self.changes[-1]
+
+    @access_vlan.setter
+    def access_vlan(self, value):
+        self.changes.append(value)
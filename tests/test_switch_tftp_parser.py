@@ -0,0 +1,100 @@
+import threading
+import unittest
+
+from hamcrest import assert_that, equal_to, is_
+from twisted.internet import reactor
+from twisted.internet.threads import blockingCallFromThread
+
+from fake_switches.adapters import tftp_reader
+from fake_switches.brocade.command_processor.config import ConfigCommandProcessor as BrocadeConfigCommandProcessor
+from fake_switches.cisco.command_processor.config import ConfigCommandProcessor as CiscoConfigCommandProcessor
+from fake_switches.command_processing.switch_tftp_parser import SwitchTftpParser, import_configurations
+from fake_switches.switch_configuration import SwitchConfiguration
+from tests.util.tftp_server import LocalTftpServer
+
+
+class ImportConfigurationsTest(unittest.TestCase):
+    def test_the_files_of_many_switches_are_imported_at_once(self):
+        files = {
+            "cisco.cfg": "".join("vlan %s\n name VLAN%s\nexit\n" % (n, n) for n in range(2, 502)),
+            "brocade.cfg": "".join("vlan %s name VLAN%s\nexit\n" % (n, n) for n in range(2, 1002)),
+        }
+        cisco, brocade, missing = [SwitchConfiguration("127.0.0.1", name=name)
+                                   for name in ("cisco", "brocade", "missing")]
+        progress = []
+
+        with LocalTftpServer(files=files) as server:
+            results = blockingCallFromThread(
+                reactor, import_configurations, [
+                    (cisco, "127.0.0.1", "cisco.cfg", CiscoConfigCommandProcessor),
+                    (brocade, "127.0.0.1", "brocade.cfg", BrocadeConfigCommandProcessor),
+                    (missing, "127.0.0.1", "missing.cfg", CiscoConfigCommandProcessor),
+                ], lambda configuration, lines, done: progress.append((configuration.name, lines, done)),
+                PortReader(server.port))
+
+        assert_that([success for success, _ in results], equal_to([True, True, False]))
+        assert_that([lines for _, lines in results[:2]], equal_to([1501, 2001]))
+        assert_that(sorted(progress), equal_to([("brocade", 2001, True), ("cisco", 1501, True)]))
+        assert_that(cisco.get_vlan(501).name, equal_to("VLAN501"))
+        assert_that(brocade.get_vlan(1001).name, equal_to("VLAN1001"))
+
+    def test_a_failing_import_stops_its_download(self):
+        lines = DownloadedLines(["vlan 10", "name TEN", "unknown", "exit"] * 1000)
+        parser = SwitchTftpParser(SwitchConfiguration("127.0.0.1", name="my_switch"), reader=FixedReader(lines))
+        parser.apply = FailingApply(parser.apply)
+
+        failures = []
+        blockingCallFromThread(reactor, lambda: parser.parse_async("127.0.0.1", "file", CiscoConfigCommandProcessor)
+                               .addErrback(failures.append))
+
+        assert_that(failures[0].check(KeyError), equal_to(KeyError))
+        lines.closed.wait(5)
+        assert_that(lines.closed.is_set(), is_(True))
+        assert_that(lines.read < len(lines.lines), is_(True))
+
+
+class PortReader(object):
+    def __init__(self, port):
+        self.port = port
+
+    def read_tftp(self, server, remote_filename):
+        return tftp_reader.read_tftp(server, remote_filename, port=self.port)
+
+
+class FixedReader(object):
+    def __init__(self, lines):
+        self.lines = lines
+
+    def read_tftp(self, server, remote_filename):
+        return self.lines
+
+
+class DownloadedLines(object):
+    def __init__(self, lines):
+        self.lines = lines
+        self.read = 0
+        self.closed = threading.Event()
+
+    def __iter__(self):
+        return self
+
+    def next(self):
+        if self.closed.is_set() or self.read == len(self.lines):
+            raise StopIteration()
+        self.read += 1
+        return self.lines[self.read - 1]
+
+    __next__ = next
+
+    def close(self):
+        self.closed.set()
+
+
+class FailingApply(object):
+    def __init__(self, apply):
+        self.apply = apply
+
+    def __call__(self, command_processor, line):
+        if line == "unknown":
+            raise KeyError(line)
+        self.apply(command_processor, line)
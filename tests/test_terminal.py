@@ -0,0 +1,37 @@
+import unittest
+from hamcrest import assert_that, equal_to
+from fake_switches.terminal import BufferedTerminalController, CapturingTerminalController
+
+
+class BufferedTerminalControllerTest(unittest.TestCase):
+    def setUp(self):
+        self.real = RecordingTerminalController()
+        self.terminal = BufferedTerminalController(self.real)
+
+    def test_writes_are_sent_in_one_piece_on_flush(self):
+        self.terminal.write("line 1\n")
+        self.terminal.write("line 2\n")
+        assert_that(self.real.output, equal_to([]))
+
+        self.terminal.flush()
+        self.terminal.flush()
+        assert_that(self.real.output, equal_to(["line 1\nline 2\n"]))
+
+    def test_output_is_sent_once_enough_of_it_is_held(self):
+        terminal = BufferedTerminalController(self.real, max_pending=10)
+        terminal.write("line 1\n")
+        terminal.write("line 2\n")
+        terminal.write("line 3\n")
+
+        assert_that(self.real.output, equal_to(["line 1\nline 2\n"]))
+
+    def test_waiting_for_a_keystroke_flushes(self):
+        self.terminal.write("--More--")
+        self.terminal.add_any_key_handler(lambda key: None)
+
+        assert_that(self.real.output, equal_to(["--More--"]))
+
+
+class RecordingTerminalController(CapturingTerminalController):
+    def add_any_key_handler(self, callback, *params):
+        pass
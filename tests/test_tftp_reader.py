@@ -0,0 +1,80 @@
+import threading
+import unittest
+from hamcrest import assert_that, equal_to, calling, raises, is_
+from fake_switches.adapters.tftp_reader import LineStream, read_tftp, MAX_DOWNLOADS
+from tests.util.tftp_server import LocalTftpServer
+
+
+class LineStreamTest(unittest.TestCase):
+    def test_lines_are_cut_across_blocks(self):
+        lines = LineStream()
+        download = start_download(lines, ["hostname sw", "itch\n!\ninterface Fa0/1\n", " shutdown"])
+
+        assert_that(list(lines), equal_to(["hostname switch", "!", "interface Fa0/1", " shutdown"]))
+        download.join(5)
+
+    def test_download_failures_are_raised_to_the_reader(self):
+        lines = LineStream()
+        start_download(lines, ["vlan 10\n"], failure=IOError("Timed out"))
+
+        assert_that(calling(list).with_args(lines), raises(IOError))
+
+    def test_read_tftp_downloads_the_file_from_the_server(self):
+        content = "".join("vlan %s\n" % i for i in range(1000))
+
+        with LocalTftpServer(files={"my-file": content}) as server:
+            lines = list(read_tftp("127.0.0.1", "my-file", port=server.port))
+
+        assert_that(lines, equal_to(content.split("\n")))
+
+    def test_an_abandoned_download_stops(self):
+        lines = SmallLineStream()
+        download = start_download(lines, ["line %s\n" % i for i in range(10)])
+
+        for _ in lines:
+            break
+
+        download.join(5)
+        assert_that(download.is_alive(), is_(False))
+
+    def test_a_stalled_download_fails(self):
+        lines = QuicklyStalledLineStream()
+        lines.started = True
+
+        assert_that(calling(list).with_args(lines), raises(IOError))
+
+    def test_more_downloads_than_download_threads_all_complete(self):
+        content = "".join("vlan %s\n" % i for i in range(10))
+
+        with LocalTftpServer(files={"my-file": content}) as server:
+            streams = [read_tftp("127.0.0.1", "my-file", port=server.port) for _ in range(3 * MAX_DOWNLOADS)]
+            downloaded = [list(lines) for lines in streams]
+
+        assert_that(downloaded, equal_to([content.split("\n")] * 3 * MAX_DOWNLOADS))
+
+
+def start_download(lines, blocks, failure=None):
+    download = threading.Thread(target=lines.fill_from, args=(FakeClient(blocks, failure), "file"))
+    download.daemon = True
+    download.start()
+    return download
+
+
+class SmallLineStream(LineStream):
+    MAX_PENDING_BLOCKS = 1
+
+
+class QuicklyStalledLineStream(LineStream):
+    STALLED_AFTER = 0.1
+
+
+class FakeClient(object):
+    def __init__(self, blocks, failure):
+        self.blocks = blocks
+        self.failure = failure
+
+    def download(self, remote_filename, output):
+        for block in self.blocks:
+            output.write(block)
+        if self.failure:
+            raise self.failure
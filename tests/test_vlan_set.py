@@ -0,0 +1,42 @@
+import unittest
+from copy import deepcopy
+from hamcrest import assert_that, equal_to, is_, calling, raises
+from fake_switches.vlan_set import VlanSet
+
+
+class VlanSetTest(unittest.TestCase):
+    def test_behaves_like_a_sorted_list_of_unique_vlans(self):
+        vlans = VlanSet([30, 10])
+        vlans.append(20)
+        vlans += [10, 40]
+
+        assert_that(list(vlans), equal_to([10, 20, 30, 40]))
+        assert_that(len(vlans), equal_to(4))
+        assert_that(20 in vlans, is_(True))
+        assert_that(21 in vlans, is_(False))
+
+    def test_remove_raises_like_a_list(self):
+        vlans = VlanSet([10])
+        vlans.remove(10)
+
+        assert_that(bool(vlans), is_(False))
+        assert_that(calling(vlans.remove).with_args(10), raises(ValueError))
+
+    def test_range_operations(self):
+        vlans = VlanSet.of_range(1, 4096)
+        vlans -= VlanSet.of_range(2, 4095)
+        vlans.remove_range(4096, 4096)
+
+        assert_that(list(vlans), equal_to([1]))
+
+    def test_ranges(self):
+        assert_that(list(VlanSet([1, 2, 3, 5, 7, 8, 4096]).ranges()), equal_to([(1, 3), (5, 5), (7, 8), (4096, 4096)]))
+        assert_that(list(VlanSet().ranges()), equal_to([]))
+
+    def test_copies_are_independent(self):
+        vlans = VlanSet([1])
+        copied = deepcopy(vlans)
+        copied.add(2)
+
+        assert_that(vlans, equal_to(VlanSet([1])))
+        assert_that(copied, equal_to([1, 2]))
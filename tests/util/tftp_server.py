@@ -0,0 +1,64 @@
+# Copyright 2016 Internap.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import threading
+from io import BytesIO
+
+import tftpy
+
+
+class LocalTftpServer(object):
+    """
+    A tftpy server running in a thread of this process on a port picked by
+    the system.  It serves the files of a directory or, when none is given,
+    the contents of the files dict keyed by file name.
+
+    >>> with LocalTftpServer(files={"my-file": "vlan 10\\n"}) as server:
+    ...     address = "127.0.0.1:%s" % server.port
+    """
+
+    def __init__(self, root=None, files=None, ip="127.0.0.1"):
+        self.files = files if files is not None else {}
+        self.ip = ip
+        self.port = None
+        if root is None:
+            self.server = tftpy.TftpServer(dyn_file_func=self._open)
+        else:
+            self.server = tftpy.TftpServer(root)
+        self.thread = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.listen, args=(self.ip, 0, 1))
+        self.thread.daemon = True
+        self.thread.start()
+        if not self.server.is_running.wait(5):
+            raise RuntimeError("The TFTP server did not start")
+        self.port = self.server.listenport
+        return self
+
+    def stop(self):
+        self.server.stop(now=True)
+        self.thread.join(5)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *_):
+        self.stop()
+
+    def _open(self, filename):
+        content = self.files.get(filename)
+        if content is None:
+            return None
+        return BytesIO(content if isinstance(content, bytes) else content.encode("utf-8"))